@@ -1,6 +1,7 @@
 from pymongo import MongoClient, errors, UpdateOne
 from dateutil import parser
 from datetime import timedelta
+from collections import defaultdict
 import os
 from dotenv import load_dotenv
 
@@ -9,6 +10,7 @@ load_dotenv()
 MONGODB_URI = os.getenv('MONGO_URI')
 MONGO_DATABASE = "plataforma_finanzas"
 MONGO_COLLECTION = "movimientos"
+MONGO_COLLECTION_ROLLUP = "movimientos_rollup"
 
 companies = {
     "Play Play Play": "650cbacb5b27367205467e2e",
@@ -69,6 +71,125 @@ def convertir_utc_a_utc5(iso_str):
     except Exception:
         return ""  # Devuelve vacío si hay error de parseo
 
+def convertir_utc_a_utc5_date(iso_str):
+    """
+    Misma hora que updatedAt_utc5 pero como Date (naive): equivale a
+    {$toDate: "$updatedAt_utc5"}, comparable con las fechas de balances_bot
+    (truncada al segundo, como el texto de updatedAt_utc5).
+    """
+    try:
+        return (parser.isoparse(iso_str) - timedelta(hours=5)).replace(tzinfo=None, microsecond=0)
+    except Exception:
+        return None
+
+def normalizar(texto):
+    """Clave de búsqueda: sin espacios en los extremos y en mayúsculas."""
+    return (texto or "").strip().upper()
+
+# Campos normalizados que usa el $lookup de pipeline_balances (calculados al ingerir)
+INDICE_CONCILIACION = [
+    ("gameName_norm", 1),
+    ("company_norm", 1),
+    ("status", 1),
+    ("updatedAtUtc5", 1),
+]
+_indices_listos = False
+
+def asegurar_indices(collection):
+    """Crea (una vez por proceso) los índices igualdad → rango de la conciliación y del rollup."""
+    global _indices_listos
+    if _indices_listos:
+        return
+    collection.create_index(INDICE_CONCILIACION, name="idx_conciliacion")
+    collection.database[MONGO_COLLECTION_ROLLUP].create_index(INDICE_ROLLUP, name="idx_rollup")
+    _indices_listos = True
+
+# Rollup por (company_norm, gameName_norm, bucket de 1 hora, type) → sum/count
+# de los movimientos Approved. La conciliación suma los buckets completos del
+# rango y solo lee de movimientos los dos bordes parciales.
+ROLLUP_BUCKET = timedelta(hours=1)
+ROLLUP_UNIDAD = "hour"
+INDICE_ROLLUP = [
+    ("gameName_norm", 1),
+    ("company_norm", 1),
+    ("bucket", 1),
+]
+
+def truncar_bucket(fecha):
+    """Inicio del bucket (hora) al que pertenece la fecha."""
+    return fecha.replace(minute=0, second=0, microsecond=0)
+
+def _pipeline_rollup(match, buckets=None):
+    """
+    Agrupa los movimientos Approved de `match` por bucket/type y los escribe en
+    el rollup (solo los `buckets` indicados, si se pasan).
+    """
+    filtro_bucket = {"$ne": None} if buckets is None else {"$in": buckets}
+    return [
+        {"$match": dict(match, status="Approved")},
+        {
+            "$group": {
+                "_id": {
+                    "company_norm": "$company_norm",
+                    "gameName_norm": "$gameName_norm",
+                    "bucket": {"$dateTrunc": {"date": "$updatedAtUtc5", "unit": ROLLUP_UNIDAD}},
+                    "type": "$type",
+                },
+                "sum": {"$sum": "$amount"},
+                "count": {"$sum": 1},
+            }
+        },
+        {
+            "$set": {
+                "company_norm": "$_id.company_norm",
+                "gameName_norm": "$_id.gameName_norm",
+                "bucket": "$_id.bucket",
+                "type": "$_id.type",
+            }
+        },
+        {"$match": {"bucket": filtro_bucket}},
+        {"$merge": {"into": MONGO_COLLECTION_ROLLUP, "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+
+def actualizar_rollups(db, company_norm, documentos):
+    """
+    Recalcula desde movimientos los buckets que tocan `documentos` (versión
+    nueva y anterior de cada movimiento upserteado). Recalcular en vez de $inc
+    hace idempotente el re-ingreso y cubre cambios de status/updatedAt.
+    """
+    afectados = defaultdict(set)
+    for doc in documentos:
+        game = doc.get("gameName_norm")
+        fecha = doc.get("updatedAtUtc5")
+        if game and fecha:
+            afectados[game].add(truncar_bucket(fecha))
+
+    rollups = db[MONGO_COLLECTION_ROLLUP]
+    for game, buckets in afectados.items():
+        buckets = sorted(buckets)
+        # Un bucket que se quedó sin movimientos Approved no lo vuelve a escribir el $merge
+        rollups.delete_many({"gameName_norm": game, "company_norm": company_norm, "bucket": {"$in": buckets}})
+        db[MONGO_COLLECTION].aggregate(_pipeline_rollup({
+            "gameName_norm": game,
+            "company_norm": company_norm,
+            "updatedAtUtc5": {"$gte": buckets[0], "$lt": buckets[-1] + ROLLUP_BUCKET},
+        }, buckets))
+
+def reconstruir_rollups(db):
+    """Rollup completo desde cero (migración / reparación)."""
+    db[MONGO_COLLECTION_ROLLUP].delete_many({})
+    db[MONGO_COLLECTION].aggregate(_pipeline_rollup({"gameName_norm": {"$exists": True}}), allowDiskUse=True)
+
+def normalizar_movimiento(mov, nombre_compania):
+    """Agrega company y los campos normalizados/indexados al movimiento."""
+    mov["company"] = nombre_compania
+    mov["company_norm"] = normalizar(nombre_compania)
+    mov["gameName_norm"] = normalizar(mov.get("gameName"))
+    if "updatedAt" in mov and mov["updatedAt"]:
+        mov["updatedAt_utc5"] = convertir_utc_a_utc5(mov["updatedAt"])
+        mov["updatedAtUtc5"] = convertir_utc_a_utc5_date(mov["updatedAt"])
+    return mov
+
 def insertar_movimientos(movimientos, nombre_compania):
     if not movimientos:
         print(f"No hay movimientos para insertar en {nombre_compania}.")
@@ -79,12 +200,11 @@ def insertar_movimientos(movimientos, nombre_compania):
     collection = db[MONGO_COLLECTION]
     
     try:
+        asegurar_indices(collection)
         bulk_ops = []
         
         for mov in movimientos:
-            mov["company"] = nombre_compania
-            if "updatedAt" in mov and mov["updatedAt"]:
-                mov["updatedAt_utc5"] = convertir_utc_a_utc5(mov["updatedAt"])
+            normalizar_movimiento(mov, nombre_compania)
             # El timestamp_extraccion ya viene en el movimiento
             
             # Upsert: si existe (_id match), actualiza TODO (incluyendo status)
@@ -97,6 +217,12 @@ def insertar_movimientos(movimientos, nombre_compania):
                 )
             )
         
+        # Versión anterior de los que ya existían: si cambió updatedAt, su bucket viejo también se recalcula
+        previos = list(collection.find(
+            {"_id": {"$in": [mov["_id"] for mov in movimientos]}},
+            {"gameName_norm": 1, "updatedAtUtc5": 1}
+        ))
+
         result = collection.bulk_write(bulk_ops, ordered=False)
         
         insertados = result.upserted_count
@@ -106,4 +232,12 @@ def insertar_movimientos(movimientos, nombre_compania):
         print(f"  ✓ [{nombre_compania}] Nuevos: {insertados} | Actualizados: {actualizados} | Sin cambios: {sin_cambios}")
         
     except Exception as e:
-        print(f"  ✗ Error en bulk_write para {nombre_compania}: {str(e)}")
\ No newline at end of file
+        print(f"  ✗ Error en bulk_write para {nombre_compania}: {str(e)}")
+        return
+
+    # El rollup se recalcula desde movimientos: si falla, el bulk ya quedó escrito
+    # y basta con re-ingresar o correr normalizarMovimientos.py
+    try:
+        actualizar_rollups(db, normalizar(nombre_compania), list(movimientos) + previos)
+    except Exception as e:
+        print(f"  ✗ Error actualizando movimientos_rollup para {nombre_compania}: {str(e)}")
@@ -15,7 +15,7 @@ from config import companies, SUPERADMIN_USER, SUPERADMIN_PASS, insertar_movimie
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from diccionario import GRUPOS_COMPANIAS
 
-from pipeline_balances import ejecutar_pipeline_grupo, exportar_a_sheets, enviar_a_backend
+from pipeline_balances import ejecutar_pipeline_grupo, exportar_a_sheets, enviar_a_backend, a_fecha
 
 # ===== CONFIGURACIÓN DE RENDIMIENTO =====
 MAX_WORKERS_COMPANIAS = min(20, (os.cpu_count() or 1) * 4)
@@ -241,8 +241,8 @@ def analizar_fechas_necesarias_por_grupo():
         fechas_grupo = defaultdict(set)
         
         for doc in resultados:
-            fecha_actual = datetime.strptime(doc["fecha_actual"], "%Y-%m-%d %H:%M:%S")
-            fecha_anterior = datetime.strptime(doc["fecha_anterior"], "%Y-%m-%d %H:%M:%S")
+            fecha_actual = a_fecha(doc["fecha_actual"])
+            fecha_anterior = a_fecha(doc["fecha_anterior"])
             
             fecha_inicio = fecha_anterior.date()
             fecha_fin = fecha_actual.date()
@@ -316,6 +316,10 @@ def procesar_grupo(grupo, companias_con_fechas):
 
     # Pipeline
     resultados_pipeline = ejecutar_pipeline_grupo(grupo, timestamp_grupo)
+    if resultados_pipeline is None:
+        # Sin docs del grupo, exportar_a_sheets no toca su hoja
+        print(f"  ✗ Pipeline falló para {grupo}: no se exporta\n")
+        return []
     print(f"  ✓ Pipeline: {len(resultados_pipeline)} balances\n")
 
     return resultados_pipeline
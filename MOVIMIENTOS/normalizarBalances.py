@@ -0,0 +1,76 @@
+"""
+Migración única: convierte los balances escritos antes de que
+config.enviar_resultado_balance guardara los campos normalizados
+(fecha 'YYYY-MM-DD HH:MM:SS' → Date, website → title case por palabra).
+Reemplaza a titleCase.py. Reanudable: solo toca documentos con fecha en texto
+(también sirve para balances viejos reenviados desde el spool del bot).
+Las fechas que no se pueden convertir quedan en null y el texto original se
+mueve a fecha_invalida (el run termina igual y las reporta al final).
+"""
+from pymongo import MongoClient
+
+from config import MONGODB_URI, MONGO_DATABASE
+
+LOTE = 5000
+
+client = MongoClient(MONGODB_URI)
+col = client[MONGO_DATABASE]["balances_bot"]
+
+filtro = {"fecha": {"$type": "string"}}
+pendientes = col.count_documents(filtro)
+print(f"Balances sin normalizar: {pendientes}")
+
+# Mismo título que calculaba la pipeline con $reduce en cada conciliación, una sola vez
+palabras = {
+    "$filter": {
+        "input": {"$split": [{"$toLower": {"$trim": {"input": {"$ifNull": ["$website", ""]}}}}, " "]},
+        "cond": {"$ne": ["$$this", ""]}
+    }
+}
+fecha = {
+    "$dateFromString": {
+        "dateString": "$fecha",
+        "format": "%Y-%m-%d %H:%M:%S",
+        "onError": None,
+        "onNull": None,
+    }
+}
+normalizar = [{
+    "$set": {
+        "website": {
+            "$reduce": {
+                "input": palabras,
+                "initialValue": "",
+                "in": {
+                    "$concat": [
+                        "$$value",
+                        {"$cond": [{"$eq": ["$$value", ""]}, "", " "]},
+                        {"$toUpper": {"$substrCP": ["$$this", 0, 1]}},
+                        {"$substrCP": ["$$this", 1, {"$strLenCP": "$$this"}]}
+                    ]
+                }
+            }
+        },
+        "fecha": fecha,
+        "fecha_invalida": {"$cond": [{"$eq": [fecha, None]}, "$fecha", "$$REMOVE"]},
+    }
+}]
+
+procesados = 0
+invalidas = 0
+while True:
+    ids = [doc["_id"] for doc in col.find(filtro, {"_id": 1}).limit(LOTE)]
+    if not ids:
+        break
+    col.update_many({"_id": {"$in": ids}}, normalizar)
+    invalidas += col.count_documents({"_id": {"$in": ids}, "fecha_invalida": {"$exists": True}})
+    procesados += len(ids)
+    print(f"  {procesados}/{pendientes} ({procesados * 100 // max(pendientes, 1)}%)")
+
+print("✓ balances_bot normalizado.")
+if invalidas:
+    print(f"⚠ {invalidas} balances con fecha inválida (fecha: null, texto original en fecha_invalida):")
+    for doc in col.find({"fecha_invalida": {"$exists": True}}, {"website": 1, "username": 1, "fecha_invalida": 1}).limit(20):
+        print(f"   {doc['_id']} | {doc.get('website')} | {doc.get('username')} | {doc['fecha_invalida']!r}")
+
+client.close()
@@ -0,0 +1,49 @@
+"""
+Migración única: agrega gameName_norm / company_norm / updatedAtUtc5 a los
+movimientos ingeridos antes de que insertar_movimientos los calculara, crea
+los índices de conciliación y reconstruye movimientos_rollup. Reanudable: solo
+toca documentos sin gameName_norm (el rollup se recalcula completo).
+"""
+from pymongo import MongoClient
+
+from config import (
+    MONGODB_URI, MONGO_DATABASE, MONGO_COLLECTION, MONGO_COLLECTION_ROLLUP,
+    asegurar_indices, reconstruir_rollups,
+)
+
+LOTE = 5000
+
+client = MongoClient(MONGODB_URI)
+col = client[MONGO_DATABASE][MONGO_COLLECTION]
+
+filtro = {"gameName_norm": {"$exists": False}}
+pendientes = col.count_documents(filtro)
+print(f"Movimientos sin normalizar: {pendientes}")
+
+# Mismas expresiones que calculaba el $lookup en cada conciliación, una sola vez
+normalizar = [{
+    "$set": {
+        "gameName_norm": {"$toUpper": {"$trim": {"input": {"$ifNull": ["$gameName", ""]}}}},
+        "company_norm": {"$toUpper": {"$trim": {"input": {"$ifNull": ["$company", ""]}}}},
+        "updatedAtUtc5": {"$convert": {"input": "$updatedAt_utc5", "to": "date", "onError": None, "onNull": None}},
+    }
+}]
+
+procesados = 0
+while True:
+    ids = [doc["_id"] for doc in col.find(filtro, {"_id": 1}).limit(LOTE)]
+    if not ids:
+        break
+    col.update_many({"_id": {"$in": ids}}, normalizar)
+    procesados += len(ids)
+    print(f"  {procesados}/{pendientes} ({procesados * 100 // max(pendientes, 1)}%)")
+
+asegurar_indices(col)
+print("Índices idx_conciliacion / idx_rollup listos.")
+
+print("Reconstruyendo movimientos_rollup...")
+reconstruir_rollups(client[MONGO_DATABASE])
+print(f"  ✓ {client[MONGO_DATABASE][MONGO_COLLECTION_ROLLUP].estimated_document_count()} buckets")
+print("Ya se puede conciliar con MODO_CONCILIACION=rollup.")
+
+client.close()
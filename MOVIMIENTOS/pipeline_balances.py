@@ -1,22 +1,53 @@
 import os
 from dotenv import load_dotenv
 import pymongo
+from pymongo import UpdateMany
 import gspread
 from gspread.exceptions import WorksheetNotFound
 from google.oauth2.service_account import Credentials
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
 import uuid
 import sys
 from pathlib import Path
 
 load_dotenv()
 
+# ✅ GRUPOS_COMPANIAS se importa una vez por proceso (antes: en cada ejecutar_pipeline_grupo)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from diccionario import GRUPOS_COMPANIAS
+
 
 # --- MongoDB Config ---
 MONGO_URI = os.getenv('MONGO_URI')
 MONGO_DB = "plataforma_finanzas"
 COL_BALANCES = "balances_bot"
+COL_ROLLUP = "movimientos_rollup"
+
+# "movimientos" (default): suma todo el rango desde movimientos
+# "rollup": buckets completos desde movimientos_rollup + bordes desde movimientos;
+# activar solo después de correr normalizarMovimientos.py (el ingreso incremental
+# solo recalcula los buckets que toca, no rellena el histórico)
+MODO_CONCILIACION = os.getenv('MODO_CONCILIACION', 'movimientos')
+HORA_MS = 60 * 60 * 1000  # tamaño del bucket del rollup (config.ROLLUP_BUCKET)
+
+# Grupos conciliados a la vez (cada uno usa una conexión del pool compartido)
+MAX_GRUPOS_PARALELOS = int(os.getenv('MAX_GRUPOS_PARALELOS', '4'))
+
+_mongo_client = None
+_mongo_lock = threading.Lock()
+
+
+def get_mongo_client():
+    """MongoClient único por proceso: los grupos comparten su pool de conexiones."""
+    global _mongo_client
+    with _mongo_lock:
+        if _mongo_client is None:
+            _mongo_client = pymongo.MongoClient(MONGO_URI, maxPoolSize=max(10, MAX_GRUPOS_PARALELOS * 2))
+        return _mongo_client
 
 
 # --- Google Sheets Config ---
@@ -25,12 +56,141 @@ SERVICE_ACCOUNT_FILE = os.getenv('SERVICE_ACCOUNT_FILE', '../credentials/googleK
 SPREADSHEET_ID = "1caBEqmk6sM6MJfiYyq5BX-Hu0r9BOj8lQtaONHIZWrc"
 SHEET_NAME = "Balances"  # Mantenido por compatibilidad, pero no se usa
 
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+
+def a_fecha(valor):
+    """datetime para comparar con fecha (Date) de balances_bot; acepta 'YYYY-MM-DD HH:MM:SS'."""
+    if isinstance(valor, str):
+        return datetime.strptime(valor, FORMATO_FECHA)
+    return valor
+
+
+def fecha_texto(valor):
+    """fecha de balances_bot como 'YYYY-MM-DD HH:MM:SS' para Sheets/backend."""
+    if isinstance(valor, datetime):
+        return valor.strftime(FORMATO_FECHA)
+    return valor
+
+
+def _lookup_movimientos(companias_norm, desde, hasta, como, incluir_hasta=False):
+    """
+    $lookup de movimientos Approved del website con updatedAtUtc5 en [desde, hasta)
+    ([desde, hasta] con incluir_hasta). Índice idx_conciliacion (gameName_norm,
+    company_norm, status, updatedAtUtc5): igualdad + rango, sin recorrer movimientos.
+    """
+    return {
+        "$lookup": {
+            "from": "movimientos",
+            "localField": "website_norm",
+            "foreignField": "gameName_norm",
+            "let": {"desde": desde, "hasta": hasta},
+            "pipeline": [
+                {
+                    "$match": {
+                        "company_norm": {"$in": companias_norm},
+                        "status": "Approved",
+                        "$expr": {
+                            "$and": [
+                                {"$gte": ["$updatedAtUtc5", "$$desde"]},
+                                {"$lte" if incluir_hasta else "$lt": ["$updatedAtUtc5", "$$hasta"]}
+                            ]
+                        }
+                    }
+                },
+                {"$project": {"_id": 0, "type": 1, "amount": 1}}
+            ],
+            "as": como
+        }
+    }
+
+
+def etapas_movimientos(companias_norm, modo=MODO_CONCILIACION):
+    """
+    Etapas que dejan en movimientos_rango los [{type, amount}] entre
+    fecha_anterior y fecha_actual (ambas inclusive).
+
+    En modo "rollup" el rango se parte en:
+        [fecha_anterior, bucket_desde)  → movimientos (borde inicial)
+        [bucket_desde, bucket_hasta)    → movimientos_rollup (horas completas, amount = sum)
+        [bucket_hasta, fecha_actual]    → movimientos (borde final)
+    así el costo depende de las horas del rango y no de cuántos movimientos tiene.
+    Si el rango no contiene una hora completa todo se lee de movimientos. Sin
+    fecha_anterior (null) el borde inicial queda vacío y los buckets empiezan
+    desde el primero, igual que el $gte contra null del modo "movimientos".
+    """
+    if modo != "rollup":
+        return [_lookup_movimientos(companias_norm, "$fecha_anterior", "$fecha_actual", "movimientos_rango", incluir_hasta=True)]
+
+    return [
+        {
+            "$addFields": {
+                "_inicio_hora": {"$dateTrunc": {"date": "$fecha_anterior", "unit": "hour"}},
+                "_fin_exclusivo": {"$add": ["$fecha_actual", 1]},
+                "_bucket_hasta": {"$dateTrunc": {"date": "$fecha_actual", "unit": "hour"}}
+            }
+        },
+        {
+            "$addFields": {
+                # Primera hora completa: la de fecha_anterior si cae justo en la hora, si no la siguiente
+                "_bucket_desde": {
+                    "$cond": [
+                        {"$eq": ["$_inicio_hora", "$fecha_anterior"]},
+                        "$fecha_anterior",
+                        {"$add": ["$_inicio_hora", HORA_MS]}
+                    ]
+                }
+            }
+        },
+        {
+            "$addFields": {
+                "_con_buckets": {"$lt": ["$_bucket_desde", "$_bucket_hasta"]}
+            }
+        },
+        {
+            "$addFields": {
+                "_borde_inicial_hasta": {"$cond": ["$_con_buckets", "$_bucket_desde", "$_fin_exclusivo"]},
+                "_borde_final_desde": {"$cond": ["$_con_buckets", "$_bucket_hasta", "$_fin_exclusivo"]}
+            }
+        },
+        _lookup_movimientos(companias_norm, "$fecha_anterior", "$_borde_inicial_hasta", "_borde_inicial"),
+        {
+            "$lookup": {
+                "from": COL_ROLLUP,
+                "localField": "website_norm",
+                "foreignField": "gameName_norm",
+                "let": {"desde": "$_bucket_desde", "hasta": "$_bucket_hasta"},
+                "pipeline": [
+                    {
+                        "$match": {
+                            "company_norm": {"$in": companias_norm},
+                            "$expr": {
+                                "$and": [
+                                    {"$gte": ["$bucket", "$$desde"]},
+                                    {"$lt": ["$bucket", "$$hasta"]}
+                                ]
+                            }
+                        }
+                    },
+                    {"$project": {"_id": 0, "type": 1, "amount": "$sum"}}
+                ],
+                "as": "_buckets"
+            }
+        },
+        _lookup_movimientos(companias_norm, "$_borde_final_desde", "$_fin_exclusivo", "_borde_final"),
+        {
+            "$addFields": {
+                "movimientos_rango": {"$concatArrays": ["$_borde_inicial", "$_buckets", "$_borde_final"]}
+            }
+        }
+    ]
+
 
-def crear_pipeline(grupo=None, timestamp_limite=None, grupos_companias=None):
+def crear_pipeline(grupo=None, timestamp_limite=None, grupos_companias=None, modo=MODO_CONCILIACION):
     """Crea la pipeline con filtros opcionales por grupo y timestamp"""
 
-    # Match inicial
-    match_stage = {"used_as_previous": False}
+    # Match inicial (fecha null = inválida en normalizarBalances.py, queda fuera)
+    match_stage = {"used_as_previous": False, "fecha": {"$type": "date"}}
 
     # Agregar filtro por grupo si se especifica
     if grupo:
@@ -38,57 +198,36 @@ def crear_pipeline(grupo=None, timestamp_limite=None, grupos_companias=None):
 
     # Agregar filtro por timestamp si se especifica
     if timestamp_limite:
-        match_stage["fecha"] = {"$lte": timestamp_limite}
+        match_stage["fecha"] = {"$lte": a_fecha(timestamp_limite)}
 
     # ✅ NUEVO: Obtener companias desde dict Python (NO desde MongoDB)
     companias_del_grupo = []
     if grupos_companias and grupo:
         companias_del_grupo = grupos_companias.get(grupo, [])
+    # Misma normalización que company_norm en movimientos (ver config.normalizar)
+    companias_norm = sorted({(c or "").strip().upper() for c in companias_del_grupo})
 
     pipeline = [
         {"$match": match_stage},
+        # ✅ website (title case) y fecha (Date) se guardan normalizados al escribir
+        # (config.enviar_resultado_balance / normalizarBalances.py)
         {
             "$addFields": {
-                "website_title": {
-                    "$reduce": {
-                        "input": {
-                            "$split": [
-                                {"$toLower": {"$trim": {"input": "$website"}}},
-                                " "
-                            ]
-                        },
-                        "initialValue": "",
-                        "in": {
-                            "$concat": [
-                                "$$value",
-                                {"$cond": [{"$eq": ["$$value", ""]}, "", " "]},
-                                {"$toUpper": {"$substrCP": ["$$this", 0, 1]}},
-                                {
-                                    "$substrCP": [
-                                        "$$this",
-                                        1,
-                                        {"$strLenCP": "$$this"}
-                                    ]
-                                }
-                            ]
-                        }
-                    }
-                },
                 # ✅ NUEVO: Agregar companias directo desde Python
                 "companias": companias_del_grupo
             }
         },
-        {"$sort": {"website_title": 1, "username": 1, "fecha": -1}},
+        {"$sort": {"website": 1, "username": 1, "fecha": -1}},
         {
             "$group": {
-                "_id": {"website": "$website_title", "username": "$username"},
+                "_id": {"website": "$website", "username": "$username"},
                 "balances": {
                     "$push": {
                         "_id": "$_id",
                         "fecha": "$fecha",
                         "balance": "$balance",
                         "grupo": "$grupo",
-                        "website": "$website_title",
+                        "website": "$website",
                         "companias": "$companias"  # ✅ Incluir en el push
                     }
                 }
@@ -108,58 +247,13 @@ def crear_pipeline(grupo=None, timestamp_limite=None, grupos_companias=None):
         },
         {
             "$addFields": {
-                "fecha_actual_date": {"$toDate": "$fecha_actual"},
-                "fecha_anterior_date": {"$toDate": "$fecha_anterior"},
                 "website_norm": {"$toUpper": {"$trim": {"input": "$website"}}}
             }
         },
         # ✅ ELIMINADO: Todo el bloque de $lookup a grupos_companias
         # Ya no consultamos MongoDB para obtener companias, vienen de Python
-        {
-            "$lookup": {
-                "from": "movimientos",
-                "let": {
-                    "website_norm": "$website_norm",
-                    "companias": "$companias",
-                    "fechaInicial": "$fecha_anterior_date",
-                    "fechaFinal": "$fecha_actual_date"
-                },
-                "pipeline": [
-                    {
-                        "$addFields": {
-                            "gameName_norm": {"$toUpper": {"$trim": {"input": "$gameName"}}},
-                            "company_norm": {"$toUpper": {"$trim": {"input": "$company"}}},
-                            "updatedAtUtc5": {"$toDate": "$updatedAt_utc5"}
-                        }
-                    },
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    {"$eq": ["$gameName_norm", "$$website_norm"]},
-                                    {
-                                        "$in": [
-                                            "$company_norm",
-                                            {
-                                                "$map": {
-                                                    "input": "$$companias",
-                                                    "as": "c",
-                                                    "in": {"$toUpper": {"$trim": {"input": "$$c"}}}
-                                                }
-                                            }
-                                        ]
-                                    },
-                                    {"$gte": ["$updatedAtUtc5", "$$fechaInicial"]},
-                                    {"$lte": ["$updatedAtUtc5", "$$fechaFinal"]},
-                                    {"$eq": ["$status", "Approved"]}
-                                ]
-                            }
-                        }
-                    }
-                ],
-                "as": "movimientos_rango"
-            }
-        },
+        # ✅ movimientos_rango: [{type, amount}] del rango (ver etapas_movimientos)
+        *etapas_movimientos(companias_norm, modo),
         {
             "$addFields": {
                 "total_sum_add": {
@@ -270,20 +364,71 @@ def crear_pipeline(grupo=None, timestamp_limite=None, grupos_companias=None):
     return pipeline
 
 
+# Igualdad (website, username, used_as_previous) → rango (fecha): marcado por par
+INDICE_MARCADO = [
+    ("website", 1),
+    ("username", 1),
+    ("used_as_previous", 1),
+    ("fecha", 1),
+]
+# Igualdad (grupo, used_as_previous) → rango (fecha): $match inicial de la pipeline
+INDICE_GRUPO = [
+    ("grupo", 1),
+    ("used_as_previous", 1),
+    ("fecha", 1),
+]
+_indices_balances_listos = False
+
+
+def asegurar_indices_balances(col_balances):
+    """Crea (una vez por proceso) los índices de la conciliación y del marcado en balances_bot."""
+    global _indices_balances_listos
+    if not _indices_balances_listos:
+        col_balances.create_index(INDICE_GRUPO, name="idx_grupo")
+        col_balances.create_index(INDICE_MARCADO, name="idx_marcado")
+        _indices_balances_listos = True
+
+
+def marcar_balances_usados(col_balances, results):
+    """
+    Marca used_as_previous en [fecha_anterior, fecha_actual) de cada par con un
+    solo bulk_write de UpdateMany acotados por rango (el servidor resuelve cada
+    uno sobre idx_marcado; sin find por par ni dedupe en Python).
+    Devuelve los modificados, o None si ningún par tiene balance anterior.
+    """
+    operaciones = [
+        UpdateMany(
+            {
+                "website": doc["website"],
+                "username": doc["username"],
+                "used_as_previous": False,
+                "fecha": {
+                    "$gte": doc["fecha_anterior"],  # Desde el anterior (inclusive)
+                    "$lt": doc["fecha_actual"]      # Hasta el actual (exclusive)
+                }
+            },
+            {"$set": {"used_as_previous": True}}
+        )
+        for doc in results
+        if doc.get("fecha_anterior") and doc.get("fecha_actual")
+    ]
+    if not operaciones:
+        return None
+
+    return col_balances.bulk_write(operaciones, ordered=False).modified_count
+
+
 def ejecutar_pipeline_grupo(grupo, timestamp_grupo):
-    """Ejecuta la pipeline para un grupo específico con su timestamp"""
+    """
+    Ejecuta la pipeline para un grupo específico con su timestamp.
+    Devuelve los resultados, o None si la pipeline o el marcado fallaron.
+    """
     print(f"\n  📊 Procesando pipeline para grupo: {grupo}")
     print(f"  ⏰ Usando timestamp límite: {timestamp_grupo}")
 
     try:
-        # ✅ NUEVO: Importar GRUPOS_COMPANIAS desde diccionario.py
-        sys.path.insert(0, str(Path(__file__).parent.parent))
-        from diccionario import GRUPOS_COMPANIAS
-
-        # Conectar a MongoDB
-        client = pymongo.MongoClient(MONGO_URI)
-        db = client[MONGO_DB]
-        col_balances = db[COL_BALANCES]
+        col_balances = get_mongo_client()[MONGO_DB][COL_BALANCES]
+        asegurar_indices_balances(col_balances)
 
         # ✅ MODIFICADO: Pasar GRUPOS_COMPANIAS a la pipeline
         pipeline = crear_pipeline(
@@ -294,46 +439,19 @@ def ejecutar_pipeline_grupo(grupo, timestamp_grupo):
 
         # Ejecutar pipeline
         print(f"  ⏳ Ejecutando pipeline...")
+        inicio = time.perf_counter()
         results = list(col_balances.aggregate(pipeline, allowDiskUse=True))
-        print(f"  ✓ Pipeline ejecutada: {len(results)} documentos para {grupo}")
+        print(f"  ✓ Pipeline ejecutada: {len(results)} documentos para {grupo} ({time.perf_counter() - inicio:.1f}s)")
 
         # ✅ MARCAR TODOS LOS BALANCES ENTRE ANTERIOR Y ACTUAL (EXCLUSIVO ACTUAL)
         if results:
             print(f"  ⏳ Marcando balances intermedios como usados...")
-            balances_a_marcar = []
-
-            for doc in results:
-                website = doc["website"]
-                username = doc["username"]
-                fecha_anterior = doc.get("fecha_anterior")
-                fecha_actual = doc.get("fecha_actual")
-
-                # Si existe balance anterior, marcar todos desde anterior hasta antes del actual
-                if fecha_anterior and fecha_actual:
-                    # Buscar TODOS los balances en ese rango
-                    balances_intermedios = col_balances.find({
-                        "website": website,
-                        "username": username,
-                        "fecha": {
-                            "$gte": fecha_anterior,  # Desde el anterior (inclusive)
-                            "$lt": fecha_actual      # Hasta el actual (exclusive)
-                        },
-                        "used_as_previous": False
-                    })
-
-                    for balance in balances_intermedios:
-                        if balance["_id"] not in balances_a_marcar:
-                            balances_a_marcar.append(balance["_id"])
-
-            # Actualizar en bulk
-            if balances_a_marcar:
-                resultado_update = col_balances.update_many(
-                    {"_id": {"$in": balances_a_marcar}},
-                    {"$set": {"used_as_previous": True}}
-                )
-                print(f"  ✓ Marcados {resultado_update.modified_count} balances (anteriores e intermedios) como usados")
-            else:
+            inicio = time.perf_counter()
+            marcados = marcar_balances_usados(col_balances, results)
+            if marcados is None:
                 print(f"  ℹ No hay balances para marcar (todos son balances iniciales)")
+            else:
+                print(f"  ✓ Marcados {marcados} balances (anteriores e intermedios) como usados ({time.perf_counter() - inicio:.1f}s)")
 
         return results
 
@@ -341,7 +459,8 @@ def ejecutar_pipeline_grupo(grupo, timestamp_grupo):
         print(f"  ❌ Error en pipeline para {grupo}: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        # None (no []): quien llama no debe exportar el grupo (vaciaría su hoja)
+        return None
 
 
 def formatear_para_backend(todos_resultados):
@@ -374,8 +493,8 @@ def formatear_para_backend(todos_resultados):
             "website": (doc.get("website") or "").strip(),
             "username": (doc.get("username") or "").strip(),
 
-            "fechaAnterior": doc.get("fecha_anterior", ""),
-            "fechaActual": doc.get("fecha_actual", ""),
+            "fechaAnterior": fecha_texto(doc.get("fecha_anterior", "")),
+            "fechaActual": fecha_texto(doc.get("fecha_actual", "")),
 
             "balanceAnterior": doc.get("balance_anterior", 0),
             "balanceActual": doc.get("balance_actual", 0),
@@ -398,13 +517,19 @@ def enviar_a_backend(todos_resultados, tiempo_inicio):
     """
     Envía los resultados al sistema de monitoreo
     """
+    # Formatear solo registros con diferencias
+    return enviar_records_a_backend(formatear_para_backend(todos_resultados), len(todos_resultados), tiempo_inicio)
+
+
+def enviar_records_a_backend(records_con_diferencias, total_procesados, tiempo_inicio):
+    """
+    Envía al sistema de monitoreo los registros ya formateados
+    (formatear_para_backend) de una ejecución con total_procesados resultados.
+    """
     import requests
 
     BACKEND_URL = 'https://biological-vanny-balance-monitor-8237935d.koyeb.app'
 
-    # Formatear solo registros con diferencias
-    records_con_diferencias = formatear_para_backend(todos_resultados)
-
     if not records_con_diferencias:
         print("\n📊 No hay registros con diferencias para enviar al sistema de monitoreo.")
         return None
@@ -423,7 +548,7 @@ def enviar_a_backend(todos_resultados, tiempo_inicio):
     print(f"\n{'='*80}")
     print("📤 ENVIANDO AL SISTEMA DE MONITOREO")
     print(f"{'='*80}")
-    print(f"Total de registros procesados: {len(todos_resultados)}")
+    print(f"Total de registros procesados: {total_procesados}")
     print(f"Registros con diferencias: {len(records_con_diferencias)}")
     print(f"Duración de la pipeline: {duracion}s")
 
@@ -475,6 +600,77 @@ def enviar_a_backend(todos_resultados, tiempo_inicio):
         return None
 
 
+# Headers de cada hoja de grupo
+HEADERS_SHEETS = [
+    "website",
+    "username",
+    "grupo",
+    "fecha_actual",
+    "balance_actual",
+    "fecha_anterior",
+    "balance_anterior",
+    "total_sum_add",
+    "total_sum_withdraw",
+    "variacion_esperada",
+    "variacion_real",
+    "diferencia_variacion"
+]
+
+
+def conectar_sheets():
+    """Abre el spreadsheet de resultados."""
+    print("  ⏳ Conectando a Google Sheets...")
+    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
+    gc = gspread.authorize(creds)
+    sh = gc.open_by_key(SPREADSHEET_ID)
+    print("  ✓ Conexión establecida\n")
+    return sh
+
+
+def exportar_grupo_a_sheets(sh, grupo, docs):
+    """Reemplaza la hoja del grupo (la crea si no existe) con sus docs. Devuelve las filas escritas."""
+    nombre_hoja = str(grupo).strip()
+
+    print(f"  🧾 Grupo: '{nombre_hoja}' | Registros: {len(docs)}")
+
+    # Abrir o crear worksheet con el nombre del grupo
+    try:
+        worksheet = sh.worksheet(nombre_hoja)
+        print(f"     ✓ Hoja existente encontrada")
+    except WorksheetNotFound:
+        worksheet = sh.add_worksheet(title=nombre_hoja, rows="2000", cols="20")
+        print(f"     ✓ Nueva hoja creada")
+
+    # Preparar filas para este grupo
+    rows = []
+    for doc in docs:
+        rows.append([
+            doc.get("website", ""),
+            doc.get("username", ""),
+            doc.get("grupo", ""),
+            fecha_texto(doc.get("fecha_actual", "")),
+            doc.get("balance_actual", ""),
+            fecha_texto(doc.get("fecha_anterior", "")),
+            doc.get("balance_anterior", ""),
+            doc.get("total_sum_add", 0),
+            doc.get("total_sum_withdraw", 0),
+            doc.get("variacion_esperada", 0),
+            doc.get("variacion_real", 0),
+            doc.get("diferencia_variacion", 0)
+        ])
+
+    # Limpiar datos existentes (mantiene headers)
+    worksheet.batch_clear(["A2:Z"])
+
+    # Escribir headers y datos
+    worksheet.update("A1", [HEADERS_SHEETS])
+    if rows:
+        worksheet.update("A2", rows)
+
+    print(f"     ✓ Exportados {len(rows)} registros\n")
+    return len(rows)
+
+
 def exportar_a_sheets(todos_resultados):
     """
     Exporta resultados a Google Sheets, agrupando por grupo.
@@ -485,22 +681,6 @@ def exportar_a_sheets(todos_resultados):
     print("\n📊 EXPORTANDO RESULTADOS A GOOGLE SHEETS (POR GRUPO)")
     print("="*80)
 
-    # Preparar headers
-    headers = [
-        "website",
-        "username",
-        "grupo",
-        "fecha_actual",
-        "balance_actual",
-        "fecha_anterior",
-        "balance_anterior",
-        "total_sum_add",
-        "total_sum_withdraw",
-        "variacion_esperada",
-        "variacion_real",
-        "diferencia_variacion"
-    ]
-
     try:
         # Agrupar resultados por grupo
         print("  ⏳ Agrupando resultados por grupo...")
@@ -513,56 +693,12 @@ def exportar_a_sheets(todos_resultados):
 
         print(f"  ✓ {len(resultados_por_grupo)} grupos detectados: {list(resultados_por_grupo.keys())}\n")
 
-        # Conectar a Google Sheets
-        print("  ⏳ Conectando a Google Sheets...")
-        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-        gc = gspread.authorize(creds)
-        sh = gc.open_by_key(SPREADSHEET_ID)
-        print("  ✓ Conexión establecida\n")
+        sh = conectar_sheets()
 
         # Exportar cada grupo a su propia hoja
         total_exportados = 0
         for grupo, docs in resultados_por_grupo.items():
-            nombre_hoja = str(grupo).strip()
-
-            print(f"  🧾 Grupo: '{nombre_hoja}' | Registros: {len(docs)}")
-
-            # Abrir o crear worksheet con el nombre del grupo
-            try:
-                worksheet = sh.worksheet(nombre_hoja)
-                print(f"     ✓ Hoja existente encontrada")
-            except WorksheetNotFound:
-                worksheet = sh.add_worksheet(title=nombre_hoja, rows="2000", cols="20")
-                print(f"     ✓ Nueva hoja creada")
-
-            # Preparar filas para este grupo
-            rows = []
-            for doc in docs:
-                rows.append([
-                    doc.get("website", ""),
-                    doc.get("username", ""),
-                    doc.get("grupo", ""),
-                    doc.get("fecha_actual", ""),
-                    doc.get("balance_actual", ""),
-                    doc.get("fecha_anterior", ""),
-                    doc.get("balance_anterior", ""),
-                    doc.get("total_sum_add", 0),
-                    doc.get("total_sum_withdraw", 0),
-                    doc.get("variacion_esperada", 0),
-                    doc.get("variacion_real", 0),
-                    doc.get("diferencia_variacion", 0)
-                ])
-
-            # Limpiar datos existentes (mantiene headers)
-            worksheet.batch_clear(["A2:Z"])
-
-            # Escribir headers y datos
-            worksheet.update("A1", [headers])
-            if rows:
-                worksheet.update("A2", rows)
-                total_exportados += len(rows)
-
-            print(f"     ✓ Exportados {len(rows)} registros\n")
+            total_exportados += exportar_grupo_a_sheets(sh, grupo, docs)
 
         print(f"✅ Exportación completada: {total_exportados} registros totales en {len(resultados_por_grupo)} hojas.\n")
 
@@ -573,6 +709,67 @@ def exportar_a_sheets(todos_resultados):
         raise
 
 
+def _conciliar_grupo(grupo, timestamp_limite):
+    """ejecutar_pipeline_grupo cronometrado: (resultados, segundos)."""
+    inicio = time.perf_counter()
+    resultados = ejecutar_pipeline_grupo(grupo, timestamp_limite)
+    return resultados, time.perf_counter() - inicio
+
+
+def conciliar_grupos(grupos, tiempo_inicio, timestamp_limite=None, max_paralelo=MAX_GRUPOS_PARALELOS):
+    """
+    Concilia los grupos en paralelo (hasta max_paralelo a la vez, un solo
+    MongoClient) y procesa cada uno apenas termina: su hoja en Sheets y sus
+    registros con diferencias. Solo se acumulan esos registros (no todos los
+    resultados), que se envían juntos al backend al final.
+    El tiempo total lo marca el grupo más lento, no la suma.
+    """
+    records_con_diferencias = []
+    total_procesados = 0
+    tiempos = {}
+    sh = None
+
+    workers = max(1, min(max_paralelo, len(grupos)))
+    print(f"⚙️ {workers} grupos en paralelo\n")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="conciliacion") as executor:
+        futures = {
+            executor.submit(_conciliar_grupo, grupo, timestamp_limite): grupo
+            for grupo in grupos
+        }
+
+        # Sheets/backend desde este thread, a medida que terminan los grupos
+        for future in as_completed(futures):
+            grupo = futures[future]
+            try:
+                resultados, duracion = future.result()
+            except Exception as e:
+                print(f"\n❌ Error procesando grupo {grupo}: {e}\n")
+                continue
+            if resultados is None:
+                print(f"\n⚠️ {grupo} falló: no se exporta a Sheets (se conserva su hoja anterior)\n")
+                continue
+
+            tiempos[grupo] = (len(resultados), duracion)
+            total_procesados += len(resultados)
+            records_con_diferencias.extend(formatear_para_backend(resultados))
+
+            try:
+                if sh is None:
+                    sh = conectar_sheets()
+                exportar_grupo_a_sheets(sh, grupo, resultados)
+            except Exception as e:
+                print(f"\n❌ Error exportando {grupo} a Sheets: {e}\n")
+
+    print(f"\n⏱️ TIEMPOS POR GRUPO")
+    print("="*80)
+    for grupo, (docs, duracion) in sorted(tiempos.items(), key=lambda x: -x[1][1]):
+        print(f"  {grupo:<30} {docs:>6} docs  {duracion:>7.1f}s")
+    print()
+
+    enviar_records_a_backend(records_con_diferencias, total_procesados, tiempo_inicio)
+
+
 if __name__ == "__main__":
     tiempo_inicio = datetime.now()
 
@@ -580,17 +777,15 @@ if __name__ == "__main__":
     print("🚀 INICIANDO PROCESAMIENTO DE BALANCES")
     print("="*80)
 
-    # Conectar a MongoDB para obtener grupos
-    client = pymongo.MongoClient(MONGO_URI)
-    db = client[MONGO_DB]
-    col_balances = db[COL_BALANCES]
+    # Conectar a MongoDB para obtener grupos (mismo cliente que usan los grupos)
+    col_balances = get_mongo_client()[MONGO_DB][COL_BALANCES]
 
     # Obtener grupos únicos
     timestamp_limite_global = None  # Cambiar si necesitas límite de fecha
 
     match = {"used_as_previous": False, "grupo": {"$ne": None, "$ne": ""}}
     if timestamp_limite_global:
-        match["fecha"] = {"$lte": timestamp_limite_global}
+        match["fecha"] = {"$lte": a_fecha(timestamp_limite_global)}
 
     grupos = col_balances.distinct("grupo", match)
     grupos = [g for g in grupos if isinstance(g, str) and g.strip()]
@@ -598,19 +793,8 @@ if __name__ == "__main__":
 
     print(f"\n📌 Grupos detectados: {grupos}\n")
 
-    # Ejecutar pipeline para cada grupo y acumular todos los resultados
-    todos_resultados = []
-
-    for grupo in grupos:
-        timestamp_grupo = timestamp_limite_global
-        resultados = ejecutar_pipeline_grupo(grupo, timestamp_grupo)
-        todos_resultados.extend(resultados)
-
-    # Exportar todos los resultados (la función internamente los agrupa por grupo)
-    exportar_a_sheets(todos_resultados)
-
-    # Enviar al sistema de monitoreo
-    enviar_a_backend(todos_resultados, tiempo_inicio)
+    # Conciliar grupos en paralelo (exporta y acumula diferencias por grupo)
+    conciliar_grupos(grupos, tiempo_inicio, timestamp_limite_global)
 
     print("="*80)
     print("✅ PROCESO COMPLETADO")
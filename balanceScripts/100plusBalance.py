@@ -7,6 +7,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import WebDriverException
 from datetime import datetime
 import config
+import contexto
 
 WEBSITE_NAME = "100 PLUS"
 MAX_LOGIN_RETRIES = 5
@@ -111,9 +112,11 @@ def main():
     driver = None
     try:
         for cuenta in site["accounts"]:
+            contexto.establecer(cuenta=cuenta["usuario"])
             # SOLO usa el second_password si está en la cuenta
             second_password = cuenta["password2"] if "password2" in cuenta else None
             for intento in range(MAX_LOGIN_RETRIES):
+                contexto.establecer(intento=intento + 1)
                 try:
                     if driver is None or not getattr(driver, "session_id", None):
                         if driver:
@@ -148,4 +151,5 @@ def main():
             driver.quit()
 
 if __name__ == "__main__":
-    main()
+    with contexto.ejecucion(website=WEBSITE_NAME):
+        main()
@@ -8,6 +8,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import WebDriverException
 from datetime import datetime
 import config
+import contexto
 
 WEBSITE_NAME = "BLUE DRAGON"
 MAX_LOGIN_RETRIES = 5
@@ -75,7 +76,9 @@ def main():
     driver = None
     try:
         for cuenta in site["accounts"]:
+            contexto.establecer(cuenta=cuenta["usuario"])
             for intento in range(MAX_LOGIN_RETRIES):
+                contexto.establecer(intento=intento + 1)
                 try:
                     if driver is None or not getattr(driver, "session_id", None):
                         if driver:
@@ -110,4 +113,5 @@ def main():
             driver.quit()
 
 if __name__ == "__main__":
-    main()
+    with contexto.ejecucion(website=WEBSITE_NAME):
+        main()
@@ -0,0 +1,165 @@
+"""
+Cliente asíncrono de 2captcha.
+
+- Un event loop asyncio en un thread de fondo atiende todos los captchas del
+  proceso: varios sitios pueden tener captchas en vuelo a la vez sin un
+  thread bloqueado en sleep() por cada uno
+- Polling adaptativo: primera consulta a los POLL_INICIAL s (2captcha no
+  resuelve antes) y luego intervalos cortos que crecen de a poco
+- reportbad / reportgood: el resultado del login se informa a 2captcha
+  (reportbad devuelve el costo de soluciones incorrectas)
+- TWOCAPTCHA_BASE_URL permite apuntar a un servidor stub local para pruebas
+- Usa aiohttp si está instalado; si no, requests dentro de un executor
+
+Uso (síncrono, desde los workers):
+    solucion, captcha_id = resolver(image_bytes, "captcha.png")
+    reportar(captcha_id, ok=False)
+"""
+import os
+import asyncio
+import threading
+
+import requests
+
+import config
+
+TWOCAPTCHA_BASE_URL = os.getenv('TWOCAPTCHA_BASE_URL', 'http://2captcha.com').rstrip('/')
+TWOCAPTCHA_TIMEOUT = int(os.getenv('TWOCAPTCHA_TIMEOUT', '90'))
+TWOCAPTCHA_MAX_EN_VUELO = int(os.getenv('TWOCAPTCHA_MAX_EN_VUELO', '20'))
+POLL_INICIAL = 5.0
+POLL_INTERVALOS = (2.0, 2.0, 3.0, 3.0, 5.0)
+HTTP_TIMEOUT = 30
+
+logger = config.get_logger("2captcha")
+
+_loop = None
+_loop_lock = threading.Lock()
+_semaforo = None
+_http = None
+
+
+def _get_loop():
+    """Event loop de fondo (lazy, un thread daemon por proceso)."""
+    global _loop, _semaforo
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="2captcha-loop", daemon=True).start()
+            _semaforo = asyncio.run_coroutine_threadsafe(_crear_semaforo(), loop).result()
+            _loop = loop
+        return _loop
+
+
+async def _crear_semaforo():
+    return asyncio.Semaphore(TWOCAPTCHA_MAX_EN_VUELO)
+
+
+# ----------------------------
+# Transporte HTTP (aiohttp o requests)
+# ----------------------------
+async def _get_http():
+    global _http
+    if _http is None:
+        try:
+            import aiohttp
+            _http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT))
+        except ImportError:
+            logger.info("[2CAPTCHA] aiohttp no instalado → requests en executor")
+            _http = False
+    return _http
+
+
+async def _post_imagen(image_bytes, nombre):
+    datos = {'key': config.API_KEY_2CAPTCHA, 'method': 'post', 'json': '1'}
+    url = f"{TWOCAPTCHA_BASE_URL}/in.php"
+    http = await _get_http()
+    if http:
+        import aiohttp
+        form = aiohttp.FormData(datos)
+        form.add_field('file', image_bytes, filename=nombre, content_type='image/png')
+        async with http.post(url, data=form) as resp:
+            return await resp.json(content_type=None)
+
+    def enviar():
+        files = {'file': (nombre, image_bytes, 'image/png')}
+        return requests.post(url, files=files, data=datos, timeout=HTTP_TIMEOUT).json()
+
+    return await asyncio.get_running_loop().run_in_executor(None, enviar)
+
+
+async def _get_res(params):
+    params = dict(params, key=config.API_KEY_2CAPTCHA, json='1')
+    url = f"{TWOCAPTCHA_BASE_URL}/res.php"
+    http = await _get_http()
+    if http:
+        async with http.get(url, params=params) as resp:
+            return await resp.json(content_type=None)
+
+    def consultar():
+        return requests.get(url, params=params, timeout=HTTP_TIMEOUT).json()
+
+    return await asyncio.get_running_loop().run_in_executor(None, consultar)
+
+
+# ----------------------------
+# Flujo
+# ----------------------------
+async def _resolver(image_bytes, nombre, timeout):
+    async with _semaforo:
+        resp = await _post_imagen(image_bytes, nombre)
+        if resp.get('status') != 1:
+            logger.error(f"[2CAPTCHA] Respuesta inválida: {resp}")
+            return None, None
+        captcha_id = resp['request']
+
+        loop = asyncio.get_running_loop()
+        limite = loop.time() + timeout
+        espera = POLL_INICIAL
+        intento = 0
+        while loop.time() + espera < limite:
+            await asyncio.sleep(espera)
+            res = await _get_res({'action': 'get', 'id': captcha_id})
+            if res.get('status') == 1:
+                return res['request'], captcha_id
+            if res.get('request') != 'CAPCHA_NOT_READY':
+                logger.error(f"[2CAPTCHA] Error: {res.get('request')}")
+                return None, captcha_id
+            espera = POLL_INTERVALOS[min(intento, len(POLL_INTERVALOS) - 1)]
+            intento += 1
+
+        logger.warning("[2CAPTCHA] Timeout")
+        return None, captcha_id
+
+
+def resolver(image_bytes, nombre='captcha.png', timeout=TWOCAPTCHA_TIMEOUT):
+    """
+    Envía el captcha y espera la solución (bloquea solo al thread que llama).
+
+    Returns:
+        tuple: (solucion o None, captcha_id o None)
+    """
+    loop = _get_loop()
+    future = asyncio.run_coroutine_threadsafe(_resolver(image_bytes, nombre, timeout), loop)
+    try:
+        return future.result(timeout=timeout + HTTP_TIMEOUT)
+    except Exception as e:
+        future.cancel()
+        logger.error(f"[2CAPTCHA] Error: {e}")
+        return None, None
+
+
+async def _reportar(captcha_id, ok):
+    try:
+        await _get_res({'action': 'reportgood' if ok else 'reportbad', 'id': captcha_id})
+    except Exception as e:
+        if config.VERBOSE_LOGGING:
+            logger.debug(f"[2CAPTCHA] No se pudo reportar {captcha_id}: {e}")
+
+
+def reportar(captcha_id, ok):
+    """Informa a 2captcha si la solución funcionó (no bloquea)."""
+    if not captcha_id:
+        return
+    asyncio.run_coroutine_threadsafe(_reportar(captcha_id, ok), _get_loop())
+    if not ok:
+        logger.info(f"[2CAPTCHA] reportbad enviado ({captcha_id})")
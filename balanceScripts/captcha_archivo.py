@@ -0,0 +1,111 @@
+"""
+Archivador de captchas en segundo plano (dataset para reentrenar los modelos).
+
+La resolución del captcha trabaja solo en memoria; las imágenes se escriben
+a disco desde este thread, en lotes, fuera del camino del login:
+
+- Captcha confirmado (login exitoso) → captchas/<SITIO>/<solucion>.png
+  (o <solucion>_1.png, _2.png... si ya existe, igual que antes)
+- Captcha sin confirmar → captchas/<SITIO>/<prefijo>_<fecha>_<ms>_<uuid>.png,
+  nombre único aunque varios sitios resuelvan en el mismo segundo
+- Las rutas se reservan con open(..., 'xb'), así dos procesos nunca pisan
+  el mismo archivo
+- Con `indice`, cada lote agrega sus entradas a captchas/index.jsonl en una
+  sola escritura (append-only: un registro JSON por imagen archivada)
+"""
+import os
+import json
+import time
+import uuid
+import atexit
+import threading
+
+import config
+from escritor_lotes import EscritorEnLotes
+
+ARCHIVO_BATCH_SIZE = 20
+ARCHIVO_FLUSH_INTERVAL = 2.0
+ARCHIVO_INDICE = os.path.join(config.CAPTCHA_FOLDER, "index.jsonl")
+
+logger = config.get_logger("captcha_archivo")
+
+
+def nombre_unico(prefijo, extension=".png"):
+    """<prefijo>_<YYYYmmdd_HHMMSS>_<ms>_<uuid6>.png"""
+    ahora = time.time()
+    marca = time.strftime("%Y%m%d_%H%M%S", time.localtime(ahora))
+    return f"{prefijo}_{marca}_{int(ahora * 1000) % 1000:03d}_{uuid.uuid4().hex[:6]}{extension}"
+
+
+class ArchivadorCaptchas(EscritorEnLotes):
+    """
+    Escribe imágenes en lotes desde el thread del escritor.
+    `data` puede ser bytes (PNG original) o una imagen PIL (se guarda en el thread).
+    """
+
+    def __init__(self, batch_size=ARCHIVO_BATCH_SIZE, flush_interval=ARCHIVO_FLUSH_INTERVAL):
+        super().__init__("ArchivadorCaptchas", batch_size, flush_interval)
+
+    def guardar(self, carpeta, data, nombre=None, etiqueta=None, indice=None):
+        """
+        Encola una imagen. Con `etiqueta` se nombra <etiqueta>.png (dataset);
+        si no, se usa `nombre` tal cual. `indice` (dict) se agrega a index.jsonl
+        con la ruta final del archivo.
+        """
+        self._encolar((carpeta, data, nombre, etiqueta, indice))
+
+    def _reservar(self, carpeta, nombre, etiqueta):
+        """Abre en modo exclusivo la primera ruta libre."""
+        if not etiqueta:
+            return open(os.path.join(carpeta, nombre), "xb")
+        contador = 0
+        while True:
+            candidato = f"{etiqueta}.png" if contador == 0 else f"{etiqueta}_{contador}.png"
+            try:
+                return open(os.path.join(carpeta, candidato), "xb")
+            except FileExistsError:
+                contador += 1
+
+    def _procesar(self, batch):
+        lineas = []
+        for carpeta, data, nombre, etiqueta, indice in batch:
+            try:
+                os.makedirs(carpeta, exist_ok=True)
+                with self._reservar(carpeta, nombre, etiqueta) as f:
+                    if isinstance(data, (bytes, bytearray)):
+                        f.write(data)
+                    else:
+                        data.save(f, format="PNG")
+                    ruta = f.name
+            except Exception as e:
+                logger.error(f"[CAPTCHA] Error archivando {etiqueta or nombre}: {e}")
+                continue
+            if indice is not None:
+                entrada = dict(indice, archivo=os.path.relpath(ruta, config.CAPTCHA_FOLDER))
+                lineas.append(json.dumps(entrada, ensure_ascii=False) + "\n")
+        if lineas:
+            self._agregar_indice(lineas)
+        if config.VERBOSE_LOGGING:
+            logger.debug(f"[CAPTCHA] {len(batch)} imágenes archivadas")
+
+    def _agregar_indice(self, lineas):
+        """Un solo write en modo append por lote (líneas completas, sin intercalar)."""
+        try:
+            os.makedirs(os.path.dirname(ARCHIVO_INDICE), exist_ok=True)
+            with open(ARCHIVO_INDICE, "a", encoding="utf-8") as f:
+                f.write("".join(lineas))
+        except Exception as e:
+            logger.error(f"[CAPTCHA] Error escribiendo índice ({len(lineas)} entradas): {e}")
+
+
+_archivador = None
+_archivador_lock = threading.Lock()
+
+
+def get_archivador():
+    global _archivador
+    with _archivador_lock:
+        if _archivador is None:
+            _archivador = ArchivadorCaptchas()
+            atexit.register(_archivador.cerrar)
+        return _archivador
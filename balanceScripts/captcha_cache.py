@@ -0,0 +1,98 @@
+"""
+Cache de soluciones de captcha confirmadas, por hash perceptual de la imagen.
+
+Algunos sitios sirven el mismo captcha en cada recarga de la sesión, y los
+reintentos de login vuelven a resolver imágenes idénticas. Si la imagen ya se
+resolvió y el login funcionó, la solución se reutiliza sin pasar por el modelo
+ni por 2captcha.
+
+- Clave: (website, dHash de 384 bits). El dHash es estable frente a
+  diferencias de compresión/re-encode del screenshot
+- LRU con TTL: CAPTCHA_CACHE_MAX entradas, CAPTCHA_CACHE_TTL segundos
+- Solo entran soluciones confirmadas (balance registrado); una solución del
+  cache que falla en el login se invalida
+- Métricas de hits/misses en estadisticas() y en el log cada 50 consultas
+"""
+import io
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+import config
+
+CAPTCHA_CACHE_ENABLED = os.getenv('CAPTCHA_CACHE_ENABLED', '1') == '1'
+CAPTCHA_CACHE_MAX = int(os.getenv('CAPTCHA_CACHE_MAX', '2000'))
+CAPTCHA_CACHE_TTL = int(os.getenv('CAPTCHA_CACHE_TTL', str(6 * 3600)))
+
+logger = config.get_logger("captcha_cache")
+
+# (website, hash) -> (solucion, ts)
+_cache = OrderedDict()
+_lock = threading.Lock()
+_metricas = {"hits": 0, "misses": 0, "invalidados": 0}
+
+
+def dhash(image_bytes, ancho=32, alto=12):
+    """
+    Difference hash: compara cada píxel con su vecino derecho en la imagen
+    reducida a (ancho+1) x alto. Se usa una rejilla más ancha que la clásica 8x8
+    (captchas ~4:1) para que captchas distintos no colisionen.
+    """
+    img = Image.open(io.BytesIO(image_bytes)).convert('L').resize((ancho + 1, alto), Image.BILINEAR)
+    pixeles = list(img.getdata())
+    valor = 0
+    for fila in range(alto):
+        base = fila * (ancho + 1)
+        for col in range(ancho):
+            valor = (valor << 1) | (pixeles[base + col] > pixeles[base + col + 1])
+    return f"{valor:0{ancho * alto // 4}x}"
+
+
+def buscar(website_name, hash_imagen):
+    """Solución confirmada para esta imagen, o None."""
+    if not CAPTCHA_CACHE_ENABLED or not hash_imagen:
+        return None
+    clave = (website_name, hash_imagen)
+    with _lock:
+        entrada = _cache.get(clave)
+        if entrada and time.time() - entrada[1] > CAPTCHA_CACHE_TTL:
+            del _cache[clave]
+            entrada = None
+        if entrada:
+            _cache.move_to_end(clave)
+            _metricas["hits"] += 1
+        else:
+            _metricas["misses"] += 1
+        consultas = _metricas["hits"] + _metricas["misses"]
+    if consultas % 50 == 0:
+        logger.info(f"[CACHE] {estadisticas()}")
+    return entrada[0] if entrada else None
+
+
+def guardar(website_name, hash_imagen, solucion):
+    if not CAPTCHA_CACHE_ENABLED or not hash_imagen or not solucion:
+        return
+    with _lock:
+        _cache[(website_name, hash_imagen)] = (solucion, time.time())
+        _cache.move_to_end((website_name, hash_imagen))
+        while len(_cache) > CAPTCHA_CACHE_MAX:
+            _cache.popitem(last=False)
+
+
+def invalidar(website_name, hash_imagen):
+    with _lock:
+        if _cache.pop((website_name, hash_imagen), None) is not None:
+            _metricas["invalidados"] += 1
+
+
+def estadisticas():
+    with _lock:
+        consultas = _metricas["hits"] + _metricas["misses"]
+        return dict(
+            _metricas,
+            entradas=len(_cache),
+            hit_rate=round(_metricas["hits"] / consultas, 3) if consultas else 0.0,
+        )
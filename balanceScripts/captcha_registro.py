@@ -0,0 +1,170 @@
+"""
+Registro de captchas resueltos pendientes de confirmación (etiquetado del dataset).
+
+Cada solución se registra con la clave (website, cuenta, intento) del contexto
+de ejecución, así varias cuentas del mismo sitio en paralelo no se pisan:
+
+- Balance registrado para (website, cuenta) → el captcha se confirma
+  ("ok"): se archiva como <solucion>.png
+- El sitio rechazó el código (mensaje reconocido por es_rechazo()) → "fallo":
+  solo entonces se invalida el cache, se hace reportbad y baja el umbral
+- Nuevo captcha para la misma (website, cuenta) o pendiente más viejo que
+  CAPTCHA_PENDIENTE_TTL → el anterior queda "indeterminado" (el login pudo
+  fallar por otra causa: red, balance ilegible, fallback HTTP → Selenium) y
+  no cuenta para cache/2captcha/umbrales
+- Al salir del proceso, lo que siga pendiente queda "sin_confirmar"
+
+Cada captcha archivado agrega una línea a captchas/index.jsonl (append-only,
+escrita en bloque por el archivador): archivo, predicción, confianza, fuente,
+versión del modelo y resultado.
+"""
+import os
+import re
+import time
+import atexit
+import threading
+
+import config
+import contexto
+
+CAPTCHA_PENDIENTE_TTL = int(os.getenv('CAPTCHA_PENDIENTE_TTL', '600'))
+
+logger = config.get_logger("captcha_registro")
+
+# Avisos con que los paneles rechazan el código (alert de ASP.NET, el-message de Element-UI)
+_RE_RECHAZO = re.compile(r"verif\w*\s*code|check\s*code|validat\w*\s*code|captcha|验证码", re.IGNORECASE)
+
+
+def es_rechazo(mensaje):
+    """El aviso del sitio tras un login fallido se refiere al código del captcha."""
+    return bool(mensaje and _RE_RECHAZO.search(mensaje))
+
+
+def _indice(captcha, resultado):
+    """Entrada de captchas/index.jsonl (la ruta la completa el archivador)."""
+    website, cuenta, intento = captcha.get('clave') or (None, None, None)
+    return {
+        "ts": config.get_current_timestamp(),
+        "website": website,
+        "cuenta": cuenta,
+        "intento": intento,
+        "prediccion": captcha.get('solution'),
+        "confianza": round(captcha['confianza'], 4) if captcha.get('confianza') is not None else None,
+        "fuente": captcha.get('fuente'),
+        "modelo": captcha.get('modelo'),
+        "resultado": resultado,
+    }
+
+
+def archivar(captcha, resultado):
+    """Encola imagen + entrada de índice. Solo los "ok" se nombran con su solución."""
+    import captcha_archivo
+
+    captcha_archivo.get_archivador().guardar(
+        captcha['carpeta'], captcha['bytes'], nombre=captcha['nombre'],
+        etiqueta=captcha.get('solution') if resultado == "ok" else None,
+        indice=_indice(captcha, resultado),
+    )
+
+
+def _resultado_login(website_name, captcha, ok):
+    """
+    Resultado del login: alimenta el cache de soluciones, ajusta umbrales (modelo)
+    y hace reportgood/reportbad (2captcha).
+    """
+    import captcha_cache
+
+    if ok:
+        captcha_cache.guardar(website_name, captcha.get('hash'), captcha['solution'])
+    else:
+        captcha_cache.invalidar(website_name, captcha.get('hash'))
+    if captcha.get('id_2captcha'):
+        import captcha_2captcha
+
+        captcha_2captcha.reportar(captcha['id_2captcha'], ok)
+    if captcha.get('confianza') is not None:
+        import captcha_umbral
+
+        captcha_umbral.registrar_resultado(website_name, captcha['confianza'], ok)
+
+
+class RegistroCaptchas:
+    """Pendientes por (website, cuenta, intento), thread-safe."""
+
+    def __init__(self, ttl=CAPTCHA_PENDIENTE_TTL):
+        self.ttl = ttl
+        self._pendientes = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, website_name, captcha, solucion, **datos):
+        """Guarda la solución enviada; los pendientes previos de la misma cuenta quedan indeterminados."""
+        ctx = contexto.actual()
+        clave = (website_name, ctx.cuenta, ctx.intento)
+        captcha = dict(captcha, solution=solucion, clave=clave, ts=time.time(), **datos)
+
+        with self._lock:
+            anteriores = [
+                self._pendientes.pop(k) for k in list(self._pendientes)
+                if k[:2] == clave[:2] or time.time() - self._pendientes[k]['ts'] > self.ttl
+            ]
+            self._pendientes[clave] = captcha
+
+        for anterior in anteriores:
+            archivar(anterior, "indeterminado")
+        if config.VERBOSE_LOGGING:
+            logger.debug(f"[CAPTCHA] Registrado: {clave} → {solucion}")
+
+    def _tomar(self, website_name, cuenta):
+        """Saca los pendientes de (website, cuenta), del más viejo al más nuevo."""
+        if cuenta is None:
+            cuenta = contexto.actual().cuenta
+        with self._lock:
+            claves = [k for k in self._pendientes if k[0] == website_name and k[1] == cuenta]
+            tomados = [self._pendientes.pop(k) for k in claves]
+        tomados.sort(key=lambda c: c['ts'])
+        return tomados
+
+    def confirmar(self, website_name, cuenta=None):
+        """Balance registrado: confirma el último captcha de (website, cuenta)."""
+        tomados = self._tomar(website_name, cuenta)
+        for captcha in tomados[:-1]:
+            archivar(captcha, "indeterminado")
+        if tomados:
+            self._cerrar(tomados[-1], ok=True)
+
+    def rechazar(self, website_name, cuenta=None):
+        """El sitio rechazó el código: el último captcha de (website, cuenta) falló."""
+        tomados = self._tomar(website_name, cuenta)
+        for captcha in tomados[:-1]:
+            archivar(captcha, "indeterminado")
+        if tomados:
+            self._cerrar(tomados[-1], ok=False)
+
+    def _cerrar(self, captcha, ok):
+        archivar(captcha, "ok" if ok else "fallo")
+        _resultado_login(captcha['clave'][0], captcha, ok)
+
+    def cerrar(self):
+        """Al salir: lo pendiente se archiva sin etiqueta (resultado desconocido)."""
+        with self._lock:
+            pendientes = list(self._pendientes.values())
+            self._pendientes.clear()
+        for captcha in pendientes:
+            archivar(captcha, "sin_confirmar")
+
+
+_registro = None
+_registro_lock = threading.Lock()
+
+
+def get_registro():
+    global _registro
+    with _registro_lock:
+        if _registro is None:
+            import captcha_archivo
+
+            # atexit es LIFO: el archivador se crea (y registra) antes, así cierra después
+            captcha_archivo.get_archivador()
+            _registro = RegistroCaptchas()
+            atexit.register(_registro.cerrar)
+        return _registro
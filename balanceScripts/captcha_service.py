@@ -0,0 +1,116 @@
+"""
+Servicio de inferencia de captchas (uno por grupo de CAPTCHA_CONFIG).
+
+- El modelo queda residente: se carga una vez, se "calienta" con un batch
+  vacío y nunca se llama a clear_session()
+- Un solo thread por modelo ejecuta las predicciones; los workers de los
+  sitios encolan imágenes ya preprocesadas y esperan un Future
+- Micro-batching: las requests que llegan dentro de CAPTCHA_BATCH_WINDOW
+  segundos se apilan y se resuelven con una sola llamada al modelo
+- Timeout por request sin matar la sesión: si vence, la request se cancela
+  (si aún no entró a un batch) y el servicio sigue atendiendo a los demás
+"""
+import os
+import threading
+from queue import Queue, Empty
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+
+import config
+
+CAPTCHA_MAX_BATCH = int(os.getenv('CAPTCHA_MAX_BATCH', '16'))
+CAPTCHA_BATCH_WINDOW = float(os.getenv('CAPTCHA_BATCH_WINDOW', '0.02'))
+
+logger = config.get_logger("captcha_service")
+
+
+class ServicioCaptcha:
+    """
+    Modelo residente + cola de predicciones con micro-batching.
+    El modelo puede ser Keras, ONNX o TFLite (ver config.cargar_modelo_keras);
+    el intérprete TFLite no es thread-safe, así que solo este thread lo invoca.
+    """
+
+    def __init__(self, grupo_id, model_data, max_batch=CAPTCHA_MAX_BATCH, ventana=CAPTCHA_BATCH_WINDOW):
+        self.grupo_id = grupo_id
+        self._predict = model_data['predict']
+        self.runtime = model_data.get('runtime', 'keras')
+        self.config_grupo = model_data['config']
+        self.max_batch = max(1, max_batch)
+        self.ventana = ventana
+        self._cola = Queue()
+        self.predicciones = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._loop, name=f"captcha-{grupo_id}", daemon=True)
+        self._calentar()
+        self._thread.start()
+
+    def _calentar(self):
+        """Primera predicción fuera del camino crítico (construye el grafo)."""
+        try:
+            shape = (1, self.config_grupo['img_width'], self.config_grupo['img_height'], 1)
+            self._predict(np.zeros(shape, dtype=np.float32))
+        except Exception as e:
+            logger.warning(f"[CAPTCHA-SVC] Warm-up {self.grupo_id} falló: {e}")
+
+    def predecir(self, img_array, timeout=config.KERAS_PREDICT_TIMEOUT):
+        """
+        Predice una imagen (shape (W, H, 1) o (1, W, H, 1)).
+
+        Returns:
+            np.ndarray con la salida del modelo para esa imagen, shape (1, T, C)
+
+        Raises:
+            TimeoutError si no se resolvió en `timeout` segundos
+        """
+        if img_array.ndim == 4:
+            img_array = img_array[0]
+        future = Future()
+        self._cola.put((img_array, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError(f"Predicción {self.grupo_id} excedió {timeout}s")
+
+    def _loop(self):
+        while True:
+            pendientes = [self._cola.get()]
+            # Ventana corta para juntar requests concurrentes de otros sitios
+            while len(pendientes) < self.max_batch:
+                try:
+                    pendientes.append(self._cola.get(timeout=self.ventana))
+                except Empty:
+                    break
+
+            # Descartar las que ya vencieron/cancelaron
+            activas = [(img, fut) for img, fut in pendientes if fut.set_running_or_notify_cancel()]
+            if not activas:
+                continue
+
+            try:
+                batch = np.stack([img for img, _ in activas]).astype(np.float32, copy=False)
+                salida = np.asarray(self._predict(batch))
+                self.predicciones += len(activas)
+                self.batches += 1
+                for i, (_, fut) in enumerate(activas):
+                    fut.set_result(salida[i:i + 1])
+            except Exception as e:
+                for _, fut in activas:
+                    fut.set_exception(e)
+
+
+_servicios = {}
+_servicios_lock = threading.Lock()
+
+
+def get_servicio(grupo_id):
+    """Servicio del grupo (lazy). Devuelve None si el modelo no se pudo cargar."""
+    with _servicios_lock:
+        if grupo_id not in _servicios:
+            model_data = config.cargar_modelo_keras(grupo_id)
+            if model_data is None:
+                return None
+            _servicios[grupo_id] = ServicioCaptcha(grupo_id, model_data)
+        return _servicios[grupo_id]
@@ -0,0 +1,118 @@
+"""
+Umbrales de confianza por website para las predicciones del modelo captcha.
+
+Una predicción con confianza menor al umbral del sitio no se envía al login:
+se pide otra imagen (si el sitio lo permite) o se escala a 2captcha.
+
+Los umbrales se ajustan solos con el historial de resultados de cada sitio
+(confianza de la predicción + si el login funcionó), guardado en
+captcha_umbrales.json:
+
+- Con menos de CAPTCHA_MIN_MUESTRAS resultados se usa CAPTCHA_UMBRAL_INICIAL
+- Luego, el umbral es la menor confianza con la que los captchas de ese sitio
+  aciertan al menos CAPTCHA_PRECISION_OBJETIVO de las veces
+- Una fracción pequeña (CAPTCHA_EXPLORACION) de predicciones bajo el umbral se
+  envía igual, para que el historial también cubra esa zona y el umbral
+  pueda bajar si el modelo mejora
+
+La confianza es la del carácter decodificado menos seguro
+(config.calcular_confianza_prediccion). El historial guardado con otra
+métrica (METRICA_CONFIANZA distinta) se descarta al cargar.
+"""
+import os
+import json
+import random
+import threading
+
+import config
+
+UMBRAL_FILE = os.path.join(config.BASE_FOLDER, "captcha_umbrales.json")
+
+CAPTCHA_UMBRAL_INICIAL = float(os.getenv('CAPTCHA_UMBRAL_INICIAL', '0.5'))
+CAPTCHA_UMBRAL_MIN = 0.3
+CAPTCHA_UMBRAL_MAX = 0.95
+CAPTCHA_PRECISION_OBJETIVO = float(os.getenv('CAPTCHA_PRECISION_OBJETIVO', '0.9'))
+CAPTCHA_EXPLORACION = float(os.getenv('CAPTCHA_EXPLORACION', '0.05'))
+CAPTCHA_MIN_MUESTRAS = 30
+HISTORIAL_MAX = 300
+# Cambia si cambia cómo se calcula la confianza: los historiales viejos no son comparables
+METRICA_CONFIANZA = "min_caracter"
+
+logger = config.get_logger("captcha_umbral")
+
+# website -> {"umbral": float, "historial": [[confianza, ok], ...]}
+_estado = None
+_lock = threading.Lock()
+
+
+def _cargar():
+    global _estado
+    if _estado is None:
+        try:
+            with open(UMBRAL_FILE, encoding="utf-8") as f:
+                _estado = json.load(f)
+        except (OSError, ValueError):
+            _estado = {}
+        _estado = {
+            website: datos for website, datos in _estado.items()
+            if datos.get("metrica") == METRICA_CONFIANZA
+        }
+    return _estado
+
+
+def _guardar():
+    """Escribe el estado completo (llamar con _lock tomado)."""
+    tmp_path = UMBRAL_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_estado, f)
+        os.replace(tmp_path, UMBRAL_FILE)
+    except OSError as e:
+        logger.warning(f"[UMBRAL] No se pudo guardar {UMBRAL_FILE}: {e}")
+
+
+def _recalcular(historial):
+    """Menor confianza c tal que los captchas con confianza >= c aciertan >= objetivo."""
+    if len(historial) < CAPTCHA_MIN_MUESTRAS:
+        return CAPTCHA_UMBRAL_INICIAL
+
+    umbral = CAPTCHA_UMBRAL_MAX
+    aciertos = 0
+    for n, (confianza, ok) in enumerate(sorted(historial, key=lambda x: -x[0]), start=1):
+        aciertos += 1 if ok else 0
+        if n >= CAPTCHA_MIN_MUESTRAS // 3 and aciertos / n >= CAPTCHA_PRECISION_OBJETIVO:
+            umbral = confianza
+    return min(CAPTCHA_UMBRAL_MAX, max(CAPTCHA_UMBRAL_MIN, umbral))
+
+
+def umbral(website_name):
+    """Umbral de confianza actual del sitio."""
+    with _lock:
+        datos = _cargar().get(website_name or "")
+        return datos["umbral"] if datos else CAPTCHA_UMBRAL_INICIAL
+
+
+def aceptar(website_name, confianza):
+    """¿Se envía esta predicción? (umbral del sitio + exploración ocasional)."""
+    if confianza >= umbral(website_name):
+        return True
+    return random.random() < CAPTCHA_EXPLORACION
+
+
+def registrar_resultado(website_name, confianza, ok):
+    """Agrega el resultado de un login con captcha del modelo y reajusta el umbral."""
+    if not website_name or confianza is None:
+        return
+    with _lock:
+        estado = _cargar()
+        datos = estado.setdefault(
+            website_name, {"umbral": CAPTCHA_UMBRAL_INICIAL, "historial": [], "metrica": METRICA_CONFIANZA}
+        )
+        datos["historial"].append([round(float(confianza), 4), bool(ok)])
+        del datos["historial"][:-HISTORIAL_MAX]
+
+        anterior = datos["umbral"]
+        datos["umbral"] = round(_recalcular(datos["historial"]), 4)
+        if abs(datos["umbral"] - anterior) >= 0.01:
+            logger.info(f"[UMBRAL] {website_name}: {anterior:.2f} → {datos['umbral']:.2f}")
+        _guardar()
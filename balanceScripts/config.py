@@ -3,25 +3,9 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 
 
-# ✅ SETUP CUDA 11 ANTES DE IMPORTAR TENSORFLOW
-import site
-for sp in site.getsitepackages():
-    nvidia_path = os.path.join(sp, 'nvidia')
-    if os.path.exists(nvidia_path):
-        for subdir in os.listdir(nvidia_path):
-            bin_path = os.path.join(nvidia_path, subdir, 'bin')
-            if os.path.exists(bin_path):
-                try:
-                    os.add_dll_directory(bin_path)
-                except:
-                    pass
-                os.environ['PATH'] = bin_path + os.pathsep + os.environ.get('PATH', '')
-
-
 from dotenv import load_dotenv
 import logging
 import threading
-from queue import Queue, Empty
 import requests
 import gspread
 from pymongo import MongoClient
@@ -31,21 +15,48 @@ from selenium.webdriver.chrome.service import Service
 from PIL import Image
 import cv2
 import numpy as np
-import gc
+import io
 import re
+import atexit
 import time
 from datetime import datetime
 from pathlib import Path
-import inspect
 import sys
 
+import contexto
+from escritor_lotes import EscritorEnLotes
+
+
+# ✅ SETUP CUDA 11 ANTES DE IMPORTAR TENSORFLOW
+# Solo se ejecuta si se usa el modelo Keras (.h5); con ONNX/TFLite no hace falta
+_cuda_listo = False
+
+
+def _preparar_cuda():
+    global _cuda_listo
+    if _cuda_listo:
+        return
+    _cuda_listo = True
+    import site
+    for sp in site.getsitepackages():
+        nvidia_path = os.path.join(sp, 'nvidia')
+        if os.path.exists(nvidia_path):
+            for subdir in os.listdir(nvidia_path):
+                bin_path = os.path.join(nvidia_path, subdir, 'bin')
+                if os.path.exists(bin_path):
+                    try:
+                        os.add_dll_directory(bin_path)
+                    except:
+                        pass
+                    os.environ['PATH'] = bin_path + os.pathsep + os.environ.get('PATH', '')
+
 
 load_dotenv()
 
 
 #### === Logger setup optimizado === ####
 LOG_LEVEL = logging.INFO
-LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(contexto)s%(message)s'
 BASE_FOLDER = os.path.abspath(os.path.dirname(__file__))
 LOG_FOLDER = os.path.join(BASE_FOLDER, "logs")
 DEFAULT_LOG_FILE = os.path.join(LOG_FOLDER, 'bot_universal.log')
@@ -53,6 +64,14 @@ DEFAULT_LOG_FILE = os.path.join(LOG_FOLDER, 'bot_universal.log')
 VERBOSE_LOGGING = False
 
 
+class _FiltroContexto(logging.Filter):
+    """Agrega %(contexto)s al record: '[WEBSITE|cuenta#intento] ' del contexto actual."""
+
+    def filter(self, record):
+        record.contexto = contexto.actual().etiqueta()
+        return True
+
+
 def get_logger(module_name, filename=None):
     """
     Crea logger con configuración optimizada.
@@ -78,12 +97,14 @@ def get_logger(module_name, filename=None):
     file_handler = logging.FileHandler(filename, encoding='utf-8')
     file_formatter = logging.Formatter(LOG_FORMAT)
     file_handler.setFormatter(file_formatter)
+    file_handler.addFilter(_FiltroContexto())
     logger.addHandler(file_handler)
     
     # Console handler (sigue mostrando en consola)
     console_handler = logging.StreamHandler(sys.stdout)
     console_formatter = logging.Formatter(LOG_FORMAT)
     console_handler.setFormatter(console_formatter)
+    console_handler.addFilter(_FiltroContexto())
     logger.addHandler(console_handler)
     
     logger.setLevel(LOG_LEVEL)
@@ -116,6 +137,10 @@ for folder in [LOG_FOLDER, CAPTCHA_FOLDER, EVIDENCE_FOLDER]:
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from diccionario import WEBSITES, CAPTCHA_GRUPOS, obtener_grupo
 
+# Decodificador CTC compartido con los scripts de entrenamiento
+sys.path.append(str(Path(__file__).parent.parent / "captchaModel"))
+import ctc_decoder
+
 
 #### === Timestamp helper === ####
 def get_current_timestamp():
@@ -123,89 +148,90 @@ def get_current_timestamp():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-#### === Auto-detección del website y tracking de captchas === ####
-_captcha_data = {}
+#### === Tracking de captchas === ####
+# Los pendientes de confirmación viven en captcha_registro (por website/cuenta/intento)
+def get_captcha_folder_for_website(website_name):
+    """Crea y retorna la carpeta específica para captchas de un website."""
+    folder_name = website_name.replace(" ", "_").replace("/", "_")
+    website_captcha_folder = os.path.join(CAPTCHA_FOLDER, folder_name)
+    os.makedirs(website_captcha_folder, exist_ok=True)
+    return website_captcha_folder
 
 
-def _detectar_website_desde_caller():
-    """Auto-detecta el nombre del website buscando la variable WEBSITE_NAME."""
-    try:
-        for frame_info in inspect.stack():
-            frame_locals = frame_info.frame.f_locals
-            frame_globals = frame_info.frame.f_globals
-            
-            if 'WEBSITE_NAME' in frame_locals:
-                return frame_locals['WEBSITE_NAME']
-            if 'WEBSITE_NAME' in frame_globals:
-                return frame_globals['WEBSITE_NAME']
-        
-        if VERBOSE_LOGGING:
-            logger.warning("[CAPTCHA] No se pudo auto-detectar WEBSITE_NAME")
+def nuevo_captcha(website_name, image_bytes, filename_prefix='captcha'):
+    """
+    Crea el registro en memoria de un captcha recién capturado (no toca disco).
+    El nombre es único (ms + uuid) aunque varios sitios resuelvan a la vez.
+    """
+    import captcha_archivo
+    import captcha_registro
+
+    # Crea archivador + registro (sus atexit quedan en el orden correcto)
+    captcha_registro.get_registro()
+
+    carpeta = get_captcha_folder_for_website(website_name) if website_name else CAPTCHA_FOLDER
+    return {
+        'bytes': image_bytes,
+        'carpeta': carpeta,
+        'nombre': captcha_archivo.nombre_unico(filename_prefix),
+        'hash': _hash_captcha(image_bytes),
+    }
+
+
+def _hash_captcha(image_bytes):
+    import captcha_cache
+
+    if not captcha_cache.CAPTCHA_CACHE_ENABLED:
         return None
+    try:
+        return captcha_cache.dhash(image_bytes)
     except Exception as e:
         if VERBOSE_LOGGING:
-            logger.warning(f"[CAPTCHA] Error en auto-detección: {e}")
+            logger.debug(f"[CACHE] No se pudo calcular hash: {e}")
         return None
 
 
-def get_captcha_folder_for_website(website_name):
-    """Crea y retorna la carpeta específica para captchas de un website."""
-    folder_name = website_name.replace(" ", "_").replace("/", "_")
-    website_captcha_folder = os.path.join(CAPTCHA_FOLDER, folder_name)
-    os.makedirs(website_captcha_folder, exist_ok=True)
-    return website_captcha_folder
+def archivar_captcha(captcha):
+    """Encola para el dataset un captcha que no llegó a enviarse (sin solución o descartado)."""
+    import captcha_registro
 
+    captcha_registro.archivar(captcha, "descartado")
 
-def _registrar_captcha(website_name, captcha_path, solucion):
-    """Registra internamente el captcha resuelto para renombrado posterior"""
-    global _captcha_data
-    if website_name and solucion:
-        _captcha_data[website_name] = {
-            'path': captcha_path,
-            'solution': solucion
-        }
-        if VERBOSE_LOGGING:
-            logger.debug(f"[CAPTCHA] Registrado: {website_name} → {solucion}")
 
+def _registrar_captcha(website_name, captcha, solucion, confianza=None, fuente=None, modelo=None):
+    """
+    Registra el captcha resuelto para archivarlo con su solución si el login funciona.
+    `confianza` (solo predicciones del modelo) alimenta los umbrales adaptativos de captcha_umbral;
+    `fuente` (modelo/cache/2captcha) y `modelo` (versión) van al índice del dataset.
+    """
+    import captcha_registro
 
-def _renombrar_captcha_automatico(website_name):
-    """Renombra automáticamente el captcha cuando se registra un balance exitoso"""
-    global _captcha_data
-    
-    if website_name not in _captcha_data:
+    if not (website_name and solucion):
+        archivar_captcha(captcha)
         return
-    
-    data = _captcha_data[website_name]
-    old_path = data['path']
-    solucion = data['solution']
-    
-    if not os.path.exists(old_path):
-        if VERBOSE_LOGGING:
-            logger.warning(f"[CAPTCHA] Archivo no encontrado: {old_path}")
-        del _captcha_data[website_name]
-        return
-    
-    try:
-        directorio = os.path.dirname(old_path)
-        extension = os.path.splitext(old_path)[1]
-        
-        nuevo_nombre = f"{solucion}{extension}"
-        new_path = os.path.join(directorio, nuevo_nombre)
-        
-        contador = 1
-        while os.path.exists(new_path):
-            nuevo_nombre = f"{solucion}_{contador}{extension}"
-            new_path = os.path.join(directorio, nuevo_nombre)
-            contador += 1
-        
-        os.rename(old_path, new_path)
-        if VERBOSE_LOGGING:
-            logger.debug(f"[CAPTCHA] Renombrado: {os.path.basename(old_path)} → {nuevo_nombre}")
-        
-        del _captcha_data[website_name]
-        
-    except Exception as e:
-        logger.error(f"[CAPTCHA] Error al renombrar: {e}")
+    captcha_registro.get_registro().registrar(
+        website_name, captcha, solucion, confianza=confianza, fuente=fuente, modelo=modelo
+    )
+
+
+def _archivar_captcha_confirmado(website_name):
+    """Confirma el captcha de la cuenta actual cuando se registra un balance exitoso"""
+    import captcha_registro
+
+    captcha_registro.get_registro().confirmar(website_name)
+
+
+def captcha_rechazado(website_name, mensaje):
+    """
+    Login fallido con aviso del sitio: si el aviso es sobre el código, el último
+    captcha de la cuenta actual se marca como fallido. Devuelve True en ese caso.
+    """
+    import captcha_registro
+
+    if not captcha_registro.es_rechazo(mensaje):
+        return False
+    captcha_registro.get_registro().rechazar(website_name)
+    return True
 
 
 def detectar_grupo_captcha(website_name):
@@ -231,9 +257,31 @@ def detectar_grupo_captcha(website_name):
 CHROME_HEADLESS = True
 CHROME_WINDOW_SIZE = (900, 1300)
 CHROME_LANG = "en-US"
+# Los motores (platform_*) usan implicit wait 0 y esperas explícitas acotadas (esperas.py);
+# los scripts que todavía buscan elementos sin espera propia conservan este margen
+CHROME_IMPLICIT_WAIT_SCRIPTS = float(os.getenv('CHROME_IMPLICIT_WAIT_SCRIPTS', '2'))
 
+# ✅ Pool de drivers calientes (lo activa run_scheduler.py; ver driver_pool.py)
+DRIVER_POOL_ENABLED = os.getenv('DRIVER_POOL_ENABLED', '0') == '1'
 
-def get_chrome_driver():
+
+def get_chrome_driver(implicit_wait=None):
+    """
+    Devuelve un driver de Chrome.
+    ✅ Con DRIVER_POOL_ENABLED lo presta el pool compartido (quit() lo devuelve al pool)
+    ✅ implicit_wait: 0 para flujos con esperas explícitas; None = CHROME_IMPLICIT_WAIT_SCRIPTS
+    """
+    if DRIVER_POOL_ENABLED:
+        import driver_pool
+        driver = driver_pool.get_pool().checkout()
+    else:
+        driver = _crear_chrome_driver()
+    # Se fija en cada préstamo: los drivers del pool pasan de un script a otro
+    driver.implicitly_wait(CHROME_IMPLICIT_WAIT_SCRIPTS if implicit_wait is None else implicit_wait)
+    return driver
+
+
+def _crear_chrome_driver():
     """Crea driver de Chrome optimizado para bajo consumo de memoria."""
     options = webdriver.ChromeOptions()
     
@@ -263,7 +311,7 @@ def get_chrome_driver():
     try:
         driver = webdriver.Chrome(options=options)
         driver.set_page_load_timeout(60)
-        driver.implicitly_wait(2)
+        driver.implicitly_wait(0)
         driver.set_window_size(*CHROME_WINDOW_SIZE)
         return driver
     except Exception as e:
@@ -271,9 +319,43 @@ def get_chrome_driver():
         raise
 
 
+#### === Motor HTTP grupo1 (sin navegador, ver platform_grupo1.py) === ####
+GRUPO1_HTTP_ENABLED = os.getenv('GRUPO1_HTTP_ENABLED', '1') == '1'
+
+
+#### === Motor API grupo2 (sin navegador, ver platform_grupo2_api.py) === ####
+GRUPO2_API_ENABLED = os.getenv('GRUPO2_API_ENABLED', '1') == '1'
+
+
+#### === Persistencia de sesiones (ver session_store.py) === ####
+# Reutiliza cookies/storage entre ciclos: sin captcha ni logout en el camino normal
+# Requiere SESSION_STORE_KEY (clave Fernet) en el entorno; sin ella no se guardan sesiones
+SESSION_STORE_ENABLED = os.getenv('SESSION_STORE_ENABLED', '1') == '1'
+
+
+#### === Concurrencia de cuentas por sitio === ####
+# Cuántas cuentas de un mismo sitio se procesan a la vez (cada una en su propio
+# Chrome/perfil). 1 = comportamiento secuencial original.
+CUENTAS_PARALELAS_DEFAULT = int(os.getenv('CUENTAS_PARALELAS', '1'))
+CUENTAS_PARALELAS_POR_SITIO = {
+    "ORION STARS": 3,
+    "FIRE KIRIN": 3,
+    "PANDA MASTER": 3,
+}
+
+
+def get_cuentas_paralelas(website_name):
+    """Límite de cuentas concurrentes para un website."""
+    return max(1, CUENTAS_PARALELAS_POR_SITIO.get(website_name, CUENTAS_PARALELAS_DEFAULT))
+
+
 #### === Captcha config === ####
 API_KEY_2CAPTCHA = os.getenv('API_KEY_2CAPTCHA')
 KERAS_PREDICT_TIMEOUT = int(os.getenv('KERAS_PREDICT_TIMEOUT', '10'))
+# auto = ONNX si existe el .onnx exportado, si no TFLite, si no Keras (.h5)
+CAPTCHA_RUNTIME = os.getenv('CAPTCHA_RUNTIME', 'auto').lower()
+# 1 = CTC greedy; >1 = beam search con ese ancho
+CAPTCHA_BEAM_WIDTH = int(os.getenv('CAPTCHA_BEAM_WIDTH', '1'))
 
 
 CAPTCHA_CONFIG = {
@@ -311,9 +393,79 @@ CAPTCHA_MAX_RETRIES = {
 keras_models = {}
 
 
+def _ruta_exportada(model_path, extension):
+    """captcha_grupo1_v1_pred.h5 → captcha_grupo1_v1_pred.onnx (generado por captchaModel/export_modelos.py)"""
+    return os.path.splitext(model_path)[0] + extension
+
+
+def _cargar_onnx(model_path):
+    import onnxruntime as ort
+
+    sess = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+    input_name = sess.get_inputs()[0].name
+
+    def predict(batch):
+        return sess.run(None, {input_name: batch})[0]
+
+    return predict
+
+
+def _cargar_tflite(model_path):
+    from tflite_runtime.interpreter import Interpreter
+
+    interpreter = Interpreter(model_path=model_path)
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+    interpreter.allocate_tensors()
+
+    def predict(batch):
+        # El batch es dinámico: redimensionar solo cuando cambia
+        if tuple(interpreter.get_input_details()[0]['shape']) != batch.shape:
+            interpreter.resize_tensor_input(input_index, batch.shape)
+            interpreter.allocate_tensors()
+        interpreter.set_tensor(input_index, batch)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index).copy()
+
+    return predict
+
+
+def _cargar_keras(model_path):
+    _preparar_cuda()
+    import tensorflow as tf
+    from tensorflow import keras
+
+    gpus = tf.config.list_physical_devices('GPU')
+    if gpus:
+        try:
+            for gpu in gpus:
+                tf.config.experimental.set_memory_growth(gpu, True)
+            if VERBOSE_LOGGING:
+                logger.debug(f"[KERAS] GPU configurada")
+        except RuntimeError as e:
+            if VERBOSE_LOGGING:
+                logger.warning(f"[KERAS] No se pudo configurar GPU: {e}")
+
+    model = keras.models.load_model(model_path, compile=False)
+    return model, model.predict_on_batch
+
+
+def _version_modelo(ruta):
+    """'<archivo>@<YYYYmmddHHMM>' (fecha de modificación): identifica el modelo en el índice del dataset"""
+    marca = datetime.fromtimestamp(os.path.getmtime(ruta)).strftime("%Y%m%d%H%M")
+    return f"{os.path.basename(ruta)}@{marca}"
+
+
+def version_modelo(grupo_id):
+    """Versión del modelo cargado para el grupo (None si no está cargado)"""
+    model_data = keras_models.get(grupo_id)
+    return model_data.get('version') if model_data else None
+
+
 def cargar_modelo_keras(grupo_id):
     """
-    Carga el modelo Keras SOLO cuando se necesita (lazy loading).
+    Carga el modelo del grupo SOLO cuando se necesita (lazy loading).
+    Usa el export ONNX/TFLite si existe (sin TensorFlow); si no, el .h5 con Keras.
     ✅ Log simplificado: solo muestra cuando carga por primera vez
     """
     global keras_models
@@ -328,33 +480,51 @@ def cargar_modelo_keras(grupo_id):
     config_grupo = CAPTCHA_CONFIG[grupo_id]
     model_path = config_grupo["model_path"]
     characters = config_grupo["characters"]
+    num_to_char_dict = {idx: char for idx, char in enumerate(characters)}
+
+    cargadores = {
+        "onnx": (".onnx", _cargar_onnx),
+        "tflite": (".tflite", _cargar_tflite),
+    }
+    orden = ["onnx", "tflite"] if CAPTCHA_RUNTIME == "auto" else [CAPTCHA_RUNTIME]
+
+    for runtime in orden:
+        if runtime not in cargadores:
+            continue
+        extension, cargador = cargadores[runtime]
+        ruta = _ruta_exportada(model_path, extension)
+        if not os.path.exists(ruta):
+            continue
+        try:
+            keras_models[grupo_id] = {
+                'model': None,
+                'predict': cargador(ruta),
+                'runtime': runtime,
+                'version': _version_modelo(ruta),
+                'num_to_char': num_to_char_dict,
+                'config': config_grupo
+            }
+            logger.info(f"[KERAS] ✓ {grupo_id} listo ({runtime})")
+            return keras_models[grupo_id]
+        except ImportError as e:
+            logger.warning(f"[KERAS] Runtime {runtime} no instalado ({e}), probando siguiente")
+        except Exception as e:
+            logger.error(f"[KERAS] Error cargando {ruta}: {e}")
     
     try:
-        import tensorflow as tf
-        from tensorflow import keras
-        
         logger.info(f"[KERAS] Cargando {grupo_id}...")
         
         if not os.path.exists(model_path):
             logger.error(f"[KERAS] Archivo no encontrado: {model_path}")
             return None
         
-        gpus = tf.config.list_physical_devices('GPU')
-        if gpus:
-            try:
-                for gpu in gpus:
-                    tf.config.experimental.set_memory_growth(gpu, True)
-                if VERBOSE_LOGGING:
-                    logger.debug(f"[KERAS] GPU configurada")
-            except RuntimeError as e:
-                if VERBOSE_LOGGING:
-                    logger.warning(f"[KERAS] No se pudo configurar GPU: {e}")
-        
-        model = keras.models.load_model(model_path, compile=False)
-        num_to_char_dict = {idx: char for idx, char in enumerate(characters)}
+        model, predict = _cargar_keras(model_path)
         
         keras_models[grupo_id] = {
             'model': model,
+            'predict': predict,
+            'runtime': 'keras',
+            'version': _version_modelo(model_path),
             'num_to_char': num_to_char_dict,
             'config': config_grupo
         }
@@ -374,141 +544,88 @@ logger.info("="*70)
 
 
 def decode_keras_prediction(pred, num_to_char_dict, max_length):
-    """Decodifica la predicción del modelo Keras usando CTC decode."""
+    """
+    Decodifica la predicción del modelo (CTC en numpy, ver captchaModel/ctc_decoder.py).
+    Devuelve (texto, confianza por carácter decodificado).
+    """
     try:
-        import tensorflow as tf
-        
-        input_len = np.ones(pred.shape[0]) * pred.shape[1]
-        results = tf.keras.backend.ctc_decode(
-            pred, 
-            input_length=input_len, 
-            greedy=True
-        )[0][0][:, :max_length]
-        
-        output_text = []
-        for res in results:
-            indices = res.numpy()
-            text = ''.join([
-                num_to_char_dict[idx] 
-                for idx in indices 
-                if 0 <= idx < len(num_to_char_dict)
-            ])
-            output_text.append(text)
-        
-        return output_text[0] if output_text else ""
+        resultados = ctc_decoder.decodificar(pred, num_to_char_dict, max_length, beam_width=CAPTCHA_BEAM_WIDTH)
+        return resultados[0] if resultados else ("", [])
     except Exception as e:
         logger.error(f"[CAPTCHA] Error decodificando: {e}")
-        return ""
+        return "", []
 
 
-def calcular_confianza_prediccion(pred):
-    """Calcula el score de confianza de una predicción."""
-    try:
-        max_probs = np.max(pred[0], axis=1)
-        confidence = np.mean(max_probs)
-        return float(confidence)
-    except Exception as e:
-        if VERBOSE_LOGGING:
-            logger.warning(f"[CAPTCHA] Error calculando confianza: {e}")
-        return 0.0
+def calcular_confianza_prediccion(confianzas):
+    """
+    Confianza de la predicción = la del carácter decodificado menos seguro
+    (un solo dígito errado invalida el captcha). Sin caracteres → 0.0.
+    """
+    return float(min(confianzas)) if confianzas else 0.0
 
 
-def predict_with_timeout(model, img_array, timeout=KERAS_PREDICT_TIMEOUT):
-    """Ejecuta model.predict() con timeout y limpieza de recursos."""
-    result_queue = Queue()
-    exception_queue = Queue()
-    
-    def predict_worker():
-        try:
-            prediction = model.predict(img_array, verbose=0)
-            result_queue.put(prediction)
-        except Exception as e:
-            exception_queue.put(e)
-        finally:
-            # ✅ Limpiar backend TF en el thread
-            import tensorflow as tf
-            tf.keras.backend.clear_session()
-    
-    thread = threading.Thread(target=predict_worker, daemon=True)
-    thread.start()
-    thread.join(timeout=timeout)
-    
-    if thread.is_alive():
-        if VERBOSE_LOGGING:
-            logger.warning(f"[CAPTCHA] Timeout en predicción ({timeout}s)")
-        del thread
-        gc.collect()
-        return None, False
-    
-    if not exception_queue.empty():
-        exc = exception_queue.get()
-        logger.error(f"[CAPTCHA] Error en predicción: {exc}")
-        del thread
-        return None, False
-    
-    result = None
-    if not result_queue.empty():
-        result = result_queue.get()
-    
-    del thread
-    return (result, True) if result is not None else (None, False)
+def preprocesar_captcha(image_bytes, config_grupo):
+    """
+    Bytes de la imagen → (imagen redimensionada, array (1, W, H, 1)) listo para el modelo.
+    ✅ Sin preprocesamiento, resize directo con BILINEAR (igual que en entrenamiento)
+    """
+    pil_img = Image.open(io.BytesIO(image_bytes)).convert('L')
+    pil_img_resized = pil_img.resize(
+        (config_grupo['img_width'], config_grupo['img_height']),
+        Image.BILINEAR  # ✅ EXPLÍCITO
+    )
+
+    img_array = np.array(pil_img_resized).astype(np.float32) / 255.0
+    img_array = np.expand_dims(img_array, -1)
+    img_array = np.transpose(img_array, (1, 0, 2))
+    img_array = np.expand_dims(img_array, 0)
+    return pil_img_resized, img_array
 
 
-def resolver_captcha_keras_interno(image_bytes, grupo_id, captcha_path):
+def resolver_captcha_keras_interno(image_bytes, grupo_id, captcha_folder=CAPTCHA_FOLDER):
     """
     Resuelve captcha usando el modelo Keras del grupo especificado.
+    La predicción la hace el servicio residente del grupo (captcha_service),
+    que agrupa en un solo batch los captchas que llegan a la vez.
     ✅ Solo loguea resultados importantes
     """
-    pil_img = None
-    pil_img_resized = None
-    img_array = None
-    prediction = None
-    
     try:
-        model_data = cargar_modelo_keras(grupo_id)
-        if model_data is None:
+        import captcha_service
+
+        servicio = captcha_service.get_servicio(grupo_id)
+        if servicio is None:
             logger.error(f"[CAPTCHA] No se pudo cargar modelo {grupo_id}")
             return None, 0.0, False
-        
-        model = model_data['model']
+
+        model_data = keras_models[grupo_id]
         num_to_char = model_data['num_to_char']
         config_grupo = model_data['config']
-        
-        # ✅ CAMBIO CRÍTICO: Sin preprocesamiento, resize directo con BILINEAR
-        pil_img = Image.open(captcha_path).convert('L')
-        pil_img_resized = pil_img.resize(
-            (config_grupo['img_width'], config_grupo['img_height']),
-            Image.BILINEAR  # ✅ EXPLÍCITO
-        )
-        
-        img_array = np.array(pil_img_resized).astype(np.float32) / 255.0
-        img_array = np.expand_dims(img_array, -1)
-        img_array = np.transpose(img_array, (1, 0, 2))
-        img_array = np.expand_dims(img_array, 0)
-        
-        prediction, success = predict_with_timeout(model, img_array, timeout=KERAS_PREDICT_TIMEOUT)
-        
-        if not success:
+
+        pil_img_resized, img_array = preprocesar_captcha(image_bytes, config_grupo)
+
+        try:
+            prediction = servicio.predecir(img_array, timeout=KERAS_PREDICT_TIMEOUT)
+        except TimeoutError:
+            if VERBOSE_LOGGING:
+                logger.warning(f"[CAPTCHA] Timeout en predicción ({KERAS_PREDICT_TIMEOUT}s)")
             return None, 0.0, True
-        
-        confidence = calcular_confianza_prediccion(prediction)
-        text = decode_keras_prediction(prediction, num_to_char, config_grupo['max_length'])
-        
-        # ✅ DEBUG: Guardar imagen PROCESADA (no original)
+
+        text, confianzas = decode_keras_prediction(prediction, num_to_char, config_grupo['max_length'])
+        confidence = calcular_confianza_prediccion(confianzas)
+
+        # ✅ DEBUG: Guardar imagen PROCESADA (no original), en segundo plano
         if grupo_id == "grupo3":
-            debug_folder = os.path.join(os.path.dirname(captcha_path), "debug_predictions")
-            os.makedirs(debug_folder, exist_ok=True)
-            
-            debug_path = os.path.join(
-                debug_folder, 
-                f"pred_{text}_conf{confidence:.2f}_{int(time.time())}.png"
-            )
+            import captcha_archivo
+
+            debug_folder = os.path.join(captcha_folder, "debug_predictions")
+            debug_nombre = captcha_archivo.nombre_unico(f"pred_{text}_conf{confidence:.2f}")
             # ✅ GUARDAR la imagen PROCESADA (200x62)
-            pil_img_resized.save(debug_path)
-            logger.info(f"[DEBUG] Guardado: {os.path.basename(debug_path)}")
-        
+            captcha_archivo.get_archivador().guardar(debug_folder, pil_img_resized, nombre=debug_nombre)
+            if VERBOSE_LOGGING:
+                logger.debug(f"[DEBUG] Encolado: {debug_nombre}")
+
         expected_length = config_grupo['max_length']
-        
+
         if text and text.isdigit():
             if expected_length - 1 <= len(text) <= expected_length + 1:
                 logger.info(f"[CAPTCHA] ✓ Resuelto: {text} (conf: {confidence:.2f})")
@@ -521,90 +638,69 @@ def resolver_captcha_keras_interno(image_bytes, grupo_id, captcha_path):
             if VERBOSE_LOGGING:
                 logger.warning(f"[CAPTCHA] Resultado inválido: {text}")
             return None, confidence, False
-            
+
     except Exception as e:
         logger.error(f"[CAPTCHA] Error: {e}")
         return None, 0.0, False
-    
-    finally:
-        # ✅ LIMPIAR TODO + TensorFlow backend
-        del pil_img, pil_img_resized, img_array, prediction
-        import tensorflow as tf
-        tf.keras.backend.clear_session()
-        gc.collect()
 
 
-def resolver_captcha_2captcha_api(image_bytes, captcha_path, website_name):
+def resolver_captcha_2captcha_api(image_bytes, captcha, website_name):
     """
-    Resuelve captcha usando servicio 2captcha.
+    Resuelve captcha usando servicio 2captcha (cliente asíncrono, ver captcha_2captcha).
     ✅ Solo loguea inicio y resultado final
     """
-    try:
-        logger.info(f"[2CAPTCHA] Enviando...")
-        
-        with open(captcha_path, "rb") as fp:
-            files = {'file': fp}
-            data = {'key': API_KEY_2CAPTCHA, 'method': 'post', 'json': 1}
-            resp = requests.post('http://2captcha.com/in.php', files=files, data=data, timeout=30).json()
-            
-            if 'request' not in resp:
-                logger.error(f"[2CAPTCHA] Respuesta inválida: {resp}")
-                return None
-            
-            captcha_id = resp['request']
-        
-        for intent in range(18):
-            time.sleep(2)
-            res = requests.get(
-                f"http://2captcha.com/res.php?key={API_KEY_2CAPTCHA}&action=get&id={captcha_id}&json=1",
-                timeout=30
-            ).json()
-            
-            if res['status'] == 1:
-                result = res['request']
-                logger.info(f"[2CAPTCHA] ✓ Resuelto: {result}")
-                _registrar_captcha(website_name, captcha_path, result)
-                return result
-        
-        logger.warning("[2CAPTCHA] Timeout")
-        return None
-        
-    except Exception as e:
-        logger.error(f"[2CAPTCHA] Error: {e}")
+    import captcha_2captcha
+
+    logger.info(f"[2CAPTCHA] Enviando...")
+    result, captcha_id = captcha_2captcha.resolver(image_bytes, captcha['nombre'])
+    
+    if not result:
+        archivar_captcha(captcha)
         return None
+    
+    logger.info(f"[2CAPTCHA] ✓ Resuelto: {result}")
+    _registrar_captcha(website_name, dict(captcha, id_2captcha=captcha_id), result, fuente="2captcha")
+    return result
 
 
-def resolver_captcha_2captcha(image_bytes, filename_prefix='captcha'):
+def resolver_captcha_2captcha(image_bytes, filename_prefix='captcha', refrescar=None, solo_modelo=None):
     """
     Función unificada para resolver captchas.
+    Todo ocurre en memoria; la imagen se archiva en segundo plano (captcha_archivo).
+
+    Las predicciones con confianza bajo el umbral del sitio (captcha_umbral) no
+    se devuelven: si se pasa `refrescar` (callable que devuelve los bytes de un
+    captcha nuevo) se pide otra imagen sin enviar el login; si no, se escala
+    directamente a 2captcha.
+
+    Con `solo_modelo` (id de grupo) se usa ese modelo aunque el sitio no esté en
+    CAPTCHA_GRUPOS y nunca se escala a 2captcha: si el modelo falla devuelve None.
     ✅ Logging limpio enfocado en eventos importantes
     """
-    website_name = _detectar_website_desde_caller()
-    ts = int(time.time())
-    
-    if website_name:
-        captcha_folder = get_captcha_folder_for_website(website_name)
-    else:
-        captcha_folder = CAPTCHA_FOLDER
+    import captcha_umbral
+    import captcha_cache
+
+    website_name = contexto.actual().website
+    if not website_name and VERBOSE_LOGGING:
+        logger.warning("[CAPTCHA] Sin contexto de website (usar contexto.ejecucion)")
+    captcha = nuevo_captcha(website_name, image_bytes, filename_prefix)
     
-    captcha_path = os.path.join(captcha_folder, f"{filename_prefix}_{ts}.png")
+    # ✅ Imagen idéntica a una ya resuelta y confirmada: sin modelo ni 2captcha
+    cacheada = captcha_cache.buscar(website_name, captcha['hash'])
+    if cacheada:
+        logger.info(f"[CAPTCHA] ✓ Cache: {cacheada}")
+        _registrar_captcha(website_name, captcha, cacheada, fuente="cache")
+        return cacheada
     
-    try:
-        with open(captcha_path, "wb") as f:
-            f.write(image_bytes)
-    except Exception as e:
-        logger.error(f"[CAPTCHA] Error guardando imagen: {e}")
-        return None
-    
-    grupo_id = detectar_grupo_captcha(website_name)
+    grupo_id = solo_modelo or detectar_grupo_captcha(website_name)
     
     if grupo_id is None:
-        return resolver_captcha_2captcha_api(image_bytes, captcha_path, website_name)
+        return resolver_captcha_2captcha_api(image_bytes, captcha, website_name)
     
     max_retries = CAPTCHA_MAX_RETRIES.get(grupo_id, 3)
     
     for intento in range(1, max_retries + 1):
-        result, confidence, timeout_occurred = resolver_captcha_keras_interno(image_bytes, grupo_id, captcha_path)
+        result, confidence, timeout_occurred = resolver_captcha_keras_interno(image_bytes, grupo_id, captcha['carpeta'])
         
         if timeout_occurred:
             if VERBOSE_LOGGING:
@@ -612,15 +708,40 @@ def resolver_captcha_2captcha(image_bytes, filename_prefix='captcha'):
             time.sleep(1)
             continue
         
-        if result:
-            _registrar_captcha(website_name, captcha_path, result)
+        if result and captcha_umbral.aceptar(website_name, confidence):
+            _registrar_captcha(
+                website_name, captcha, result, confianza=confidence,
+                fuente="modelo", modelo=version_modelo(grupo_id)
+            )
             return result
-        else:
-            if intento < max_retries:
-                time.sleep(0.5)
-    
+        
+        if result:
+            logger.info(
+                f"[CAPTCHA] Confianza {confidence:.2f} < umbral "
+                f"{captcha_umbral.umbral(website_name):.2f} → descartado"
+            )
+        
+        # Misma imagen = misma predicción: sin imagen nueva no tiene sentido reintentar
+        if refrescar is None or intento == max_retries:
+            break
+        try:
+            nueva_imagen = refrescar()
+        except Exception as e:
+            logger.warning(f"[CAPTCHA] No se pudo refrescar la imagen: {e}")
+            break
+        if not nueva_imagen:
+            break
+        archivar_captcha(captcha)
+        image_bytes = nueva_imagen
+        captcha = nuevo_captcha(website_name, image_bytes, filename_prefix)
+    
+    if solo_modelo:
+        logger.info(f"[CAPTCHA] Modelo {solo_modelo} falló (sin 2captcha para este sitio)")
+        archivar_captcha(captcha)
+        return None
+
     logger.info(f"[CAPTCHA] Modelo falló → Usando 2captcha")
-    return resolver_captcha_2captcha_api(image_bytes, captcha_path, website_name)
+    return resolver_captcha_2captcha_api(image_bytes, captcha, website_name)
 
 
 #### === Evidencias === ####
@@ -662,48 +783,188 @@ MONGO_URI = os.getenv('MONGO_URI')
 MONGO_DB = os.getenv('MONGO_DB', 'plataforma_finanzas')
 MONGO_COLLECTION = os.getenv('MONGO_COLLECTION', 'balances_bot')
 
+MONGO_BATCH_SIZE = int(os.getenv('MONGO_BATCH_SIZE', '50'))
+MONGO_FLUSH_INTERVAL = float(os.getenv('MONGO_FLUSH_INTERVAL', '5'))
+MONGO_MAX_REINTENTOS = 3
+MONGO_SPOOL_FILE = os.path.join(BASE_FOLDER, "spool", "balances_pendientes.jsonl")
+
+_mongo_client = None
+_mongo_lock = threading.Lock()
+
+
+def get_mongo_client():
+    """
+    MongoClient único por proceso (pool de conexiones interno de pymongo).
+    ✅ Evita el handshake TCP+TLS por cada balance
+    """
+    global _mongo_client
+    with _mongo_lock:
+        if _mongo_client is None:
+            _mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000, maxPoolSize=10)
+        return _mongo_client
+
+
+class BalanceWriter(EscritorEnLotes):
+    """
+    Escritor de balances en segundo plano.
+    - Acumula docs y los inserta con insert_many (al llegar a batch_size,
+      cada flush_interval segundos o al salir del proceso)
+    - Reintenta errores transitorios con backoff
+    - Si Mongo no responde, guarda los docs en un spool local (JSONL) que se
+      reenvía en el siguiente flush exitoso
+    """
+
+    def __init__(self, batch_size=MONGO_BATCH_SIZE, flush_interval=MONGO_FLUSH_INTERVAL, spool_file=MONGO_SPOOL_FILE):
+        self.spool_file = spool_file
+        self._flush_lock = threading.Lock()
+        super().__init__("BalanceWriter", batch_size, flush_interval, cierre_timeout=120)
+
+    def enviar(self, doc):
+        self._encolar(doc)
+
+    def _insertar(self, docs):
+        """insert_many idempotente: los _id ya vienen asignados, los duplicados se ignoran."""
+        from pymongo.errors import BulkWriteError
+        collection = get_mongo_client()[MONGO_DB][MONGO_COLLECTION]
+        try:
+            collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errores = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+            if errores:
+                raise
+
+    def _procesar(self, docs):
+        from pymongo.errors import PyMongoError
+        if not docs:
+            return
+        with self._flush_lock:
+            for intento in range(1, MONGO_MAX_REINTENTOS + 1):
+                try:
+                    self._insertar(docs)
+                    logger.info(f"[MongoDB] ✓ {len(docs)} balances insertados")
+                    self._reenviar_spool()
+                    return
+                except PyMongoError as e:
+                    logger.warning(f"[MongoDB] Intento {intento}/{MONGO_MAX_REINTENTOS} falló: {e}")
+                    if intento < MONGO_MAX_REINTENTOS:
+                        time.sleep(2 ** intento)
+                except Exception as e:
+                    logger.error(f"[MongoDB] Error: {e}")
+                    break
+            self._guardar_spool(docs)
+
+    def _guardar_spool(self, docs):
+        from bson import json_util
+        try:
+            os.makedirs(os.path.dirname(self.spool_file), exist_ok=True)
+            with open(self.spool_file, "a", encoding="utf-8") as f:
+                for doc in docs:
+                    f.write(json_util.dumps(doc) + "\n")
+            logger.warning(f"[MongoDB] {len(docs)} balances guardados en spool: {self.spool_file}")
+        except Exception as e:
+            logger.error(f"[MongoDB] No se pudo escribir spool ({len(docs)} balances perdidos): {e}")
+
+    def _reenviar_spool(self):
+        """Reenvía balances del spool (llamado con _flush_lock tomado)."""
+        from bson import json_util
+        if not os.path.exists(self.spool_file):
+            return
+        enviando = self.spool_file + ".enviando"
+        try:
+            os.replace(self.spool_file, enviando)
+            with open(enviando, encoding="utf-8") as f:
+                docs = [json_util.loads(linea) for linea in f if linea.strip()]
+            if docs:
+                self._insertar(docs)
+                logger.info(f"[MongoDB] ✓ {len(docs)} balances del spool reenviados")
+            os.remove(enviando)
+        except Exception as e:
+            logger.warning(f"[MongoDB] Spool pendiente, se reintenta luego: {e}")
+            # Devolver lo no enviado al spool para el próximo intento
+            if os.path.exists(enviando):
+                with open(enviando, encoding="utf-8") as src, open(self.spool_file, "a", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                os.remove(enviando)
+
+
+_balance_writer = None
+_balance_writer_lock = threading.Lock()
+
+
+def get_balance_writer():
+    global _balance_writer
+    with _balance_writer_lock:
+        if _balance_writer is None:
+            _balance_writer = BalanceWriter()
+            atexit.register(_balance_writer.cerrar)
+        return _balance_writer
+
+
+# Último balance registrado por website en este proceso: run_scheduler prioriza
+# con esto (un script puede terminar con exit 0 sin haber escrito ningún balance)
+_ultimos_balances = {}
+_ultimos_balances_lock = threading.Lock()
+
+
+def ultimos_balances_escritos():
+    """{website normalizado: datetime del último balance enviado en este proceso}."""
+    with _ultimos_balances_lock:
+        return dict(_ultimos_balances)
+
+
+def normalizar_website(website):
+    """Title case por palabra ('GAME  VAULT ' → 'Game Vault'): clave website de balances_bot."""
+    return " ".join(palabra.capitalize() for palabra in website.split())
+
+
+def fecha_balance(fecha):
+    """fecha de balances_bot como Date (acepta el texto de get_current_timestamp)."""
+    if isinstance(fecha, str):
+        return datetime.strptime(fecha, "%Y-%m-%d %H:%M:%S")
+    return fecha
+
 
 def enviar_resultado_balance(sheet, website, username, fecha=None, balance=None):
     """
     Registra un balance en MongoDB.
+    ✅ website y fecha se guardan normalizados (title case / Date): la pipeline
+       de conciliación los usa tal cual
+    ✅ Encola el doc en el BalanceWriter (insert_many en segundo plano)
     ✅ Log limpio: solo muestra registro exitoso
     """
     if fecha is None:
         fecha = get_current_timestamp()
     
     grupo = obtener_grupo(username, website)
-    website_normalized = website.strip().title()
+    website_normalized = normalizar_website(website)
     
-    _renombrar_captcha_automatico(website)
+    _archivar_captcha_confirmado(website)
     
     if EXPORT_MODE.upper() == "SHEET":
         pass
     elif EXPORT_MODE.upper() == "MYSQL":
         pass
     else:
-        client = None
         try:
-            client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=20000)
-            db = client[MONGO_DB]
-            collection = db[MONGO_COLLECTION]
+            from bson import ObjectId
             
             doc = {
+                # _id asignado aquí: los reintentos/spool no duplican el balance
+                "_id": ObjectId(),
                 "website": website_normalized,
                 "username": username,
-                "fecha": fecha,
+                "fecha": fecha_balance(fecha),
                 "balance": balance,
                 "used_as_previous": False,
                 "grupo": grupo
             }
             
-            collection.insert_one(doc)
+            get_balance_writer().enviar(doc)
+            with _ultimos_balances_lock:
+                anterior = _ultimos_balances.get(website_normalized)
+                if anterior is None or doc["fecha"] > anterior:
+                    _ultimos_balances[website_normalized] = doc["fecha"]
             logger.info(f"[✓] {website_normalized} | {username} | {balance}")
             
         except Exception as e:
             logger.error(f"[MongoDB] Error: {e}")
-        finally:
-            if client:
-                try:
-                    client.close()
-                except Exception:
-                    pass
@@ -0,0 +1,99 @@
+"""
+Contexto de ejecución explícito (website, cuenta, intento, grupo).
+
+Reemplaza la auto-detección de WEBSITE_NAME recorriendo el stack: quien
+ejecuta un sitio fija el contexto una vez y el resto del código (captchas,
+logging, métricas) lo lee en O(1) con contexto.actual().
+
+Basado en contextvars, así que cada thread (y cada tarea asyncio) tiene su
+propio contexto: dos sitios o dos cuentas corriendo en paralelo no se pisan.
+Los threads nuevos NO heredan el contexto del que los crea; para un
+ThreadPoolExecutor usar executor.submit(contexto.propagar(fn), ...).
+
+Uso:
+    with contexto.ejecucion(website=WEBSITE_NAME):
+        main()
+
+    contexto.establecer(cuenta=usuario)      # dentro del loop de cuentas
+    contexto.establecer(intento=intento + 1) # dentro del loop de reintentos
+"""
+import functools
+import contextvars
+from contextlib import contextmanager
+
+
+class Contexto:
+    """Valores del contexto (inmutable: establecer() crea uno nuevo)."""
+
+    __slots__ = ("website", "cuenta", "intento", "grupo")
+
+    def __init__(self, website=None, cuenta=None, intento=None, grupo=None):
+        object.__setattr__(self, "website", website)
+        object.__setattr__(self, "cuenta", cuenta)
+        object.__setattr__(self, "intento", intento)
+        object.__setattr__(self, "grupo", grupo)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Contexto es inmutable, usar contexto.establecer()")
+
+    def reemplazar(self, **campos):
+        valores = {campo: getattr(self, campo) for campo in self.__slots__}
+        valores.update(campos)
+        return Contexto(**valores)
+
+    def etiqueta(self):
+        """'[WEBSITE|cuenta#intento] ' para prefijar logs ('' sin contexto)."""
+        if not self.website:
+            return ""
+        partes = self.website
+        if self.cuenta:
+            partes += f"|{self.cuenta}"
+            if self.intento:
+                partes += f"#{self.intento}"
+        return f"[{partes}] "
+
+    def __repr__(self):
+        return (
+            f"Contexto(website={self.website!r}, cuenta={self.cuenta!r}, "
+            f"intento={self.intento!r}, grupo={self.grupo!r})"
+        )
+
+
+_contexto = contextvars.ContextVar("contexto_ejecucion", default=Contexto())
+
+
+def actual():
+    return _contexto.get()
+
+
+def establecer(**campos):
+    """
+    Actualiza campos del contexto actual. Al cambiar de cuenta se limpia el
+    intento. Devuelve el token para restaurar() si hace falta.
+    """
+    if "cuenta" in campos and "intento" not in campos:
+        campos["intento"] = None
+    return _contexto.set(actual().reemplazar(**campos))
+
+
+def restaurar(token):
+    _contexto.reset(token)
+
+
+@contextmanager
+def ejecucion(**campos):
+    """Fija el contexto durante el bloque y lo restaura al salir."""
+    token = establecer(**campos)
+    try:
+        yield actual()
+    finally:
+        restaurar(token)
+
+
+def propagar(fn):
+    """
+    Envuelve `fn` para que corra con una copia del contexto actual
+    (llamar en el thread que hace el submit, una vez por submit).
+    """
+    ctx = contextvars.copy_context()
+    return functools.partial(ctx.run, fn)
@@ -0,0 +1,268 @@
+"""
+Pool de drivers Chrome "calientes" compartido entre sitios.
+
+En vez de abrir un Chrome nuevo por script (varios segundos de arranque en
+frío cada vez), el pool mantiene hasta DRIVER_POOL_SIZE navegadores vivos
+durante todo el barrido:
+
+- checkout()/devolver(): presta y recupera drivers (bloquea si están todos en uso,
+  lo que además limita la RAM usada en la máquina)
+- probe de salud: un driver con la sesión caída se descarta y se crea otro
+- reciclado: cada driver se cierra tras DRIVER_POOL_MAX_USOS préstamos
+- limpieza: cookies, caché y storage (local/session/IndexedDB...) de cada origen
+  que visitó el préstamo se borran al devolverlo, para que la siguiente cuenta
+  empiece sin sesión previa
+
+Los scripts no necesitan cambios: con config.DRIVER_POOL_ENABLED activo,
+config.get_chrome_driver() devuelve un DriverPrestado cuyo quit() lo regresa
+al pool en lugar de cerrar Chrome.
+"""
+import os
+import time
+import atexit
+import threading
+from urllib.parse import urlsplit
+
+import config
+
+DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '4'))
+DRIVER_POOL_MAX_USOS = int(os.getenv('DRIVER_POOL_MAX_USOS', '25'))
+DRIVER_POOL_CHECKOUT_TIMEOUT = int(os.getenv('DRIVER_POOL_CHECKOUT_TIMEOUT', '900'))
+
+logger = config.get_logger("driver_pool")
+
+
+def driver_sano(driver):
+    """Probe de salud: la sesión existe y el navegador responde a JS."""
+    try:
+        if not getattr(driver, "session_id", None):
+            return False
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+def _origen(url):
+    """'https://host:puerto' de la URL (None si no es http/https)."""
+    try:
+        partes = urlsplit(url or "")
+    except ValueError:
+        return None
+    if partes.scheme in ("http", "https") and partes.netloc:
+        return f"{partes.scheme}://{partes.netloc}"
+    return None
+
+
+def registrar_origen(driver, url):
+    """Anota el origen de `url` como visitado por el driver (limpiar_driver borra su storage)."""
+    origen = _origen(url)
+    if not origen:
+        return
+    origenes = getattr(driver, "_origenes_visitados", None)
+    if origenes is None:
+        origenes = set()
+        driver._origenes_visitados = origenes
+    origenes.add(origen)
+
+
+def _origenes_a_limpiar(driver):
+    """
+    Orígenes visitados (driver.get de un DriverPrestado), el actual y los de
+    cada dominio con cookies (cubre redirecciones y navegación por click).
+    """
+    origenes = set(getattr(driver, "_origenes_visitados", None) or ())
+    try:
+        origen = _origen(driver.current_url)
+        if origen:
+            origenes.add(origen)
+    except Exception:
+        pass
+    try:
+        for cookie in driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", []):
+            dominio = cookie.get("domain", "").lstrip(".")
+            if dominio:
+                origenes.update((f"https://{dominio}", f"http://{dominio}"))
+    except Exception:
+        pass
+    return origenes
+
+
+def limpiar_driver(driver):
+    """
+    Borra cookies y storage del navegador para que la siguiente cuenta
+    no herede la sesión anterior. Devuelve False si el driver no respondió.
+    """
+    try:
+        # Storage de cada origen visitado (localStorage/sessionStorage del origen
+        # actual no alcanza: los tokens de las SPA de grupo2 quedan en los demás)
+        origenes = _origenes_a_limpiar(driver)
+        for origen in origenes:
+            try:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origen, "storageTypes": "all"})
+            except Exception:
+                pass
+        try:
+            driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        except Exception:
+            pass
+
+        # Cookies y caché de TODOS los dominios vía CDP; delete_all_cookies solo cubre el dominio actual
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        except Exception:
+            driver.delete_all_cookies()
+
+        driver.get("about:blank")
+        driver._origenes_visitados = set()
+        if config.VERBOSE_LOGGING:
+            logger.debug(f"[POOL] Storage limpiado en {len(origenes)} orígenes")
+        return True
+    except Exception as e:
+        if config.VERBOSE_LOGGING:
+            logger.debug(f"[POOL] Error limpiando driver: {e}")
+        return False
+
+
+def _cerrar(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPrestado:
+    """
+    Proxy de un webdriver prestado por el pool. Delega todo al driver real;
+    quit() lo devuelve al pool en vez de cerrar Chrome.
+    """
+
+    def __init__(self, pool, driver):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_driver", driver)
+        object.__setattr__(self, "_devuelto", False)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._driver, name, value)
+
+    def get(self, url):
+        registrar_origen(self._driver, url)
+        return self._driver.get(url)
+
+    def quit(self):
+        if self._devuelto:
+            return
+        object.__setattr__(self, "_devuelto", True)
+        self._pool.devolver(self._driver)
+
+    def close(self):
+        # close() en un driver de una sola ventana equivale a quit()
+        self.quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.quit()
+
+
+class DriverPool:
+    """Pool thread-safe de drivers Chrome con reciclado y probe de salud."""
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_usos=DRIVER_POOL_MAX_USOS):
+        self.size = max(1, size)
+        self.max_usos = max(1, max_usos)
+        self._libres = []      # drivers calientes disponibles
+        self._usos = {}        # id(driver) -> préstamos realizados
+        self._vivos = 0        # drivers creados y no cerrados (libres + prestados)
+        self._cond = threading.Condition()
+        self._cerrado = False
+
+    def checkout(self, timeout=DRIVER_POOL_CHECKOUT_TIMEOUT):
+        """Presta un driver sano. Bloquea hasta `timeout` si el pool está lleno."""
+        limite = time.time() + timeout
+        while True:
+            crear = False
+            with self._cond:
+                if self._cerrado:
+                    raise RuntimeError("DriverPool cerrado")
+                while not self._libres and self._vivos >= self.size:
+                    restante = limite - time.time()
+                    if restante <= 0:
+                        raise TimeoutError(f"Sin drivers libres tras {timeout}s")
+                    self._cond.wait(restante)
+                if self._libres:
+                    driver = self._libres.pop()
+                else:
+                    self._vivos += 1
+                    crear = True
+
+            if crear:
+                try:
+                    driver = config._crear_chrome_driver()
+                except Exception:
+                    with self._cond:
+                        self._vivos -= 1
+                        self._cond.notify()
+                    raise
+                self._usos[id(driver)] = 0
+                if config.VERBOSE_LOGGING:
+                    logger.debug(f"[POOL] Driver nuevo ({self._vivos}/{self.size})")
+            elif not driver_sano(driver):
+                self._descartar(driver)
+                continue
+
+            self._usos[id(driver)] = self._usos.get(id(driver), 0) + 1
+            return DriverPrestado(self, driver)
+
+    def devolver(self, driver):
+        """Recibe un driver prestado: lo limpia y lo deja caliente, o lo recicla."""
+        if isinstance(driver, DriverPrestado):
+            driver.quit()
+            return
+
+        agotado = self._usos.get(id(driver), 0) >= self.max_usos
+        if self._cerrado or agotado or not driver_sano(driver) or not limpiar_driver(driver):
+            if agotado and config.VERBOSE_LOGGING:
+                logger.debug("[POOL] Driver reciclado por max_usos")
+            self._descartar(driver)
+            return
+
+        with self._cond:
+            self._libres.append(driver)
+            self._cond.notify()
+
+    def _descartar(self, driver):
+        _cerrar(driver)
+        self._usos.pop(id(driver), None)
+        with self._cond:
+            self._vivos -= 1
+            self._cond.notify()
+
+    def cerrar(self):
+        """Cierra todos los drivers libres; los prestados se cierran al devolverse."""
+        with self._cond:
+            self._cerrado = True
+            libres, self._libres = self._libres, []
+            self._cond.notify_all()
+        for driver in libres:
+            self._descartar(driver)
+        logger.info(f"[POOL] Cerrado ({len(libres)} drivers liberados)")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Pool global del proceso (se crea en el primer uso y se cierra al salir)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.cerrar)
+            logger.info(f"[POOL] Iniciado (size={_pool.size}, max_usos={_pool.max_usos})")
+        return _pool
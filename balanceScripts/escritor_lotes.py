@@ -0,0 +1,72 @@
+"""
+Base de los escritores en segundo plano (config.BalanceWriter,
+captcha_archivo.ArchivadorCaptchas).
+
+Los items se encolan sin bloquear al que los produce y un thread daemon los
+entrega en lotes a `_procesar(lote)`: al juntar batch_size, cada
+flush_interval segundos o en cerrar() (registrado con atexit por cada
+singleton), que vacía lo que haya quedado en la cola.
+"""
+import time
+import threading
+from queue import Queue, Empty
+
+
+class EscritorEnLotes:
+    """Cola + thread que agrupa items; las subclases implementan `_procesar`."""
+
+    _FIN = object()
+
+    def __init__(self, nombre, batch_size, flush_interval, cierre_timeout=60):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.cierre_timeout = cierre_timeout
+        self._cola = Queue()
+        self._thread = threading.Thread(target=self._loop, name=nombre, daemon=True)
+        self._thread.start()
+
+    def _encolar(self, item):
+        self._cola.put(item)
+
+    def _procesar(self, lote):
+        raise NotImplementedError
+
+    def _loop(self):
+        activo = True
+        while activo:
+            item = self._cola.get()
+            if item is self._FIN:
+                break
+            batch = [item]
+            limite = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                restante = limite - time.time()
+                if restante <= 0:
+                    break
+                try:
+                    item = self._cola.get(timeout=restante)
+                except Empty:
+                    break
+                if item is self._FIN:
+                    activo = False
+                    break
+                batch.append(item)
+            self._procesar(batch)
+
+    def _drenar_cola(self):
+        batch = []
+        while True:
+            try:
+                item = self._cola.get_nowait()
+            except Empty:
+                return batch
+            if item is not self._FIN:
+                batch.append(item)
+
+    def cerrar(self):
+        """Flush final (atexit): el thread termina su lote en curso y se escribe lo que quede."""
+        self._cola.put(self._FIN)
+        self._thread.join(timeout=self.cierre_timeout)
+        pendientes = self._drenar_cola()
+        if pendientes:
+            self._procesar(pendientes)
@@ -0,0 +1,308 @@
+"""
+Esperas por evento para los flujos Selenium (en lugar de time.sleep fijos).
+
+- esperar_elemento(): MutationObserver dentro de la página (execute_async_script):
+  vuelve apenas el nodo aparece/tiene texto, sin polling desde Python
+- esperar_red_inactiva(): cuenta fetch/XHR en vuelo (hook instalado en cada
+  documento) y vuelve cuando la red queda quieta `inactividad` segundos
+- esperar_url(): cambio de URL (polling corto: una navegación real destruye
+  el documento y con él cualquier observer)
+- paso(): cronometra cada paso del flujo por sitio; resumen_pasos() y
+  log_resumen() dan n / promedio / p95 / máx por paso
+- presupuesto_cuenta(): tiempo total por cuenta; acotar() recorta cada
+  espera al restante y buscar()/buscar_opcional() hacen las búsquedas con su
+  propia espera acotada (los drivers de los motores usan implicit wait 0, así
+  un elemento opcional ausente cuesta ~0 s en vez de 2 s)
+
+Los localizadores son tuplas (By, valor) como en sitios.py; solo CSS y XPath
+se resuelven dentro de la página, el resto cae al polling con WebDriverWait.
+"""
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import config
+import contexto
+
+logger = config.get_logger("esperas")
+
+POLL_RAPIDO = 0.1
+PRESUPUESTO_CUENTA = float(os.getenv('PRESUPUESTO_CUENTA', '240'))
+TIMEOUT_REQUERIDO = 10
+TIMEOUT_OPCIONAL = 0.5
+
+_JS_OBSERVAR = """
+const [localizadores, conTexto, ms, listo] = [arguments[0], arguments[1], arguments[2], arguments[arguments.length - 1]];
+const buscar = ([by, valor]) => by === 'xpath'
+    ? document.evaluate(valor, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+    : document.querySelector(valor);
+const ok = () => localizadores.some(l => {
+    const el = buscar(l);
+    return el && (!conTexto || (el.textContent || '').trim().length > 0);
+});
+if (ok()) { listo(true); return; }
+let timer = null;
+const obs = new MutationObserver(() => {
+    if (ok()) { obs.disconnect(); clearTimeout(timer); listo(true); }
+});
+obs.observe(document.documentElement, {childList: true, subtree: true, characterData: true, attributes: true});
+timer = setTimeout(() => { obs.disconnect(); listo(ok()); }, ms);
+"""
+
+# Se instala en cada documento nuevo (CDP) o en el actual (fallback)
+_JS_HOOK_RED = """
+(() => {
+    if (window.__redEnVuelo !== undefined) return;
+    window.__redEnVuelo = 0;
+    window.__redUltimo = Date.now();
+    const fin = () => { window.__redEnVuelo = Math.max(0, window.__redEnVuelo - 1); window.__redUltimo = Date.now(); };
+    const fetchOriginal = window.fetch;
+    if (fetchOriginal) {
+        window.fetch = function () {
+            window.__redEnVuelo++;
+            return fetchOriginal.apply(this, arguments).finally(fin);
+        };
+    }
+    const sendOriginal = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__redEnVuelo++;
+        this.addEventListener('loadend', fin, {once: true});
+        return sendOriginal.apply(this, arguments);
+    };
+})();
+"""
+
+_JS_RED_INACTIVA = """
+const [inactividadMs, ms, listo] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+const limite = Date.now() + ms;
+const revisar = () => {
+    const quieta = (window.__redEnVuelo || 0) === 0 && Date.now() - (window.__redUltimo || 0) >= inactividadMs;
+    if (quieta) { listo(true); return; }
+    if (Date.now() > limite) { listo(false); return; }
+    setTimeout(revisar, 50);
+};
+revisar();
+"""
+
+_CSS_XPATH = (By.CSS_SELECTOR, By.XPATH)
+
+
+def _async(driver, script, timeout, *args):
+    driver.set_script_timeout(timeout + 2)
+    return driver.execute_async_script(script, *args)
+
+
+# ----------------------------
+# Esperas
+# ----------------------------
+def esperar_elemento(driver, localizadores, timeout=10, con_texto=False):
+    """
+    Espera a que aparezca cualquiera de los localizadores (con texto si `con_texto`).
+    Devuelve True/False (no lanza por timeout).
+    """
+    if isinstance(localizadores, tuple):
+        localizadores = [localizadores]
+    timeout = acotar(timeout)
+
+    if all(by in _CSS_XPATH for by, _ in localizadores):
+        try:
+            return bool(_async(driver, _JS_OBSERVAR, timeout, [list(l) for l in localizadores], con_texto, int(timeout * 1000)))
+        except WebDriverException as e:
+            # La página navegó durante la espera: se sigue con polling
+            if config.VERBOSE_LOGGING:
+                logger.debug(f"[ESPERA] observer interrumpido ({type(e).__name__}), polling")
+
+    def presente(d):
+        for locator in localizadores:
+            for el in d.find_elements(*locator):
+                if not con_texto or el.text.strip():
+                    return True
+        return False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_RAPIDO).until(presente)
+    except TimeoutException:
+        return False
+
+
+def esperar_url(driver, predicado, timeout=10):
+    """Espera a que predicado(url_actual) sea verdadero. Devuelve True/False."""
+    timeout = acotar(timeout)
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_RAPIDO).until(lambda d: predicado(d.current_url))
+    except TimeoutException:
+        return False
+
+
+def instalar_hook_red(driver):
+    """Cuenta fetch/XHR en vuelo en todos los documentos que cargue el driver (idempotente)."""
+    if getattr(driver, "_hook_red", False):
+        return
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _JS_HOOK_RED})
+    except Exception:
+        pass
+    try:
+        driver.execute_script(_JS_HOOK_RED)
+        driver._hook_red = True
+    except Exception:
+        pass
+
+
+def esperar_red_inactiva(driver, inactividad=0.3, timeout=10):
+    """
+    Espera a que no haya fetch/XHR en vuelo durante `inactividad` segundos.
+    Requiere instalar_hook_red() antes de la navegación; devuelve True/False.
+    """
+    timeout = acotar(timeout)
+    try:
+        driver.execute_script(_JS_HOOK_RED)
+        return bool(_async(driver, _JS_RED_INACTIVA, timeout, int(inactividad * 1000), int(timeout * 1000)))
+    except WebDriverException:
+        return False
+
+
+# ----------------------------
+# Presupuesto por cuenta
+# ----------------------------
+class PresupuestoAgotado(TimeoutError):
+    pass
+
+
+class Presupuesto:
+    """Tiempo total disponible para una cuenta y en qué se gastó."""
+
+    def __init__(self, total=PRESUPUESTO_CUENTA):
+        self.total = total
+        self.inicio = time.perf_counter()
+        self.gastado = {}
+
+    def restante(self):
+        return self.total - (time.perf_counter() - self.inicio)
+
+    def timeout(self, maximo):
+        restante = self.restante()
+        if restante <= 0:
+            raise PresupuestoAgotado(f"Presupuesto de {self.total:.0f}s agotado")
+        return min(maximo, restante)
+
+    def cargar(self, nombre, duracion):
+        self.gastado[nombre] = self.gastado.get(nombre, 0.0) + duracion
+
+    def detalle(self):
+        """'login=12.3s captcha=4.1s ...' ordenado por tiempo (pasos anidados se cuentan en ambos)."""
+        return " ".join(
+            f"{nombre}={segundos:.1f}s"
+            for nombre, segundos in sorted(self.gastado.items(), key=lambda x: -x[1])
+        )
+
+
+_presupuesto = contextvars.ContextVar("presupuesto_cuenta", default=None)
+
+
+@contextmanager
+def presupuesto_cuenta(total=PRESUPUESTO_CUENTA, log=None):
+    """Presupuesto de tiempo para el bloque (una cuenta); al salir loguea dónde se gastó."""
+    presupuesto = Presupuesto(total)
+    token = _presupuesto.set(presupuesto)
+    try:
+        yield presupuesto
+    finally:
+        _presupuesto.reset(token)
+        usado = presupuesto.total - presupuesto.restante()
+        mensaje = f"[PRESUPUESTO] {usado:.1f}s/{presupuesto.total:.0f}s {presupuesto.detalle()}"
+        if presupuesto.restante() <= 0:
+            (log or logger).warning(mensaje)
+        elif config.VERBOSE_LOGGING:
+            (log or logger).debug(mensaje)
+
+
+def acotar(maximo):
+    """`maximo` recortado al presupuesto restante de la cuenta (sin presupuesto: `maximo`)."""
+    presupuesto = _presupuesto.get()
+    return maximo if presupuesto is None else presupuesto.timeout(maximo)
+
+
+def buscar(driver, locator, maximo=TIMEOUT_REQUERIDO, condicion=EC.presence_of_element_located, nombre="buscar"):
+    """Elemento requerido: espera acotada (lanza TimeoutException si no aparece)."""
+    with paso(nombre):
+        return WebDriverWait(driver, acotar(maximo), poll_frequency=POLL_RAPIDO).until(condicion(locator))
+
+
+def buscar_opcional(driver, locator, maximo=0, visible=True, nombre="opcional"):
+    """
+    Elemento que puede no estar (popups, avisos): None si no aparece en `maximo`
+    segundos. Con maximo=0 es una sola consulta, sin espera.
+    """
+    def encontrar(d):
+        for el in d.find_elements(*locator):
+            try:
+                if not visible or el.is_displayed():
+                    return el
+            except WebDriverException:
+                pass
+        return None
+
+    with paso(nombre):
+        if maximo <= 0:
+            return encontrar(driver)
+        try:
+            return WebDriverWait(driver, acotar(maximo), poll_frequency=POLL_RAPIDO).until(encontrar)
+        except TimeoutException:
+            return None
+
+
+# ----------------------------
+# Tiempos por paso
+# ----------------------------
+_tiempos = {}
+_tiempos_lock = threading.Lock()
+
+
+@contextmanager
+def paso(nombre, website_name=None):
+    """Cronometra el bloque y lo acumula en los tiempos del sitio (y en el presupuesto de la cuenta)."""
+    website_name = website_name or contexto.actual().website or "-"
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - inicio
+        with _tiempos_lock:
+            _tiempos.setdefault(website_name, {}).setdefault(nombre, []).append(duracion)
+        presupuesto = _presupuesto.get()
+        if presupuesto is not None:
+            presupuesto.cargar(nombre, duracion)
+        if config.VERBOSE_LOGGING:
+            logger.debug(f"[PASO] {nombre}: {duracion:.2f}s")
+
+
+def resumen_pasos(website_name):
+    """{paso: {n, promedio, p95, max}} en segundos."""
+    with _tiempos_lock:
+        pasos = {nombre: sorted(valores) for nombre, valores in _tiempos.get(website_name, {}).items()}
+    resumen = {}
+    for nombre, valores in pasos.items():
+        resumen[nombre] = {
+            "n": len(valores),
+            "promedio": round(sum(valores) / len(valores), 2),
+            "p95": round(valores[min(len(valores) - 1, int(len(valores) * 0.95))], 2),
+            "max": round(valores[-1], 2),
+        }
+    return resumen
+
+
+def log_resumen(website_name, log=None):
+    log = log or logger
+    for nombre, datos in resumen_pasos(website_name).items():
+        log.info(
+            f"[PASOS] {nombre}: n={datos['n']} prom={datos['promedio']}s "
+            f"p95={datos['p95']}s max={datos['max']}s"
+        )
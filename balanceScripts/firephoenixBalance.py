@@ -7,6 +7,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from datetime import datetime
 import config
+import contexto
 
 
 WEBSITE_NAME = "Fire Phoenix"
@@ -167,6 +168,7 @@ def main():
     
     try:
         for cuenta in cuentas:
+            contexto.establecer(cuenta=cuenta["usuario"])
             usuario = cuenta['usuario']
             password = cuenta['password']
             logger.info(f"Procesando cuenta {usuario}...")
@@ -215,5 +217,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with contexto.ejecucion(website=WEBSITE_NAME):
+        main()
 
@@ -7,6 +7,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import WebDriverException
 from datetime import datetime
 import config
+import contexto
 
 WEBSITE_NAME = "GEMINI"
 MAX_LOGIN_RETRIES = 5
@@ -73,7 +74,9 @@ def main():
     driver = None
     try:
         for cuenta in site["accounts"]:
+            contexto.establecer(cuenta=cuenta["usuario"])
             for intento in range(MAX_LOGIN_RETRIES):
+                contexto.establecer(intento=intento + 1)
                 try:
                     if driver is None or not getattr(driver, "session_id", None):
                         if driver:
@@ -108,4 +111,5 @@ def main():
             driver.quit()
 
 if __name__ == "__main__":
-    main()
+    with contexto.ejecucion(website=WEBSITE_NAME):
+        main()
@@ -0,0 +1,63 @@
+"""
+Scripts de balance por grupo (comentados = deshabilitados).
+
+Lista única: la leen run_Group1..4.py y run_scheduler.py, así no se desfasan.
+"""
+
+GRUPOS_SCRIPTS = {
+    "G1": [
+        'orionBalance.py', # Sí Captcha
+        'gamevaultBalance.py', # Sí Captcha
+        'pandamasterBalance.py', # Sí Captcha
+        'juwaBalance.py', # Sí Captcha
+        # 'kingofpopBalance.py', # Sí Captcha
+        'firekirinBalance.py', # Sí Captcha
+        'nobleBalance.py', # Sí Captcha
+        'winstarBalance.py', # Sí Captcha
+        'milkywayBalance.py', # Sí Captcha
+        'cashmachineBalance.py', # Sí Captcha
+        'galaxyworldBalance.py', # Sí Captcha
+        'luckystarsBalance.py', # Sí Captcha
+        'mafiaBalance.py', # Sí Captcha
+        'gameroomBalance.py', # Sí Captcha
+    ],
+    "G2": [
+        'cashfrenzyBalance.py', # Sí Captcha
+        'winnersclubBalance.py', # Sí Captcha
+        'superdragonBalance.py', # Sí Captcha
+        'vegassweepsBalance.py', # Sí Captcha
+        'highstakesBalance.py', # Sí Captcha
+        'mrallinoneBalance.py', # Sí Captcha
+        'siriusBalance.py', # Sí Captcha
+        # 'easystreetBalance.py', # Sí Captcha
+        'vegasrollBalance.py', # Sí Captcha
+        'moolahBalance.py', # Sí Captcha
+        'lootBalance.py', # Sí Captcha
+        'luckyparadiseBalance.py', # Sí Captcha
+        'rivermonsterBalance.py', # Sí Captcha
+        'jokerBalance.py', # Sí Captcha
+        'krakenBalance.py', # Sí Captcha
+    ],
+    "G3": [
+        'acebookBalance.py', # No Captcha
+        'riversweepsBalance.py', # No Captcha
+        'bluedragonBalance.py', # No Captcha
+        'megaspinBalance.py', # No Captcha
+        'glamourspinBalance.py', # No Captcha
+        'fishgloryBalance.py', # No Captcha
+        'vegasxBalance.py', # No Captcha
+        'egameBalance.py', # No Captcha
+        'goldentreasureBalance.py', # No Captcha
+    ],
+    "G4": [
+        'geminiBalance.py', # No Captcha
+        'vblinkBalance.py', # No Captcha
+        'jackpotfrenzyBalance.py', # No Captcha
+        'ultrapandaBalance.py', # No Captcha
+        'yoloBalance.py', # No Captcha
+        'highrollerBalance.py', # No Captcha
+        'legendfireBalance.py', # No Captcha
+        '100plusBalance.py', # No Captcha
+        'firephoenixBalance.py', # No Captcha
+    ],
+}
@@ -1,115 +1,11 @@
-# jackpotfrenzyBalance.py — versión 1.1 (lógica centralizada via config.py)
-import time
-import re
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException
-from datetime import datetime
-import config
+"""
+Jackpot Frenzy Balance Bot - Script simplificado usando platform_sitios (spec en sitios.py)
+"""
+import platform_sitios
 
+# Configuración específica del website
 WEBSITE_NAME = "JACKPOT FRENZY"
 MAX_LOGIN_RETRIES = 5
 
-logger = config.get_logger(f"{WEBSITE_NAME}_bot")
-
-def login(driver, usuario, password):
-    form = WebDriverWait(driver, 20).until(
-        EC.visibility_of_element_located((By.CSS_SELECTOR, "form.login-form"))
-    )
-    user_input = form.find_element(By.CSS_SELECTOR, "input[name='username']")
-    pwd_input = form.find_element(By.CSS_SELECTOR, "input[name='password']")
-    user_input.clear()
-    user_input.send_keys(usuario)
-    pwd_input.clear()
-    pwd_input.send_keys(password)
-    btn_login = form.find_element(By.CSS_SELECTOR, "button.el-button--primary")
-    btn_login.click()
-    WebDriverWait(driver, 15).until(
-        EC.visibility_of_element_located((By.CSS_SELECTOR, "div.fixed-header"))
-    )
-
-def extraer_balance(driver):
-    time.sleep(1)
-    for _ in range(10):
-        try:
-            score_header = driver.find_element(By.CSS_SELECTOR, "div.fixed-header .score.item span.con")
-            txt = score_header.text
-            match = re.search(r"([0-9,]+)", txt)
-            if match:
-                balance = float(match.group(1).replace(",", ""))
-                logger.info(f"Balance extraído: {balance}")
-                print(f"Balance: {balance}")
-                return balance
-        except Exception as e:
-            logger.warning(f"Error extrayendo balance: {e}")
-        time.sleep(1)
-    config.guardar_evidencia(driver.get_screenshot_as_png(), "jackpotfrenzy_no_balance")
-    logger.warning("No se encontró el balance tras esperar. Ver evidencia en carpeta /screenshots")
-    return None
-
-def hacer_logout(driver):
-    try:
-        avatar_btn = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, ".avatar-wrapper.el-dropdown-selfdefine"))
-        )
-        avatar_btn.click()
-        time.sleep(1)
-        logout_btn = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//li[contains(@class,'el-dropdown-menu__item') and descendant::span[contains(.,'logout')]]")
-            )
-        )
-        logout_btn.click()
-        logger.info("Logout realizado correctamente.")
-        WebDriverWait(driver, 15).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, "form.login-form"))
-        )
-        logger.info("Formulario de login visible tras logout.")
-        time.sleep(1)
-    except Exception as e:
-        config.guardar_evidencia(driver.get_screenshot_as_png(), "jackpotfrenzy_logout_fail")
-        logger.warning(f"No se pudo hacer logout; evidencia guardada. Error: {e}")
-
-def main():
-    sheet = config.google_sheets_connect()
-    site = config.WEBSITES[WEBSITE_NAME]
-    driver = None
-    try:
-        for cuenta in site["accounts"]:
-            for intento in range(MAX_LOGIN_RETRIES):
-                try:
-                    if driver is None or not getattr(driver, "session_id", None):
-                        if driver:
-                            driver.quit()
-                        driver = config.get_chrome_driver()
-                    driver.get(site["url"])
-                    time.sleep(1)
-                    login(driver, cuenta["usuario"], cuenta["password"])
-                    logger.info(f"Login exitoso para usuario {cuenta['usuario']}")
-                    break
-                except WebDriverException as e:
-                    if "invalid session id" in str(e).lower():
-                        if driver:
-                            driver.quit()
-                        driver = config.get_chrome_driver()
-                    logger.warning(f"Intento {intento + 1} fallido para usuario {cuenta['usuario']}: {e}")
-                    time.sleep(2)
-                except Exception as e:
-                    logger.warning(f"Intento {intento + 1} fallido para usuario {cuenta['usuario']}: {e}")
-                    time.sleep(2)
-            else:
-                logger.warning(f"No se pudo iniciar sesión después de {MAX_LOGIN_RETRIES} intentos para {cuenta['usuario']}")
-                continue
-
-            balance = extraer_balance(driver)
-            hora_login = config.get_current_timestamp()
-            if balance is not None:
-                config.enviar_resultado_balance(sheet, WEBSITE_NAME, cuenta["usuario"], hora_login, balance)
-            hacer_logout(driver)
-    finally:
-        if driver:
-            driver.quit()
-
 if __name__ == "__main__":
-    main()
+    platform_sitios.run(WEBSITE_NAME, MAX_LOGIN_RETRIES)
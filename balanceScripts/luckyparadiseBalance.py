@@ -7,6 +7,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import WebDriverException, TimeoutException
 from datetime import datetime
 import config
+import contexto
 
 WEBSITE_NAME = "LUCKY PARADISE"
 MAX_LOGIN_RETRIES = 5
@@ -103,7 +104,9 @@ def main():
     try:
         driver = config.get_chrome_driver()
         for cuenta in site["accounts"]:
+            contexto.establecer(cuenta=cuenta["usuario"])
             for intento in range(MAX_LOGIN_RETRIES):
+                contexto.establecer(intento=intento + 1)
                 try:
                     driver.get(site["url"])
                     time.sleep(1)
@@ -134,4 +137,5 @@ def main():
             driver.quit()
 
 if __name__ == "__main__":
-    main()
+    with contexto.ejecucion(website=WEBSITE_NAME):
+        main()
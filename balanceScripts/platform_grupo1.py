@@ -9,15 +9,28 @@ Estructura común:
 - Balance en ID "UserBalance"
 - Usuario en ID "UserName"
 - Logout con onclick="top.location.href = 'LoginOut.aspx'"
+
+Motores:
+- HTTP (login_and_check_http): requests.Session sin navegador, se intenta primero
+- Selenium (login_and_check): respaldo cuando el motor HTTP no obtiene balance
 """
 import time
 import re
+import functools
+import threading
+import html as html_lib
+from urllib.parse import urljoin
+import requests
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.common.exceptions import NoSuchElementException, WebDriverException, TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
 import config
+import contexto
+import esperas
+import reparto
+import session_store
 
 def get_logger(website_name):
     """Obtiene logger específico para el website"""
@@ -30,10 +43,9 @@ def popup_session_timeout_handler(driver, logger):
     """
     try:
         # ✅ Esperar máximo 1 segundo a que aparezca el popup
-        wait = WebDriverWait(driver, 1)
-        ok_btn = wait.until(EC.presence_of_element_located((By.ID, "mb_btn_ok")))
+        ok_btn = esperas.buscar_opcional(driver, (By.ID, "mb_btn_ok"), maximo=1, nombre="popup_sesion")
         
-        if ok_btn.is_displayed():
+        if ok_btn:
             ok_btn.click()
             time.sleep(0.3)
             if config.VERBOSE_LOGGING:
@@ -46,12 +58,27 @@ def resolver_captcha(driver, website_name_prefix, logger):
     Resuelve captcha usando imagen con ID 'ImageCheck' e input 'txtVerifyCode'.
     ✅ Usa detección automática de grupo desde config.py
     """
+    def refrescar():
+        # Click en la imagen = captcha nuevo (sin recargar la página ni enviar el login)
+        imagen = driver.find_element(By.ID, "ImageCheck")
+        src_anterior = imagen.get_attribute("src")
+        imagen.click()
+        try:
+            WebDriverWait(driver, 3).until(
+                lambda d: d.find_element(By.ID, "ImageCheck").get_attribute("src") != src_anterior
+            )
+        except TimeoutException:
+            time.sleep(0.5)
+        return driver.find_element(By.ID, "ImageCheck").screenshot_as_png
+
     try:
-        captcha_img = driver.find_element(By.ID, "ImageCheck")
+        captcha_img = esperas.buscar(driver, (By.ID, "ImageCheck"), nombre="captcha_img")
         captcha_bytes = captcha_img.screenshot_as_png
         
         # ✅ config.resolver_captcha_2captcha detecta automáticamente el grupo
-        solucion = config.resolver_captcha_2captcha(captcha_bytes, website_name_prefix.lower())
+        solucion = config.resolver_captcha_2captcha(
+            captcha_bytes, website_name_prefix.lower(), refrescar=refrescar
+        )
         
         if not solucion:
             logger.warning(f"[CAPTCHA] No se obtuvo solución")
@@ -74,15 +101,12 @@ def close_popup_optimizado(driver, logger):
     ✅ Optimizado: Verifica si existe antes de intentar múltiples veces
     """
     try:
-        # ✅ Intentar encontrar el botón UNA SOLA VEZ
-        cancel_btn = driver.find_element(By.ID, "cancelBtn")
-        if cancel_btn.is_displayed():
+        # ✅ Intentar encontrar el botón UNA SOLA VEZ (sin espera: implicit wait 0)
+        cancel_btn = esperas.buscar_opcional(driver, (By.ID, "cancelBtn"), nombre="popup_post_login")
+        if cancel_btn:
             cancel_btn.click()
             if config.VERBOSE_LOGGING:
                 logger.debug("[POPUP] Popup post-login cerrado")
-    except NoSuchElementException:
-        # No hay popup, esto es normal
-        pass
     except Exception as e:
         if config.VERBOSE_LOGGING:
             logger.debug(f"[POPUP] No se pudo cerrar: {e}")
@@ -102,7 +126,7 @@ def extraer_balance_y_usuario(driver, logger):
         balance = int(match.group()) if match else None
         
         # Extraer username
-        elem_usuario = driver.find_element(By.ID, "UserName")
+        elem_usuario = esperas.buscar(driver, (By.ID, "UserName"), maximo=3, nombre="extraer")
         username = elem_usuario.text.strip()
         
         if balance is not None and username:
@@ -135,20 +159,58 @@ def logout(driver, logger):
             logger.debug(f"[LOGOUT] Navegando a: {logout_url}")
         
         # Esperar a que aparezca la página de login (confirma logout exitoso)
-        time.sleep(2)
-        
-        try:
-            driver.find_element(By.ID, "txtLoginName")
+        if esperas.buscar_opcional(driver, (By.ID, "txtLoginName"), maximo=5, visible=False, nombre="logout"):
             logger.info("[LOGOUT] ✓ Logout completado")
-            return True
-        except NoSuchElementException:
+        else:
             logger.warning("[LOGOUT] ⚠️ No se detectó página de login, pero logout ejecutado")
-            return True  # Asumir éxito
+        return True  # Asumir éxito
         
     except Exception as e:
         logger.error(f"[LOGOUT] ✗ Error: {e}")
         return False
 
+def login_con_sesion(driver, website_name, usuario, logger):
+    """
+    Restaura la sesión guardada en el driver y, si el sitio la acepta,
+    extrae balance/usuario sin captcha.
+    """
+    if not session_store.restaurar_sesion(driver, website_name, usuario):
+        return None, None
+    try:
+        esperas.buscar(driver, (By.ID, "UserBalance"), maximo=5, nombre="sesion")
+        close_popup_optimizado(driver, logger)
+        balance, username = extraer_balance_y_usuario(driver, logger)
+        if balance is not None and username:
+            logger.info(f"[SESSION] ✓ Sesión reutilizada: {usuario}")
+            return balance, username
+    except Exception:
+        pass
+    if config.VERBOSE_LOGGING:
+        logger.debug(f"[SESSION] Sesión rechazada: {usuario}")
+    session_store.borrar_sesion(website_name, usuario)
+    return None, None
+
+_RE_ALERT = re.compile(r"""\balert\(\s*["'](.+?)["']\s*\)""", re.IGNORECASE)
+
+
+def _mensaje_login(driver, error=None):
+    """Aviso del sitio tras un login fallido: alert JS abierto o alert('...') en el HTML."""
+    texto = getattr(error, "alert_text", None)
+    if texto:
+        return texto
+    try:
+        alerta = driver.switch_to.alert
+        texto = alerta.text
+        alerta.accept()
+        return texto
+    except Exception:
+        pass
+    try:
+        return " ".join(_RE_ALERT.findall(driver.page_source))
+    except Exception:
+        return ""
+
+
 def login_and_check(driver, website_name, usuario, password, max_retries, logger):
     """
     Intenta login con reintentos automáticos.
@@ -157,6 +219,7 @@ def login_and_check(driver, website_name, usuario, password, max_retries, logger
     website_prefix = website_name.replace(" ", "").lower()
     
     for intento in range(max_retries):
+        contexto.establecer(intento=intento + 1)
         try:
             # Cargar página
             driver.get(config.WEBSITES[website_name]["url"])
@@ -165,10 +228,12 @@ def login_and_check(driver, website_name, usuario, password, max_retries, logger
             popup_session_timeout_handler(driver, logger)
             
             # Llenar formulario
-            driver.find_element(By.ID, "txtLoginName").clear()
-            driver.find_element(By.ID, "txtLoginName").send_keys(usuario)
-            driver.find_element(By.ID, "txtLoginPass").clear()
-            driver.find_element(By.ID, "txtLoginPass").send_keys(password)
+            input_usuario = esperas.buscar(driver, (By.ID, "txtLoginName"), nombre="form_login")
+            input_usuario.clear()
+            input_usuario.send_keys(usuario)
+            input_password = esperas.buscar(driver, (By.ID, "txtLoginPass"), maximo=2, nombre="form_login")
+            input_password.clear()
+            input_password.send_keys(password)
             
             # Resolver captcha
             if not resolver_captcha(driver, website_prefix, logger):
@@ -178,22 +243,28 @@ def login_and_check(driver, website_name, usuario, password, max_retries, logger
                 continue
             
             # Click en login
-            driver.find_element(By.ID, "btnLogin").click()
+            btn_login = esperas.buscar(driver, (By.ID, "btnLogin"), maximo=2, nombre="form_login")
+            btn_login.click()
             
             # ✅ OPTIMIZACIÓN: Esperar a que DESAPAREZCA el botón de login
             # (indica que la página cambió después del login)
-            wait = WebDriverWait(driver, 10)
+            wait = WebDriverWait(driver, esperas.acotar(10))
             try:
-                wait.until(EC.staleness_of(driver.find_element(By.ID, "btnLogin")))
+                with esperas.paso("login_ok"):
+                    wait.until(EC.staleness_of(btn_login))
             except:
                 pass  # Si ya no existe, continuar
             
             # ✅ OPTIMIZACIÓN: Esperar a que aparezca UserBalance (confirma login exitoso)
             try:
-                wait.until(EC.presence_of_element_located((By.ID, "UserBalance")))
-            except:
+                esperas.buscar(driver, (By.ID, "UserBalance"), nombre="login_ok")
+            except esperas.PresupuestoAgotado:
+                raise
+            except Exception as e:
                 # Si no aparece UserBalance en 10s, el login probablemente falló
-                if config.VERBOSE_LOGGING:
+                if config.captcha_rechazado(website_name, _mensaje_login(driver, e)):
+                    logger.warning(f"[LOGIN] Intento {intento + 1}/{max_retries} - Captcha rechazado por el sitio")
+                elif config.VERBOSE_LOGGING:
                     logger.warning(f"[LOGIN] UserBalance no apareció, posible login fallido")
                 time.sleep(1)
                 continue
@@ -211,6 +282,8 @@ def login_and_check(driver, website_name, usuario, password, max_retries, logger
                 if config.VERBOSE_LOGGING:
                     logger.warning(f"[LOGIN] Intento {intento + 1}/{max_retries} - No se pudo extraer datos")
                 
+        except esperas.PresupuestoAgotado:
+            raise
         except Exception as e:
             logger.warning(f"[LOGIN] Intento {intento + 1}/{max_retries} - Error: {e}")
             if config.VERBOSE_LOGGING:
@@ -219,10 +292,335 @@ def login_and_check(driver, website_name, usuario, password, max_retries, logger
     
     logger.error(f"[LOGIN] ✗ Login falló tras {max_retries} intentos: {usuario}")
     return None, None
-def run(website_name, max_login_retries=4):
+# ============================================================
+# Motor HTTP (sin navegador)
+# ============================================================
+# Los sitios grupo1 son formularios ASP.NET simples: se puede hacer el login
+# con un requests.Session (VIEWSTATE + captcha descargado directo) y leer
+# UserBalance/UserName del HTML. Si algo falla se usa Selenium como respaldo.
+
+HTTP_TIMEOUT = 20
+HTTP_MAX_RETRIES = 2
+HTTP_MAX_FALLOS_CONSECUTIVOS = 3  # tras N fallos seguidos, el website va directo a Selenium...
+HTTP_PAUSA_TRAS_FALLOS = 30 * 60  # ...durante esta cantidad de segundos (después se reintenta HTTP)
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": config.CHROME_LANG,
+}
+
+# website -> {"fallos": consecutivos, "hasta": epoch hasta el que se usa solo Selenium}
+_http_fallos = {}
+_http_fallos_lock = threading.Lock()
+
+_RE_INPUT = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+_RE_ATRIBUTO = r"""\b{}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))"""
+_RE_FRAME = re.compile(r"""<i?frame\b[^>]*\bsrc\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+_RE_REDIRECT_JS = re.compile(r"""location\.href\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+
+def _atributo(tag, nombre):
+    match = re.search(_RE_ATRIBUTO.format(re.escape(nombre)), tag, re.IGNORECASE)
+    if not match:
+        return None
+    return html_lib.unescape(next(g for g in match.groups() if g is not None))
+
+
+def _tag_por_id(html, element_id):
+    match = re.search(
+        r"""<[a-z]+\b[^>]*\bid\s*=\s*["']{}["'][^>]*>""".format(re.escape(element_id)),
+        html, re.IGNORECASE
+    )
+    return match.group(0) if match else None
+
+
+def _texto_por_id(html, element_id):
+    """Texto plano del primer elemento con ese id (span, label, div...)."""
+    match = re.search(
+        r"""<([a-z]+)\b[^>]*\bid\s*=\s*["']{}["'][^>]*>(.*?)</\1>""".format(re.escape(element_id)),
+        html, re.IGNORECASE | re.DOTALL
+    )
+    if not match:
+        return None
+    return html_lib.unescape(re.sub(r"<[^>]+>", "", match.group(2))).strip()
+
+
+def _campos_formulario(html):
+    """Inputs hidden (__VIEWSTATE, __EVENTVALIDATION...) y mapa id -> name del resto."""
+    ocultos, nombres = {}, {}
+    for tag in _RE_INPUT.findall(html):
+        name = _atributo(tag, "name")
+        if not name:
+            continue
+        if (_atributo(tag, "type") or "").lower() == "hidden":
+            ocultos[name] = _atributo(tag, "value") or ""
+        element_id = _atributo(tag, "id")
+        if element_id:
+            nombres[element_id] = name
+    return ocultos, nombres
+
+
+def _datos_boton_login(html, nombres):
+    """Campos que ASP.NET espera según el tipo de control de btnLogin."""
+    tag = _tag_por_id(html, "btnLogin")
+    if tag is None:
+        return {}
+    name = nombres.get("btnLogin") or _atributo(tag, "name") or "btnLogin"
+    tipo = (_atributo(tag, "type") or "").lower()
+    if tag.lower().startswith("<input") and tipo == "image":
+        return {f"{name}.x": "1", f"{name}.y": "1"}
+    if tag.lower().startswith("<input") or tag.lower().startswith("<button"):
+        return {name: _atributo(tag, "value") or ""}
+    # LinkButton: javascript:__doPostBack('btnLogin','')
+    return {"__EVENTTARGET": name, "__EVENTARGUMENT": ""}
+
+
+def _buscar_balance_http(session, url, html, logger):
+    """
+    Busca UserBalance/UserName en la respuesta post-login, siguiendo
+    frames o redirecciones JS si el panel está en otra página.
+    """
+    pendientes = [(url, html)]
+    visitadas = set()
+    while pendientes and len(visitadas) < 4:
+        url_actual, contenido = pendientes.pop(0)
+        visitadas.add(url_actual)
+
+        texto_balance = _texto_por_id(contenido, "UserBalance")
+        username = _texto_por_id(contenido, "UserName")
+        if texto_balance is not None:
+            match = re.search(r"\d+", texto_balance)
+            balance = int(match.group()) if match else None
+            return balance, username, url_actual
+
+        for destino in _RE_FRAME.findall(contenido) + _RE_REDIRECT_JS.findall(contenido):
+            destino = urljoin(url_actual, html_lib.unescape(destino))
+            if destino in visitadas or "loginout" in destino.lower():
+                continue
+            try:
+                resp = session.get(destino, timeout=HTTP_TIMEOUT)
+                pendientes.append((resp.url, resp.text))
+            except Exception as e:
+                if config.VERBOSE_LOGGING:
+                    logger.debug(f"[HTTP] No se pudo abrir {destino}: {e}")
+    return None, None, None
+
+
+def _login_http_con_sesion(website_name, usuario, logger):
+    """Reutiliza las cookies guardadas (session_store) sin captcha ni login."""
+    session = requests.Session()
+    session.headers.update(HTTP_HEADERS)
+    try:
+        url = session_store.restaurar_sesion_http(session, website_name, usuario)
+        if not url:
+            return None, None
+        resp = session.get(url, timeout=HTTP_TIMEOUT)
+        balance, username, url_balance = _buscar_balance_http(session, resp.url, resp.text, logger)
+        if balance is not None and username:
+            session_store.guardar_sesion_http(session, website_name, usuario, url_balance)
+            logger.info(f"[SESSION] ✓ Sesión HTTP reutilizada: {usuario}")
+            return balance, username
+        session_store.borrar_sesion(website_name, usuario)
+    except Exception as e:
+        if config.VERBOSE_LOGGING:
+            logger.debug(f"[SESSION] Sesión HTTP rechazada: {e}")
+    finally:
+        session.close()
+    return None, None
+
+
+def login_and_check_http(website_name, usuario, password, max_retries, logger):
+    """
+    Login + extracción de balance sin navegador (requests.Session).
+
+    Returns:
+        tuple: (balance: int, username: str) o (None, None) si falla
+    """
+    url = config.WEBSITES[website_name]["url"]
+    website_prefix = website_name.replace(" ", "").lower()
+
+    # ✅ Sesión guardada del ciclo anterior: sin captcha ni login
+    if session_store.habilitado():
+        balance, username = _login_http_con_sesion(website_name, usuario, logger)
+        if balance is not None:
+            return balance, username
+
+    for intento in range(1, max_retries + 1):
+        contexto.establecer(intento=intento)
+        session = requests.Session()
+        session.headers.update(HTTP_HEADERS)
+        try:
+            resp = session.get(url, timeout=HTTP_TIMEOUT)
+            resp.raise_for_status()
+            html = resp.text
+
+            ocultos, nombres = _campos_formulario(html)
+            captcha_tag = _tag_por_id(html, "ImageCheck")
+            if "txtLoginName" not in nombres or captcha_tag is None:
+                logger.warning("[HTTP] Formulario de login no reconocido")
+                return None, None
+
+            # Captcha: misma sesión (cookie ASP.NET_SessionId) que el POST
+            captcha_url = urljoin(resp.url, _atributo(captcha_tag, "src") or "")
+            captcha_resp = session.get(captcha_url, timeout=HTTP_TIMEOUT)
+            captcha_resp.raise_for_status()
+
+            def refrescar():
+                # Cada GET a la URL del captcha genera una imagen nueva en la sesión
+                nueva = session.get(captcha_url, timeout=HTTP_TIMEOUT)
+                nueva.raise_for_status()
+                return nueva.content
+
+            solucion = config.resolver_captcha_2captcha(captcha_resp.content, website_prefix, refrescar=refrescar)
+            if not solucion:
+                if config.VERBOSE_LOGGING:
+                    logger.warning(f"[HTTP] Intento {intento}/{max_retries} - Captcha falló")
+                continue
+
+            datos = dict(ocultos)
+            datos[nombres["txtLoginName"]] = usuario
+            datos[nombres.get("txtLoginPass", "txtLoginPass")] = password
+            datos[nombres.get("txtVerifyCode", "txtVerifyCode")] = solucion
+            datos.update(_datos_boton_login(html, nombres))
+
+            form = re.search(r"<form\b[^>]*>", html, re.IGNORECASE)
+            action = _atributo(form.group(0), "action") if form else None
+            post_url = urljoin(resp.url, action or resp.url)
+
+            resp = session.post(post_url, data=datos, timeout=HTTP_TIMEOUT)
+            resp.raise_for_status()
+
+            balance, username, url_balance = _buscar_balance_http(session, resp.url, resp.text, logger)
+            if balance is not None and username:
+                logger.info(f"[HTTP] ✓ Login exitoso: {usuario}")
+                # Sin logout solo si la sesión quedó guardada para el próximo ciclo
+                if not (session_store.habilitado() and
+                        session_store.guardar_sesion_http(session, website_name, usuario, url_balance)):
+                    try:
+                        base_url = '/'.join(resp.url.split('/')[:3])
+                        session.get(f"{base_url}/LoginOut.aspx", timeout=HTTP_TIMEOUT)
+                    except Exception:
+                        pass
+                return balance, username
+
+            if config.captcha_rechazado(website_name, " ".join(_RE_ALERT.findall(resp.text))):
+                logger.warning(f"[HTTP] Intento {intento}/{max_retries} - Captcha rechazado por el sitio")
+            elif config.VERBOSE_LOGGING:
+                logger.warning(f"[HTTP] Intento {intento}/{max_retries} - Balance no encontrado")
+
+        except Exception as e:
+            logger.warning(f"[HTTP] Intento {intento}/{max_retries} - Error: {e}")
+        finally:
+            session.close()
+
+    return None, None
+
+
+def _http_habilitado(website_name):
+    if not config.GRUPO1_HTTP_ENABLED:
+        return False
+    with _http_fallos_lock:
+        estado = _http_fallos.get(website_name)
+        return estado is None or time.time() >= estado["hasta"]
+
+
+def _registrar_resultado_http(website_name, exito, logger):
+    with _http_fallos_lock:
+        if exito:
+            _http_fallos.pop(website_name, None)
+            return
+        estado = _http_fallos.setdefault(website_name, {"fallos": 0, "hasta": 0})
+        estado["fallos"] += 1
+        if estado["fallos"] < HTTP_MAX_FALLOS_CONSECUTIVOS:
+            return
+        # La pausa vence sola: en un proceso largo (run_scheduler) HTTP se vuelve a probar
+        estado["fallos"] = 0
+        estado["hasta"] = time.time() + HTTP_PAUSA_TRAS_FALLOS
+    logger.warning(
+        f"[HTTP] {website_name}: {HTTP_MAX_FALLOS_CONSECUTIVOS} fallos seguidos → "
+        f"solo Selenium por {HTTP_PAUSA_TRAS_FALLOS // 60} min"
+    )
+
+
+def _procesar_cuenta(website_name, total_cuentas, max_login_retries, sheet, worker, idx, cuenta):
+    """
+    Una cuenta (cuentas.repartir): HTTP primero, Selenium con el driver del
+    worker como respaldo. Devuelve True si registró el balance.
+    """
+    logger = worker.logger
+    usuario = cuenta['usuario']
+    password = cuenta['password']
+
+    logger.info(f"[{idx}/{total_cuentas}] Procesando: {usuario}")
+
+    balance, username = None, None
+    usa_selenium = False
+    sesion_guardada = False
+
+    # ✅ Primero sin navegador (HTTP); Selenium solo como respaldo
+    if _http_habilitado(website_name):
+        balance, username = login_and_check_http(
+            website_name, usuario, password, HTTP_MAX_RETRIES, logger
+        )
+        _registrar_resultado_http(website_name, balance is not None, logger)
+        if balance is None:
+            logger.info(f"[HTTP] Sin resultado para {usuario} → Selenium")
+
+    if balance is None:
+        usa_selenium = True
+
+        # Inicializar driver (solo si hace falta, una vez por worker)
+        driver = worker.get_driver()
+
+        # Sesión guardada primero; login completo solo si fue rechazada
+        if session_store.habilitado():
+            balance, username = login_con_sesion(driver, website_name, usuario, logger)
+            sesion_guardada = balance is not None
+
+        # Intentar login y extraer balance
+        if balance is None:
+            balance, username = login_and_check(
+                driver, website_name, usuario, password, max_login_retries, logger
+            )
+            if balance is not None and session_store.habilitado():
+                sesion_guardada = session_store.guardar_sesion(driver, website_name, usuario)
+
+    # Si login exitoso, registrar balance
+    registrado = balance is not None and username is not None
+    if registrado:
+        config.enviar_resultado_balance(
+            sheet=sheet,
+            website=website_name,
+            username=username,
+            balance=balance
+        )
+        logger.info(f"[{idx}/{total_cuentas}] ✓ Completado: {usuario}")
+    else:
+        logger.error(f"[{idx}/{total_cuentas}] ✗ No se pudo obtener balance: {usuario}")
+
+    if usa_selenium:
+        if sesion_guardada:
+            # Sin logout (invalidaría la sesión guardada): solo limpiar el navegador
+            worker.limpiar_driver()
+        else:
+            # Logout (no crítico si falla)
+            logout(worker.driver, logger)
+
+            # Delay entre cuentas
+            if worker.quedan_cuentas():
+                time.sleep(2)
+
+    return registrado
+
+
+def run(website_name, max_login_retries=4, max_paralelo=None):
     """
     Función principal para ejecutar el bot.
     ✅ Logging limpio + manejo robusto de driver
+    ✅ max_paralelo > 1: reparte las cuentas entre varios drivers en paralelo
+       (por defecto config.get_cuentas_paralelas(website_name))
     """
     logger = get_logger(website_name)
     
@@ -230,8 +628,8 @@ def run(website_name, max_login_retries=4):
     logger.info(f"🚀 Iniciando scraping: {website_name}")
     logger.info("="*70)
     
-    driver = None
     exitosos = 0
+    total_cuentas = 0
     
     try:
         # Verificar que el website existe
@@ -242,45 +640,15 @@ def run(website_name, max_login_retries=4):
         cuentas = config.WEBSITES[website_name]["accounts"]
         total_cuentas = len(cuentas)
         
-        logger.info(f"Total de cuentas: {total_cuentas}")
-        
-        # Inicializar driver
-        driver = config.get_chrome_driver()
         sheet = None
         if config.EXPORT_MODE.upper() == "SHEET":
             sheet = config.google_sheets_connect()
         
-        # Procesar cada cuenta
-        for idx, cuenta in enumerate(cuentas, 1):
-            usuario = cuenta['usuario']
-            password = cuenta['password']
-            
-            logger.info(f"[{idx}/{total_cuentas}] Procesando: {usuario}")
-            
-            # Intentar login y extraer balance
-            balance, username = login_and_check(
-                driver, website_name, usuario, password, max_login_retries, logger
-            )
-            
-            # Si login exitoso, registrar balance
-            if balance is not None and username is not None:
-                config.enviar_resultado_balance(
-                    sheet=sheet,
-                    website=website_name,
-                    username=username,
-                    balance=balance
-                )
-                exitosos += 1
-                logger.info(f"[{idx}/{total_cuentas}] ✓ Completado: {usuario}")
-            else:
-                logger.error(f"[{idx}/{total_cuentas}] ✗ No se pudo obtener balance: {usuario}")
-            
-            # Logout (no crítico si falla)
-            logout(driver, logger)
-            
-            # Delay entre cuentas
-            if idx < total_cuentas:
-                time.sleep(2)
+        exitosos = reparto.repartir(
+            website_name, cuentas,
+            functools.partial(_procesar_cuenta, website_name, total_cuentas, max_login_retries, sheet),
+            logger, max_paralelo=max_paralelo,
+        )
         
     except Exception as e:
         logger.error(f"✗ Error fatal: {e}")
@@ -288,18 +656,8 @@ def run(website_name, max_login_retries=4):
             config.log_exception(logger, "Error fatal en run()")
         
     finally:
-        # ✅ CERRAR DRIVER DE FORMA SEGURA
-        if driver:
-            try:
-                driver.quit()
-                if config.VERBOSE_LOGGING:
-                    logger.debug("[DRIVER] Driver cerrado correctamente")
-            except Exception as e:
-                # ✅ Ignorar errores al cerrar driver (no son críticos)
-                if config.VERBOSE_LOGGING:
-                    logger.debug(f"[DRIVER] Error cerrando driver (no crítico): {e}")
-        
         # Resumen final
+        esperas.log_resumen(website_name, logger)
         logger.info("="*70)
         logger.info(f"✓ {website_name} completado ({exitosos}/{total_cuentas} exitosos)")
         logger.info("="*70)
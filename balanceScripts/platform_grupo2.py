@@ -1,14 +1,19 @@
 # platform_grupo2.py
 import time
 import re
+import functools
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
 import config
+import contexto
+import esperas
+import platform_grupo2_api
+import reparto
+import session_store
 
 
 # ----------------------------
@@ -51,28 +56,6 @@ def _js_click(driver, el):
     _js(driver, "arguments[0].click();", el)
 
 
-def _native_event_click(driver, el):
-    _js(
-        driver,
-        """
-        const el = arguments[0];
-        const r = el.getBoundingClientRect();
-        const opts = {bubbles:true, cancelable:true, view:window, clientX:r.left+r.width/2, clientY:r.top+r.height/2};
-        el.dispatchEvent(new PointerEvent('pointerdown', opts));
-        el.dispatchEvent(new MouseEvent('mousedown', opts));
-        el.dispatchEvent(new PointerEvent('pointerup', opts));
-        el.dispatchEvent(new MouseEvent('mouseup', opts));
-        el.dispatchEvent(new MouseEvent('click', opts));
-        """,
-        el,
-    )
-
-
-def _visible_count(driver, css_selector):
-    els = driver.find_elements(By.CSS_SELECTOR, css_selector)
-    return sum(1 for e in els if e.is_displayed())
-
-
 def _log_modal_state(driver, logger, label):
     try:
         dialogs = driver.find_elements(By.CSS_SELECTOR, "div.el-dialog[role='dialog']")
@@ -92,236 +75,133 @@ def _log_modal_state(driver, logger, label):
 
 
 # ----------------------------
-# Hint visible (robusto)
-# ----------------------------
-def _get_visible_hint_dialog(driver):
-    candidates = []
-    candidates += driver.find_elements(By.CSS_SELECTOR, "div.el-dialog[role='dialog'][aria-label='Hint']")
-    candidates += driver.find_elements(
-        By.XPATH,
-        "//div[contains(@class,'el-dialog') and @role='dialog']"
-        "[.//span[contains(@class,'el-dialog__title') and normalize-space(.)='Hint']]",
-    )
-    candidates += driver.find_elements(
-        By.XPATH,
-        "//div[contains(@class,'el-dialog') and @role='dialog']"
-        "[.//div[contains(@class,'m-remote-login-alert-content')]]",
-    )
-
-    visibles = []
-    for m in candidates:
-        try:
-            if m.is_displayed():
-                visibles.append(m)
-        except Exception:
-            pass
-
-    return visibles[0] if visibles else None
-
-
-# ----------------------------
-# Cierres de modals
+# Barrido de modals (una sola llamada JS por ciclo)
 # ----------------------------
-def cerrar_message_box_notification(driver, logger):
+# Detecta y cierra en el navegador Notification, Hints (password / login desde
+# otra ubicación), announcement, confirm/OK genéricos y overlays huérfanos, y
+# devuelve el resumen. Si cerró algo espera la animación de salida de
+# Element-UI antes de contar lo que queda visible.
+_JS_BARRER_MODALES = """
+const listo = arguments[arguments.length - 1];
+const ESPERA_ANIMACION = arguments[0];
+
+const visible = (el) => {
+    if (!el) return false;
+    const st = getComputedStyle(el);
+    if (st.display === 'none' || st.visibility === 'hidden' || st.opacity === '0') return false;
+    const r = el.getBoundingClientRect();
+    return r.width > 0 && r.height > 0;
+};
+const texto = (el) => ((el && (el.innerText || el.textContent)) || '').trim();
+const visibles = (sel) => Array.from(document.querySelectorAll(sel)).filter(visible);
+const boton = (raiz, etiqueta) => Array.from(raiz.querySelectorAll('button'))
+    .find(b => visible(b) && texto(b).toLowerCase() === etiqueta.toLowerCase());
+
+// Secuencia de eventos nativa: algunos diálogos Vue ignoran el el.click() pelado
+const clickear = (el) => {
+    const r = el.getBoundingClientRect();
+    const opts = {bubbles: true, cancelable: true, view: window, clientX: r.left + r.width / 2, clientY: r.top + r.height / 2};
+    el.dispatchEvent(new PointerEvent('pointerdown', opts));
+    el.dispatchEvent(new MouseEvent('mousedown', opts));
+    el.dispatchEvent(new PointerEvent('pointerup', opts));
+    el.dispatchEvent(new MouseEvent('mouseup', opts));
+    el.dispatchEvent(new MouseEvent('click', opts));
+};
+
+const cerrados = [];
+const cerrar = (nombre, btn) => {
+    if (!btn) return false;
+    clickear(btn);
+    cerrados.push(nombre);
+    return true;
+};
+
+// Notification (message-box) primero: suele bloquear al resto
+for (const box of visibles('div.el-message-box')) {
+    const titulo = texto(box.querySelector('div.el-message-box__title span')).toLowerCase();
+    const ok = box.querySelector('div.el-message-box__btns') && boton(box.querySelector('div.el-message-box__btns'), 'OK');
+    cerrar(titulo === 'notification' ? 'notification' : 'msgbox_ok', ok);
+}
+
+for (const dialog of visibles("div.el-dialog[role='dialog']")) {
+    const titulo = texto(dialog.querySelector('span.el-dialog__title')).toLowerCase();
+    const contenido = texto(dialog).toLowerCase();
+    const esHint = dialog.getAttribute('aria-label') === 'Hint' || titulo === 'hint'
+        || !!dialog.querySelector('div.m-remote-login-alert-content');
+
+    if (esHint && (contenido.includes('not been changed') || contenido.includes('change your password') || contenido.includes('password'))
+            && cerrar('hint_password', boton(dialog, 'Do not remind again this month'))) continue;
+    if (esHint && (contenido.includes('different location') || contenido.includes('logged in'))
+            && cerrar('hint_login_diferente', boton(dialog, 'confirm'))) continue;
+
+    const footer = dialog.querySelector('div.el-dialog__footer');
+    if (footer && cerrar(contenido.includes('announcement') ? 'anuncio' : 'confirm', boton(footer, 'confirm'))) continue;
+}
+
+const contar = () => {
+    const resumen = {
+        dialogs: visibles("div.el-dialog[role='dialog']").length,
+        overlays: visibles('div.v-modal').length,
+        msgbox: visibles('div.el-message-box').length,
+    };
+    // Overlay sin diálogo (quedó de un modal ya cerrado): bloquea los clicks
+    if (resumen.overlays && !resumen.dialogs && !resumen.msgbox) {
+        visibles('div.v-modal').forEach(o => { o.style.display = 'none'; });
+        cerrados.push('overlay_huerfano');
+        resumen.overlays = 0;
+    }
+    resumen.cerrados = cerrados;
+    listo(resumen);
+};
+
+if (cerrados.length) setTimeout(contar, ESPERA_ANIMACION); else contar();
+"""
+
+ESPERA_ANIMACION_MODAL_MS = 350
+
+
+def barrer_modales(driver):
     """
-    Modal:
-    <div class="el-message-box"> ... <span>Notification</span> ... <span>OK</span>
-    """
-    try:
-        box = WebDriverWait(driver, 0.6).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, "div.el-message-box"))
-        )
-
-        # validar por título Notification (para no chocar con logout confirm u otros)
-        title = ""
-        try:
-            title_el = box.find_element(By.CSS_SELECTOR, "div.el-message-box__title span")
-            title = (title_el.text or "").strip()
-        except Exception:
-            title = ""
-
-        if title.lower() != "notification":
-            return False
-
-        ok_btn = box.find_element(By.XPATH, ".//div[contains(@class,'el-message-box__btns')]//button[.//span[normalize-space(.)='OK']]")
-        try:
-            ok_btn.click()
-        except Exception:
-            _js_click(driver, ok_btn)
-
-        _p("[NOTIF] ✅ cerrado (OK)")
-        logger.info("[NOTIF] ✅ cerrado (OK)")
-        return True
-    except TimeoutException:
-        return False
-    except Exception as e:
-        logger.warning(f"[NOTIF] error: {e}")
-        return False
-
-
-def cerrar_modal_anuncio(driver, logger):
-    _p("[ANUNCIO] buscando...")
-    logger.info("[ANUNCIO] buscando...")
+    Un ciclo de barrido en una sola llamada al navegador.
 
-    try:
-        WebDriverWait(driver, 0.8).until(
-            EC.visibility_of_element_located((By.XPATH, "//div[contains(@class,'el-dialog')]//span[contains(text(),'announcement')]"))
-        )
-        btn = WebDriverWait(driver, 0.8).until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//div[contains(@class,'el-dialog__footer')]//span[normalize-space(.)='confirm']/parent::button")
-            )
-        )
-        try:
-            btn.click()
-        except Exception:
-            _js_click(driver, btn)
-
-        _p("[ANUNCIO] ✅ cerrado")
-        logger.info("[ANUNCIO] ✅ cerrado")
-        return True
-    except TimeoutException:
-        return False
-    except Exception as e:
-        logger.warning(f"[ANUNCIO] error: {e}")
-        return False
-
-
-def cerrar_hint_password(driver, logger):
-    """
-    Hint password: botón "Do not remind again this month"
-    """
-    try:
-        modal = _get_visible_hint_dialog(driver)
-        if not modal:
-            return False
-
-        text = (modal.text or "").lower()
-        if ("not been changed" not in text) and ("change your password" not in text) and ("password" not in text):
-            return False
-
-        btn = modal.find_element(By.XPATH, ".//button[.//span[normalize-space()='Do not remind again this month']]")
-
-        try:
-            ActionChains(driver).move_to_element(btn).pause(0.05).click(btn).perform()
-        except Exception:
-            try:
-                _js_click(driver, btn)
-            except Exception:
-                _native_event_click(driver, btn)
-
-        _p("[HINT-PASS] ✅ cerrado (intentado)")
-        logger.info("[HINT-PASS] ✅ cerrado (intentado)")
-        return True
-    except Exception:
-        return False
-
-
-def cerrar_hint_login_diferente(driver, logger):
-    """
-    Hint different location: botón "confirm"
+    Returns:
+        dict: {cerrados: [...], dialogs, overlays, msgbox} (visibles tras el barrido)
     """
-    try:
-        modal = _get_visible_hint_dialog(driver)
-        if not modal:
-            return False
-
-        text = (modal.text or "").lower()
-        if ("different location" not in text) and ("logged in" not in text):
-            return False
-
-        btn = modal.find_element(By.XPATH, ".//button[.//span[normalize-space()='confirm']]")
-        try:
-            btn.click()
-        except Exception:
-            _js_click(driver, btn)
-
-        _p("[HINT-DIFF] ✅ confirm presionado")
-        logger.info("[HINT-DIFF] ✅ confirm presionado")
-        return True
-    except Exception:
-        return False
-
-
-def cerrar_modales_genericos(driver, logger):
-    closed_any = False
-
-    # confirm genérico (footer)
-    try:
-        btn = WebDriverWait(driver, 0.5).until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//div[contains(@class,'el-dialog__footer')]//span[normalize-space(.)='confirm']/parent::button")
-            )
-        )
-        try:
-            btn.click()
-        except Exception:
-            _js_click(driver, btn)
-
-        _p("[GENERIC] cerró confirm")
-        logger.info("[GENERIC] cerró confirm")
-        closed_any = True
-    except TimeoutException:
-        pass
-    except Exception:
-        pass
-
-    # OK genérico (diálogos tipo message-box que no sean Notification)
-    try:
-        btn = WebDriverWait(driver, 0.5).until(
-            EC.element_to_be_clickable((By.XPATH, "//div[contains(@class,'el-message-box__btns')]//button[.//span[normalize-space(.)='OK']]"))
-        )
-        try:
-            btn.click()
-        except Exception:
-            _js_click(driver, btn)
-
-        _p("[GENERIC] cerró OK (message-box)")
-        logger.info("[GENERIC] cerró OK (message-box)")
-        closed_any = True
-    except TimeoutException:
-        pass
-    except Exception:
-        pass
-
-    return closed_any
+    driver.set_script_timeout(10)
+    return driver.execute_async_script(_JS_BARRER_MODALES, ESPERA_ANIMACION_MODAL_MS)
 
 
 def fast_close_all_modals(driver, logger, cycles=5):
     """
     Barrido rápido: intenta cerrar TODOS los modals conocidos por ciclo.
+    ✅ Cada ciclo es una sola llamada JS (antes: decenas de probes WebDriver)
     """
     _p(f"[FAST-CLOSE] start cycles={cycles}")
     logger.info(f"[FAST-CLOSE] start cycles={cycles}")
 
     for c in range(1, cycles + 1):
-        _p(f"[FAST-CLOSE] cycle {c}/{cycles}")
-        logger.info(f"[FAST-CLOSE] cycle {c}/{cycles}")
-
-        # Nuevo: Notification primero (suele bloquear)
-        cerrar_message_box_notification(driver, logger)
-
-        # Hint(s)
-        cerrar_hint_password(driver, logger)
-        cerrar_hint_login_diferente(driver, logger)
-
-        # anuncio + genéricos
-        cerrar_modal_anuncio(driver, logger)
-        cerrar_modales_genericos(driver, logger)
-
-        visible_dialogs = _visible_count(driver, "div.el-dialog[role='dialog']")
-        visible_overlays = _visible_count(driver, "div.v-modal")
-        visible_msgbox = _visible_count(driver, "div.el-message-box")
+        try:
+            resumen = barrer_modales(driver)
+        except Exception as e:
+            _p(f"[FAST-CLOSE] error: {e}")
+            logger.warning(f"[FAST-CLOSE] error: {e}")
+            return False
 
-        _p(f"[FAST-CLOSE] visible_dialogs={visible_dialogs} visible_overlays={visible_overlays} visible_msgbox={visible_msgbox}")
-        logger.info(f"[FAST-CLOSE] visible_dialogs={visible_dialogs} visible_overlays={visible_overlays} visible_msgbox={visible_msgbox}")
+        msg = (
+            f"[FAST-CLOSE] cycle {c}/{cycles} cerrados={resumen['cerrados']} "
+            f"visible_dialogs={resumen['dialogs']} visible_overlays={resumen['overlays']} visible_msgbox={resumen['msgbox']}"
+        )
+        _p(msg)
+        logger.info(msg)
 
-        if visible_dialogs == 0 and visible_overlays == 0 and visible_msgbox == 0:
+        if resumen["dialogs"] == 0 and resumen["overlays"] == 0 and resumen["msgbox"] == 0:
             _p("[FAST-CLOSE] CLEAN -> stop")
             logger.info("[FAST-CLOSE] CLEAN -> stop")
             return True
 
-        time.sleep(0.25)
+        # Quedan modals que este ciclo no reconoció: dar tiempo a que aparezcan sus botones
+        if not resumen["cerrados"]:
+            time.sleep(0.25)
 
     _p("[FAST-CLOSE] end cycles (pueden quedar overlays)")
     logger.warning("[FAST-CLOSE] end cycles (pueden quedar overlays)")
@@ -336,13 +216,13 @@ def confirmar_login_exitoso(driver, logger, timeout=10):
     logger.info("[LOGIN-OK] esperando dashboard...")
 
     try:
-        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.score-container")))
+        WebDriverWait(driver, esperas.acotar(timeout)).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.score-container")))
         _p("[LOGIN-OK] ✅ score-container detectado")
         logger.info("[LOGIN-OK] ✅ score-container detectado")
         return True
     except TimeoutException:
         try:
-            WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.account-container")))
+            WebDriverWait(driver, esperas.acotar(2)).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.account-container")))
             _p("[LOGIN-OK] ✅ account-container detectado")
             logger.info("[LOGIN-OK] ✅ account-container detectado")
             return True
@@ -356,7 +236,7 @@ def login(driver, usuario, password, logger):
     _p(f"[LOGIN] usuario={usuario}")
     logger.info(f"[LOGIN] usuario={usuario}")
 
-    wait = WebDriverWait(driver, 10)
+    wait = WebDriverWait(driver, esperas.acotar(10))
 
     user_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input.el-input__inner[name='userName']")))
     user_input.clear()
@@ -382,15 +262,17 @@ def extraer_balance_y_usuario(driver, logger):
     _p("[EXTRACT] iniciando...")
     logger.info("[EXTRACT] iniciando...")
 
-    balance_elem = driver.find_element(
-        By.XPATH,
-        "//div[contains(@class,'score-container')]//span[not(ancestor::i[contains(@class,'el-icon-loading')])]",
+    balance_elem = esperas.buscar(
+        driver,
+        (By.XPATH, "//div[contains(@class,'score-container')]//span[not(ancestor::i[contains(@class,'el-icon-loading')])]"),
+        maximo=3,
+        nombre="extraer",
     )
     texto_balance = balance_elem.text
     match = re.search(r"[0-9,\.]+", texto_balance)
     balance = float(match.group().replace(",", "")) if match else None
 
-    usuario_elem = driver.find_element(By.XPATH, "//div[contains(@class,'account-container')]//p")
+    usuario_elem = esperas.buscar(driver, (By.XPATH, "//div[contains(@class,'account-container')]//p"), maximo=3, nombre="extraer")
     username = usuario_elem.text.strip()
 
     _p(f"[EXTRACT] balance={balance} username='{username}' raw='{texto_balance}'")
@@ -403,7 +285,7 @@ def extraer_balance_y_usuario(driver, logger):
 # ----------------------------
 def abrir_sidebar(driver, logger):
     try:
-        driver.find_element(By.CLASS_NAME, "hamburger").click()
+        esperas.buscar(driver, (By.CLASS_NAME, "hamburger"), maximo=3, nombre="logout").click()
         _p("[SIDEBAR] abierto")
         logger.info("[SIDEBAR] abierto")
         time.sleep(0.4)
@@ -417,14 +299,14 @@ def logout(driver, logger):
 
     try:
         time.sleep(0.8)
-        logout_btn = WebDriverWait(driver, 6).until(
+        logout_btn = WebDriverWait(driver, esperas.acotar(6)).until(
             EC.element_to_be_clickable((By.XPATH, "//span[normalize-space(text())='Logout']/parent::button"))
         )
         logout_btn.click()
         _p("[LOGOUT] click Logout")
         logger.info("[LOGOUT] click Logout")
 
-        ok_btn = WebDriverWait(driver, 6).until(
+        ok_btn = WebDriverWait(driver, esperas.acotar(6)).until(
             EC.element_to_be_clickable((By.XPATH, "//div[contains(@class,'el-message-box__btns')]//button[.//span[normalize-space(.)='OK']]"))
         )
         try:
@@ -444,8 +326,33 @@ def logout(driver, logger):
 # ----------------------------
 # Flujo principal por cuenta
 # ----------------------------
+def login_con_sesion(driver, website_name, usuario, logger):
+    """Restaura la sesión guardada; si el panel la acepta extrae el balance sin login."""
+    if not session_store.restaurar_sesion(driver, website_name, usuario):
+        return None, None, None
+
+    try:
+        if confirmar_login_exitoso(driver, logger, timeout=5):
+            hora_login = config.get_current_timestamp()
+            with esperas.paso("modales"):
+                fast_close_all_modals(driver, logger, cycles=5)
+            balance, username = extraer_balance_y_usuario(driver, logger)
+            if balance is not None and username:
+                _p(f"[SESSION] ✅ sesión reutilizada usuario={usuario}")
+                logger.info(f"[SESSION] ✅ sesión reutilizada usuario={usuario}")
+                return balance, username, hora_login
+    except Exception as e:
+        logger.warning(f"[SESSION] error validando sesión: {e}")
+
+    _p(f"[SESSION] sesión rechazada usuario={usuario}")
+    logger.info(f"[SESSION] sesión rechazada usuario={usuario}")
+    session_store.borrar_sesion(website_name, usuario)
+    return None, None, None
+
+
 def login_and_check(driver, website_name, usuario, password, url_login, max_retries, logger):
     for intento in range(1, max_retries + 1):
+        contexto.establecer(intento=intento)
         _p(f"[FLOW] intento {intento}/{max_retries}")
         logger.info(f"[FLOW] intento {intento}/{max_retries}")
 
@@ -454,6 +361,10 @@ def login_and_check(driver, website_name, usuario, password, url_login, max_retr
             driver.get(url_login)
             time.sleep(1.2)
 
+            # Captura XHR para que el motor API aprenda endpoints/token
+            if config.GRUPO2_API_ENABLED:
+                platform_grupo2_api.instalar_captura(driver)
+
             login(driver, usuario, password, logger)
 
             # Confirmar login exitoso lo antes posible
@@ -467,7 +378,8 @@ def login_and_check(driver, website_name, usuario, password, url_login, max_retr
             logger.info(f"[FLOW] ✅ LOGIN OK -> hora_login={hora_login}")
 
             # Barrido rápido de modals (incluye Notification)
-            fast_close_all_modals(driver, logger, cycles=5)
+            with esperas.paso("modales"):
+                fast_close_all_modals(driver, logger, cycles=5)
 
             # Extraer balance/usuario
             time.sleep(0.6)
@@ -478,6 +390,8 @@ def login_and_check(driver, website_name, usuario, password, url_login, max_retr
             _screenshot(driver, logger, f"extract_failed_{intento}")
             time.sleep(1.2)
 
+        except esperas.PresupuestoAgotado:
+            raise
         except Exception as e:
             _p(f"[FLOW] error: {e}")
             logger.error(f"[FLOW] error: {e}")
@@ -488,47 +402,88 @@ def login_and_check(driver, website_name, usuario, password, url_login, max_retr
     return None, None, None
 
 
-def run(website_name, max_login_retries=3):
-    logger = get_logger(website_name)
-    _p(f"=== RUN {website_name} ===")
-    logger.info(f"=== RUN {website_name} ===")
+def _procesar_cuenta(website_name, total, url_login, max_login_retries, sheet, worker, idx, cuenta):
+    """
+    Una cuenta (reparto.repartir): motor API primero, Selenium con el driver
+    del worker como respaldo. Devuelve True si registró el balance.
+    """
+    logger = worker.logger
+    usuario = cuenta["usuario"]
+    password = cuenta["password"]
 
-    driver = None
-    try:
-        driver = config.get_chrome_driver()
-        sheet = config.google_sheets_connect()
+    _p(f"--- CUENTA {idx}/{total} {usuario} ---")
+    logger.info(f"[CUENTA] {idx}/{total} usuario={usuario}")
 
-        url_login = config.WEBSITES[website_name]["url"]
-        cuentas = config.WEBSITES[website_name]["accounts"]
+    balance, username, hora_login = None, None, None
+    usa_selenium = False
+    sesion_guardada = False
 
-        for idx, cuenta in enumerate(cuentas, 1):
-            usuario = cuenta["usuario"]
-            password = cuenta["password"]
+    # Motor API primero (1 request con token cacheado); Selenium como respaldo
+    if config.GRUPO2_API_ENABLED:
+        balance, username, hora_login = platform_grupo2_api.login_and_check_api(
+            website_name, usuario, password, logger
+        )
 
-            _p(f"--- CUENTA {idx}/{len(cuentas)} {usuario} ---")
-            logger.info(f"[CUENTA] {idx}/{len(cuentas)} usuario={usuario}")
+    if balance is None:
+        usa_selenium = True
+        driver = worker.get_driver()
 
+        if session_store.habilitado():
+            balance, username, hora_login = login_con_sesion(driver, website_name, usuario, logger)
+            sesion_guardada = balance is not None
+
+        if balance is None:
             balance, username, hora_login = login_and_check(
                 driver, website_name, usuario, password, url_login, max_login_retries, logger
             )
 
-            if balance is not None and username:
-                config.enviar_resultado_balance(sheet, website_name, username, hora_login, balance)
-                _p("[RESULT] registrado")
-                logger.info("[RESULT] registrado")
-            else:
-                _p("[RESULT] sin resultado")
-                logger.warning("[RESULT] sin resultado")
-
-            abrir_sidebar(driver, logger)
-            logout(driver, logger)
+            if balance is not None and config.GRUPO2_API_ENABLED:
+                platform_grupo2_api.aprender_api(
+                    driver, website_name, usuario, password, balance, logger, username=username
+                )
+            if balance is not None and session_store.habilitado():
+                sesion_guardada = session_store.guardar_sesion(driver, website_name, usuario)
+
+    registrado = balance is not None and bool(username)
+    if registrado:
+        config.enviar_resultado_balance(sheet, website_name, username, hora_login, balance)
+        _p("[RESULT] registrado")
+        logger.info("[RESULT] registrado")
+    else:
+        _p("[RESULT] sin resultado")
+        logger.warning("[RESULT] sin resultado")
+
+    if usa_selenium:
+        if sesion_guardada or platform_grupo2_api.tiene_token(website_name, usuario):
+            # El logout invalidaría sesión/token guardados: solo se limpia el navegador
+            worker.limpiar_driver()
+        else:
+            abrir_sidebar(worker.driver, logger)
+            logout(worker.driver, logger)
             time.sleep(1.5)
 
-    finally:
-        if driver:
-            driver.quit()
-            _p("[CLEANUP] driver cerrado")
-            logger.info("[CLEANUP] driver cerrado")
+    return registrado
+
+
+def run(website_name, max_login_retries=3, max_paralelo=None):
+    logger = get_logger(website_name)
+    _p(f"=== RUN {website_name} ===")
+    logger.info(f"=== RUN {website_name} ===")
+
+    sheet = config.google_sheets_connect()
+
+    url_login = config.WEBSITES[website_name]["url"]
+    cuentas = config.WEBSITES[website_name]["accounts"]
+
+    registrados = reparto.repartir(
+        website_name, cuentas,
+        functools.partial(_procesar_cuenta, website_name, len(cuentas), url_login, max_login_retries, sheet),
+        logger, max_paralelo=max_paralelo,
+    )
+
+    esperas.log_resumen(website_name, logger)
+    _p(f"=== FIN {website_name} ({registrados}/{len(cuentas)}) ===")
+    logger.info(f"=== FIN {website_name} ({registrados}/{len(cuentas)}) ===")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,569 @@
+"""
+Platform Grupo 2 - Motor API (sin navegador) para los paneles Vue/Element-UI.
+
+Estos paneles (Egames, ACE BOOK, VBLINK, ...) piden el score a un backend JSON.
+Como cada sitio usa endpoints distintos, el motor los APRENDE del propio
+navegador:
+
+1. Antes del login con Selenium se instala un hook sobre XMLHttpRequest que
+   registra método, URL, headers, body y respuesta de cada request (axios).
+2. Con el balance ya extraído del DOM se busca en las capturas:
+   - el request cuyo JSON contiene ese balance  -> endpoint de score + path
+   - el POST cuyo body contiene usuario/password -> plantilla de login
+   - el string de la respuesta de login que aparece en los headers del
+     request de score -> path del token y formato del header
+   - el usuario mostrado en el panel (account-container) -> path en la
+     respuesta de score, y además se guarda por cuenta en la spec
+3. El request de score se guarda como plantilla: los parámetros iguales al
+   usuario de login / usuario mostrado pasan a {usuario} / {username}. Si
+   contiene otro valor propio de la cuenta (ids de las respuestas, datos del
+   login) la spec se rechaza: reenviarlo con otra cuenta leería el balance
+   equivocado.
+4. La especificación se guarda por website en api_grupo2.json y el token
+   (headers) se cachea por cuenta en memoria y, si session_store está
+   habilitado, cifrado en disco (sobrevive a los scripts de un solo run).
+
+En los ciclos siguientes el balance se lee con 1 request HTTP (o login + 1
+request si el token expiró). Si algo falla, platform_grupo2 usa Selenium.
+"""
+import os
+import json
+import time
+import threading
+from urllib.parse import quote, quote_plus, unquote, urlsplit, parse_qsl
+
+import requests
+
+import config
+import session_store
+
+API_SPEC_FILE = os.path.join(config.BASE_FOLDER, "api_grupo2.json")
+API_TIMEOUT = 15
+API_TOKEN_TTL = int(os.getenv('GRUPO2_API_TOKEN_TTL', str(6 * 3600)))
+
+CLAVES_SALDO = ("score", "balance", "money", "credit", "coin", "amount", "gold")
+CLAVES_IGNORADAS = {"code", "status", "errno", "errcode", "id", "page", "total", "type", "state"}
+# Versión del formato de spec: las anteriores (score sin plantilla) se vuelven a aprender
+SPEC_VERSION = 2
+# Valores más cortos no se consideran ids de cuenta (evita falsos positivos con page=1, etc.)
+ID_MIN_LEN = 3
+
+# (website, usuario) -> {"headers": {...}, "ts": epoch}
+_tokens = {}
+_tokens_lock = threading.Lock()
+_specs_lock = threading.Lock()
+_specs = None
+_thread_local = threading.local()
+
+
+# Hook sobre XMLHttpRequest: registra cada request en window.__apiCaptura
+JS_CAPTURA = r"""
+if (!window.__apiCaptura) {
+    window.__apiCaptura = [];
+    const P = XMLHttpRequest.prototype;
+    const open = P.open, send = P.send, setHeader = P.setRequestHeader;
+    P.open = function (method, url) {
+        try { this.__c = {method: String(method).toUpperCase(), url: new URL(url, location.href).href, headers: {}}; } catch (e) {}
+        return open.apply(this, arguments);
+    };
+    P.setRequestHeader = function (k, v) {
+        if (this.__c) { this.__c.headers[k] = v; }
+        return setHeader.apply(this, arguments);
+    };
+    P.send = function (body) {
+        const c = this.__c;
+        if (c) {
+            c.body = (typeof body === 'string') ? body : null;
+            this.addEventListener('load', function () {
+                c.status = this.status;
+                if (this.responseType === '' || this.responseType === 'text') {
+                    c.response = String(this.responseText).slice(0, 50000);
+                }
+                if (window.__apiCaptura.length < 200) { window.__apiCaptura.push(c); }
+            });
+        }
+        return send.apply(this, arguments);
+    };
+}
+"""
+
+
+def get_session():
+    """Session HTTP por thread (connection pooling)."""
+    if not hasattr(_thread_local, "session"):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
+
+
+# ----------------------------
+# Specs aprendidas (api_grupo2.json)
+# ----------------------------
+def _cargar_specs():
+    global _specs
+    if _specs is None:
+        try:
+            with open(API_SPEC_FILE, encoding="utf-8") as f:
+                _specs = json.load(f)
+        except (OSError, ValueError):
+            _specs = {}
+    return _specs
+
+
+def get_spec(website_name):
+    """Spec vigente del website (None si no hay, es de otra versión o fue rechazada)."""
+    with _specs_lock:
+        spec = _cargar_specs().get(website_name)
+    if not spec or spec.get("version") != SPEC_VERSION or spec.get("rechazada"):
+        return None
+    return spec
+
+
+def _usuarios_conocidos(website_name):
+    """{usuario de login: usuario mostrado} guardados en la spec (también de versiones anteriores)."""
+    with _specs_lock:
+        return dict((_cargar_specs().get(website_name) or {}).get("usuarios") or {})
+
+
+def _guardar_spec(website_name, spec):
+    with _specs_lock:
+        specs = _cargar_specs()
+        specs[website_name] = spec
+        tmp_path = API_SPEC_FILE + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(specs, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, API_SPEC_FILE)
+
+
+# ----------------------------
+# Helpers JSON
+# ----------------------------
+def _json(texto):
+    try:
+        return json.loads(texto) if texto else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _hojas(obj, path=()):
+    """Itera (path, valor) de todas las hojas de un JSON."""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            yield from _hojas(v, path + (k,))
+    elif isinstance(obj, list):
+        for i, v in enumerate(obj):
+            yield from _hojas(v, path + (i,))
+    else:
+        yield list(path), obj
+
+
+def _valor_en(obj, path):
+    for clave in path:
+        if isinstance(obj, dict) and clave in obj:
+            obj = obj[clave]
+        elif isinstance(obj, list) and isinstance(clave, int) and clave < len(obj):
+            obj = obj[clave]
+        else:
+            return None
+    return obj
+
+
+def _a_numero(valor):
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    if isinstance(valor, str):
+        try:
+            return float(valor.replace(",", "").strip())
+        except ValueError:
+            return None
+    return None
+
+
+# ----------------------------
+# Aprendizaje desde el navegador
+# ----------------------------
+def instalar_captura(driver):
+    """Instala el hook XHR en la página actual (llamar antes del click de login)."""
+    try:
+        driver.execute_script(JS_CAPTURA)
+    except Exception:
+        pass
+
+
+def _codificar(valor, codificacion):
+    if codificacion == "json":
+        return json.dumps(valor)[1:-1]
+    if codificacion == "url":
+        return quote_plus(valor)
+    return valor
+
+
+def _plantilla_login(captura, usuario, password):
+    """Convierte el body del login en plantilla con {usuario}/{password}."""
+    body = captura.get("body") or ""
+    for codificacion in ("raw", "json", "url"):
+        u, p = _codificar(usuario, codificacion), _codificar(password, codificacion)
+        if u in body and p in body:
+            plantilla = body.replace(p, "\x00P\x00").replace(u, "\x00U\x00")
+            plantilla = plantilla.replace("{", "{{").replace("}", "}}")
+            plantilla = plantilla.replace("\x00P\x00", "{password}").replace("\x00U\x00", "{usuario}")
+            return plantilla, codificacion
+    return None, None
+
+
+def _es_clave_id(clave):
+    clave = str(clave).lower()
+    return clave.endswith("id") or clave in ("uid", "account", "accountno", "token")
+
+
+def _valores_de_cuenta(capturas, captura_login, excluir):
+    """
+    Valores propios de la cuenta que no deben quedar fijos en la plantilla de
+    score: hojas con clave tipo id de cualquier respuesta capturada y strings
+    largos de la respuesta de login (tokens, sesión).
+    """
+    valores = set()
+    for c in capturas:
+        for path, valor in _hojas(_json(c.get("response"))):
+            if isinstance(valor, bool) or not isinstance(valor, (str, int)):
+                continue
+            texto = str(valor)
+            if len(texto) < ID_MIN_LEN:
+                continue
+            clave = path[-1] if path else ""
+            if _es_clave_id(clave) or (c is captura_login and isinstance(valor, str) and len(texto) >= 6):
+                valores.add(texto)
+    return valores - set(excluir)
+
+
+def _fijo(texto):
+    """Texto literal dentro de una plantilla str.format."""
+    return texto.replace("{", "{{").replace("}", "}}")
+
+
+def _marcar(valor, marcadores, de_cuenta, rechazados):
+    """Marcador para el valor de un parámetro (None = fijo); anota los valores de cuenta."""
+    texto = str(valor)
+    for marcador, v in marcadores.items():
+        if v and texto == v:
+            return marcador
+    if texto in de_cuenta:
+        rechazados.add(texto)
+    return None
+
+
+def _plantilla_pares(pares, marcadores, de_cuenta, rechazados):
+    """'k=v&...' (query o form) con los valores marcados como {marcador}."""
+    partes = []
+    for k, v in pares:
+        marcador = _marcar(v, marcadores, de_cuenta, rechazados)
+        partes.append(f"{_fijo(quote_plus(k))}=" + (f"{{{marcador}}}" if marcador else _fijo(quote_plus(v))))
+    return "&".join(partes)
+
+
+def _plantilla_url(url, marcadores, de_cuenta, rechazados):
+    partes = urlsplit(url)
+    segmentos = []
+    for segmento in partes.path.split("/"):
+        marcador = _marcar(unquote(segmento), marcadores, de_cuenta, rechazados)
+        segmentos.append(f"{{{marcador}}}" if marcador else _fijo(segmento))
+    plantilla = _fijo(f"{partes.scheme}://{partes.netloc}") + "/".join(segmentos)
+    if partes.query:
+        plantilla += "?" + _plantilla_pares(parse_qsl(partes.query, keep_blank_values=True), marcadores, de_cuenta, rechazados)
+    return plantilla
+
+
+def _plantilla_body(body, marcadores, de_cuenta, rechazados):
+    """(plantilla, codificacion) del body: JSON, formulario o texto."""
+    if not body:
+        return body, "raw"
+
+    data = _json(body)
+    if isinstance(data, (dict, list)):
+        def marcar(obj):
+            if isinstance(obj, dict):
+                return {k: marcar(v) for k, v in obj.items()}
+            if isinstance(obj, list):
+                return [marcar(v) for v in obj]
+            if isinstance(obj, (str, int)) and not isinstance(obj, bool):
+                marcador = _marcar(obj, marcadores, de_cuenta, rechazados)
+                if marcador and isinstance(obj, str):
+                    return f"\x00{marcador}\x00"
+            return obj
+
+        plantilla = _fijo(json.dumps(marcar(data), separators=(",", ":"), ensure_ascii=False))
+        for marcador in marcadores:
+            plantilla = plantilla.replace(json.dumps(f"\x00{marcador}\x00"), f'"{{{marcador}}}"')
+        return plantilla, "json"
+
+    pares = parse_qsl(body, keep_blank_values=True)
+    if pares and "=" in body:
+        return _plantilla_pares(pares, marcadores, de_cuenta, rechazados), "url"
+
+    # Texto sin estructura: solo se acepta si no contiene datos de la cuenta
+    for marcador, v in marcadores.items():
+        if v and body == v:
+            return f"{{{marcador}}}", "raw"
+    rechazados.update(v for v in list(de_cuenta) + list(marcadores.values()) if v and v in body)
+    return _fijo(body), "raw"
+
+
+def aprender_api(driver, website_name, usuario, password, balance, logger, username=None):
+    """
+    Analiza las requests capturadas durante el login Selenium y guarda la spec
+    del website + los headers de autenticación de la cuenta.
+    """
+    try:
+        capturas = driver.execute_script("return window.__apiCaptura || [];") or []
+    except Exception:
+        return False
+
+    # Candidatos: hojas JSON con el mismo valor que el balance del DOM,
+    # priorizando claves con nombre de saldo (evita confundir con "code": 0)
+    candidatos = []
+    for c in capturas:
+        data = _json(c.get("response"))
+        if data is None:
+            continue
+        for path, valor in _hojas(data):
+            numero = _a_numero(valor)
+            if numero is None or abs(numero - float(balance)) >= 0.005:
+                continue
+            clave = str(path[-1]).lower() if path else ""
+            puntaje = 0
+            if any(h in clave for h in CLAVES_SALDO):
+                puntaje += 2
+            if clave in CLAVES_IGNORADAS:
+                puntaje -= 2
+            candidatos.append((puntaje, c, path))
+
+    candidatos.sort(key=lambda x: -x[0])
+    if not candidatos or candidatos[0][0] < 0 or (candidatos[0][0] == 0 and float(balance) == 0):
+        logger.info("[API] No se encontró el request de score en las capturas")
+        return False
+
+    _, captura_score, path_balance = candidatos[0]
+    headers = {k: v for k, v in (captura_score.get("headers") or {}).items() if k.lower() != "content-length"}
+
+    # Usuario mostrado dentro de la respuesta de score (clave del balance en Mongo)
+    path_username = None
+    if username:
+        for path, valor in _hojas(_json(captura_score.get("response"))):
+            if isinstance(valor, str) and valor.strip() == username:
+                path_username = path
+                break
+
+    usuarios = _usuarios_conocidos(website_name)
+    if username:
+        usuarios[usuario] = username
+
+    spec = {
+        "version": SPEC_VERSION,
+        "score": {
+            "method": captura_score["method"],
+            "path_balance": path_balance,
+            "path_username": path_username,
+        },
+        "usuarios": usuarios,
+        "aprendido": config.get_current_timestamp(),
+    }
+
+    # Login: POST con usuario y password en el body
+    captura_login = None
+    for c in capturas:
+        if c.get("method") != "POST":
+            continue
+        plantilla, codificacion = _plantilla_login(c, usuario, password)
+        if not plantilla:
+            continue
+        captura_login = c
+        data_login = _json(c.get("response"))
+        token_info = None
+        for path, valor in _hojas(data_login):
+            if not isinstance(valor, str) or len(valor) < 16:
+                continue
+            for header, header_valor in headers.items():
+                if valor in str(header_valor):
+                    token_info = (path, header, str(header_valor).replace(valor, "{token}"))
+                    break
+            if token_info:
+                break
+        if token_info:
+            spec["login"] = {
+                "method": "POST",
+                "url": c["url"],
+                "body": plantilla,
+                "codificacion": codificacion,
+                "content_type": (c.get("headers") or {}).get("Content-Type", "application/json;charset=UTF-8"),
+                "path_token": token_info[0],
+                "token_header": token_info[1],
+                "token_formato": token_info[2],
+            }
+        break
+
+    # Plantilla del score: usuario/username parametrizados, otros datos de la cuenta → rechazo
+    marcadores = {"usuario": usuario, "username": username}
+    de_cuenta = _valores_de_cuenta(capturas, captura_login, excluir=(usuario, username, password))
+    rechazados = set()
+    spec["score"]["url"] = _plantilla_url(captura_score["url"], marcadores, de_cuenta, rechazados)
+    spec["score"]["body"], spec["score"]["codificacion"] = _plantilla_body(
+        captura_score.get("body"), marcadores, de_cuenta, rechazados
+    )
+    if rechazados:
+        _guardar_spec(website_name, {
+            "version": SPEC_VERSION,
+            "rechazada": "score con valores propios de la cuenta",
+            "usuarios": usuarios,
+            "aprendido": spec["aprendido"],
+        })
+        logger.warning(
+            f"[API] Spec rechazada para {website_name}: el request de score contiene "
+            f"{len(rechazados)} valor(es) propios de la cuenta (se sigue con Selenium)"
+        )
+        return False
+
+    _guardar_spec(website_name, spec)
+    _guardar_token((website_name, usuario), headers)
+
+    logger.info(
+        f"[API] ✓ Spec aprendida para {website_name} "
+        f"(score={spec['score']['url']}, login={'sí' if 'login' in spec else 'no'})"
+    )
+    return True
+
+
+# ----------------------------
+# Flujo API
+# ----------------------------
+def _leer_token(clave):
+    """Headers vigentes de la cuenta: memoria primero, después session_store."""
+    with _tokens_lock:
+        cache = _tokens.get(clave)
+    if cache and time.time() - cache["ts"] < API_TOKEN_TTL:
+        return cache["headers"]
+    if session_store.habilitado():
+        cache = session_store.leer_token(*clave, ttl=API_TOKEN_TTL)
+        if cache:
+            with _tokens_lock:
+                _tokens[clave] = cache
+            return cache["headers"]
+    return None
+
+
+def _guardar_token(clave, headers):
+    cache = {"headers": headers, "ts": time.time()}
+    with _tokens_lock:
+        _tokens[clave] = cache
+    if session_store.habilitado():
+        session_store.guardar_token(*clave, cache["headers"], cache["ts"])
+
+
+def _borrar_token(clave):
+    with _tokens_lock:
+        _tokens.pop(clave, None)
+    session_store.borrar_token(*clave)
+
+
+def _login_api(spec, usuario, password):
+    """Hace login contra el backend y devuelve los headers de autenticación."""
+    login = spec["login"]
+    body = login["body"].format(
+        usuario=_codificar(usuario, login["codificacion"]),
+        password=_codificar(password, login["codificacion"]),
+    )
+    resp = get_session().request(
+        login["method"], login["url"], data=body.encode("utf-8"),
+        headers={"Content-Type": login["content_type"]}, timeout=API_TIMEOUT
+    )
+    resp.raise_for_status()
+    token = _valor_en(_json(resp.text), login["path_token"])
+    if not isinstance(token, str) or not token:
+        return None
+    return {login["token_header"]: login["token_formato"].replace("{token}", token)}
+
+
+def _leer_score(spec, headers, usuario, username):
+    """(balance, usuario mostrado según la respuesta) o (None, None) si el token no sirve."""
+    score = spec["score"]
+    url = score["url"].format(usuario=quote(usuario, safe=""), username=quote(username or "", safe=""))
+    body = score.get("body")
+    if body:
+        codificacion = score.get("codificacion", "raw")
+        body = body.format(usuario=_codificar(usuario, codificacion), username=_codificar(username or "", codificacion))
+    resp = get_session().request(
+        score["method"], url,
+        data=body.encode("utf-8") if body else None,
+        headers=headers, timeout=API_TIMEOUT
+    )
+    if resp.status_code in (401, 403):
+        return None, None
+    resp.raise_for_status()
+    data = _json(resp.text)
+    if score.get("path_username"):
+        username_resp = _valor_en(data, score["path_username"])
+        if isinstance(username_resp, str) and username_resp.strip():
+            username = username_resp.strip()
+    return _a_numero(_valor_en(data, score["path_balance"])), username
+
+
+def login_and_check_api(website_name, usuario, password, logger):
+    """
+    Lee el balance vía API con el token cacheado (o login API si expiró).
+
+    Returns:
+        tuple: (balance, username, hora_login) o (None, None, None)
+    """
+    spec = get_spec(website_name)
+    if not spec:
+        return None, None, None
+
+    # Usuario mostrado (account-container) de la cuenta: clave del balance, igual que en Selenium.
+    # Sin él (ni en la respuesta) no se registra por API: Selenium lo lee y lo guarda.
+    score = spec["score"]
+    username = (spec.get("usuarios") or {}).get(usuario)
+    plantilla_usa_username = "{username}" in score["url"] + (score.get("body") or "")
+    if not username and (plantilla_usa_username or not score.get("path_username")):
+        return None, None, None
+
+    clave = (website_name, usuario)
+    try:
+        headers = _leer_token(clave)
+        if headers:
+            balance, username_leido = _leer_score(spec, headers, usuario, username)
+            if balance is not None and username_leido:
+                logger.info(f"[API] ✓ balance={balance} (token cacheado) usuario={usuario} username={username_leido}")
+                return balance, username_leido, config.get_current_timestamp()
+            _borrar_token(clave)
+
+        if "login" not in spec:
+            return None, None, None
+
+        headers = _login_api(spec, usuario, password)
+        if not headers:
+            logger.warning(f"[API] Login API sin token: {usuario}")
+            return None, None, None
+        hora_login = config.get_current_timestamp()
+
+        balance, username_leido = _leer_score(spec, headers, usuario, username)
+        if balance is None or not username_leido:
+            return None, None, None
+
+        _guardar_token(clave, headers)
+        logger.info(f"[API] ✓ balance={balance} (login API) usuario={usuario} username={username_leido}")
+        return balance, username_leido, hora_login
+
+    except Exception as e:
+        logger.warning(f"[API] Error para {usuario}: {e}")
+        return None, None, None
+
+
+def tiene_token(website_name, usuario):
+    """
+    El token de la cuenta quedó guardado para el próximo run (session_store):
+    solo entonces se evita el logout. El cache en memoria no cuenta, porque
+    con run_GroupN.py / --sin-pool se pierde al terminar el script.
+    """
+    return session_store.habilitado() and session_store.leer_token(
+        website_name, usuario, ttl=API_TOKEN_TTL
+    ) is not None
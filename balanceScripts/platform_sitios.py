@@ -0,0 +1,265 @@
+# platform_sitios.py
+"""
+Motor único para los sitios declarados en sitios.py.
+
+Las cuentas se reparten con reparto.repartir (cola, workers con driver propio
+o prestado por el pool, contexto de ejecución por thread), igual que en
+platform_grupo1/platform_grupo2. Las
+esperas son por evento (esperas.py: observer del DOM, red inactiva, cambio de
+URL) en lugar de los sleep() fijos de cada script, y cada paso se cronometra
+(resumen por sitio al final del run).
+"""
+import re
+import time
+import functools
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+import config
+import contexto
+import driver_pool
+import esperas
+import reparto
+import sitios
+
+LOGIN_TIMEOUT = 10
+LOGIN_OK_TIMEOUT = 12
+NAVEGAR_TIMEOUT = 20
+
+
+def get_logger(website_name):
+    return config.get_logger(f"{website_name}_bot")
+
+
+# ----------------------------
+# helpers
+# ----------------------------
+def _esperar(driver, locator, timeout=LOGIN_TIMEOUT, condicion=EC.presence_of_element_located):
+    return WebDriverWait(driver, esperas.acotar(timeout), poll_frequency=esperas.POLL_RAPIDO).until(condicion(locator))
+
+
+def _tipear(elemento, texto):
+    elemento.clear()
+    elemento.send_keys(texto)
+
+
+def _imagen_cargada(driver, img):
+    """El <img> terminó de cargar (evita screenshots en blanco del captcha)."""
+    return driver.execute_script("return arguments[0].complete && arguments[0].naturalWidth > 0", img)
+
+
+# ----------------------------
+# Login
+# ----------------------------
+def resolver_captcha(driver, spec):
+    campos = spec["login"]
+    img = _esperar(driver, campos["captcha_img"])
+    try:
+        WebDriverWait(driver, esperas.acotar(LOGIN_TIMEOUT)).until(lambda d: _imagen_cargada(d, img))
+    except TimeoutException:
+        pass
+    with esperas.paso("captcha"):
+        solucion = config.resolver_captcha_2captcha(
+            img.screenshot_as_png, spec["captcha_prefijo"], solo_modelo=spec["captcha_modelo"]
+        )
+    if not solucion:
+        raise Exception("Captcha sin solución")
+    _tipear(driver.find_element(*campos["captcha_input"]), solucion)
+
+
+def login(driver, spec, usuario, password, url_login, logger):
+    campos = spec["login"]
+    driver.get(url_login)
+    if campos.get("formulario"):
+        _esperar(driver, campos["formulario"], condicion=EC.visibility_of_element_located)
+
+    _tipear(_esperar(driver, campos["usuario"]), usuario)
+    _tipear(driver.find_element(*campos["password"]), password)
+    if spec["captcha_prefijo"]:
+        resolver_captcha(driver, spec)
+
+    _esperar(driver, campos["boton"], condicion=EC.element_to_be_clickable).click()
+    logger.info(f"[LOGIN] click login usuario={usuario}")
+
+
+def _exito_url(driver, spec, url_login):
+    return esperas.esperar_url(
+        driver, lambda url: url != url_login and "login" not in url.lower(), LOGIN_OK_TIMEOUT
+    )
+
+
+def _exito_balance(driver, spec, url_login):
+    return esperas.esperar_elemento(driver, spec["balance"], LOGIN_OK_TIMEOUT)
+
+
+# Predicados de login exitoso (spec["exito"])
+EXITO = {
+    "url": _exito_url,
+    "balance": _exito_balance,
+}
+
+
+def _mensaje_login(driver, spec):
+    """Texto del aviso que dejó el sitio tras el intento de login (vacío si no hay)."""
+    try:
+        return " ".join(e.text for e in driver.find_elements(*spec["mensaje_error"]))
+    except Exception:
+        return ""
+
+
+def login_and_check(driver, spec, usuario, password, url_login, max_retries, logger):
+    for intento in range(1, max_retries + 1):
+        contexto.establecer(intento=intento)
+        try:
+            with esperas.paso("login"):
+                login(driver, spec, usuario, password, url_login, logger)
+            with esperas.paso("login_ok"):
+                exito = EXITO[spec["exito"]](driver, spec, url_login)
+            if exito:
+                logger.info(f"[FLOW] ✅ LOGIN OK usuario={usuario}")
+                return True
+            if spec["captcha_prefijo"] and config.captcha_rechazado(
+                contexto.actual().website, _mensaje_login(driver, spec)
+            ):
+                logger.info(f"[FLOW] Intento {intento}/{max_retries}: captcha rechazado por el sitio")
+                continue
+            logger.info(f"[FLOW] Intento {intento}/{max_retries} fallido para usuario {usuario}")
+        except esperas.PresupuestoAgotado:
+            raise
+        except Exception as e:
+            logger.warning(f"[FLOW] Intento {intento}/{max_retries} fallido para usuario {usuario}: {e}")
+            if not driver_pool.driver_sano(driver):
+                raise
+            time.sleep(1)
+    logger.error(f"[FLOW] No se pudo iniciar sesión después de {max_retries} intentos para {usuario}")
+    return False
+
+
+# ----------------------------
+# Balance
+# ----------------------------
+def navegar(driver, spec, logger):
+    if not spec["navegar"]:
+        return
+    elemento = _esperar(driver, spec["navegar"], NAVEGAR_TIMEOUT, EC.element_to_be_clickable)
+    if spec["navegar_padre"]:
+        elemento = elemento.find_element(By.XPATH, "./..")
+    elemento.click()
+    # La vista nueva carga sus datos por XHR: se sigue cuando la red queda quieta
+    esperas.esperar_red_inactiva(driver, timeout=NAVEGAR_TIMEOUT)
+    if config.VERBOSE_LOGGING:
+        logger.debug(f"[NAV] click {spec['navegar'][1]}")
+
+
+def _leer_balance(driver, spec):
+    for locator in spec["balance"]:
+        for elemento in driver.find_elements(*locator):
+            match = re.search(spec["balance_regex"], elemento.text.strip())
+            if match:
+                return float(match.group().replace(',', ''))
+    return None
+
+
+def extraer_balance(driver, spec, website_name, logger):
+    limite = time.time() + spec["balance_timeout"]
+    esperas.esperar_elemento(driver, spec["balance"], spec["balance_timeout"], con_texto=True)
+    try:
+        # El texto puede llegar antes que el número (placeholder/loading)
+        balance = WebDriverWait(driver, esperas.acotar(max(1, limite - time.time())), poll_frequency=esperas.POLL_RAPIDO).until(
+            lambda d: _leer_balance(d, spec)
+        )
+        logger.info(f"[EXTRACT] balance={balance}")
+        return balance
+    except TimeoutException:
+        prefijo = website_name.lower().replace(" ", "")
+        config.guardar_evidencia(driver.get_screenshot_as_png(), f"{prefijo}_no_balance")
+        logger.warning("[EXTRACT] No se encontró el balance tras esperar. Ver evidencia en carpeta /screenshots")
+        return None
+
+
+# ----------------------------
+# Logout
+# ----------------------------
+def _logout_boton(driver, spec, logger):
+    try:
+        _esperar(driver, spec["logout_boton"], 5, EC.element_to_be_clickable).click()
+        logger.info("[LOGOUT] Logout realizado correctamente.")
+    except Exception:
+        logger.warning("[LOGOUT] No se encontró botón de logout, limpiando sesión del navegador")
+        driver_pool.limpiar_driver(driver)
+
+
+def _logout_menu(driver, spec, logger):
+    """Clicks en orden (avatar → opción de logout → confirmación)."""
+    try:
+        for locator in spec["logout_pasos"]:
+            _esperar(driver, locator, LOGIN_TIMEOUT, EC.element_to_be_clickable).click()
+        logger.info("[LOGOUT] Logout realizado correctamente.")
+    except Exception as e:
+        logger.warning(f"[LOGOUT] Menú de logout incompleto ({e}), limpiando sesión del navegador")
+        driver_pool.limpiar_driver(driver)
+
+
+def _logout_limpiar(driver, spec, logger):
+    driver_pool.limpiar_driver(driver)
+
+
+# Estrategias de logout (spec["logout"])
+LOGOUT = {
+    "boton": _logout_boton,
+    "menu": _logout_menu,
+    "limpiar": _logout_limpiar,
+}
+
+
+# ----------------------------
+# Flujo
+# ----------------------------
+def _procesar_cuenta(website_name, spec, total, url_login, max_login_retries, sheet, worker, idx, cuenta):
+    """Una cuenta (reparto.repartir) con el driver del worker. Devuelve True si registró."""
+    logger = worker.logger
+    usuario = cuenta["usuario"]
+    logger.info(f"[CUENTA] {idx}/{total} usuario={usuario}")
+
+    driver = worker.get_driver(preparar=esperas.instalar_hook_red)
+    if not login_and_check(driver, spec, usuario, cuenta["password"], url_login, max_login_retries, logger):
+        return False
+
+    with esperas.paso("navegar"):
+        navegar(driver, spec, logger)
+    with esperas.paso("balance"):
+        balance = extraer_balance(driver, spec, website_name, logger)
+    if balance is not None:
+        config.enviar_resultado_balance(sheet, website_name, usuario, config.get_current_timestamp(), balance)
+        logger.info(f"[RESULT] {idx}/{total} registrado")
+    with esperas.paso("logout"):
+        LOGOUT[spec["logout"]](driver, spec, logger)
+    return balance is not None
+
+
+def run(website_name, max_login_retries=3, max_paralelo=None):
+    logger = get_logger(website_name)
+    logger.info(f"=== RUN {website_name} ===")
+
+    spec = sitios.get_spec(website_name)
+    sheet = config.google_sheets_connect()
+
+    url_login = config.WEBSITES[website_name]["url"]
+    cuentas = config.WEBSITES[website_name]["accounts"]
+
+    registrados = reparto.repartir(
+        website_name, cuentas,
+        functools.partial(_procesar_cuenta, website_name, spec, len(cuentas), url_login, max_login_retries, sheet),
+        logger, max_paralelo=max_paralelo,
+    )
+
+    esperas.log_resumen(website_name, logger)
+    logger.info(f"=== FIN {website_name} ({registrados}/{len(cuentas)}) ===")
+
+
+if __name__ == "__main__":
+    print("Este archivo contiene el motor de sitios declarativos (platform_sitios).")
+    print("Ejecuta los scripts individuales (ej: gamevaultBalance.py)")
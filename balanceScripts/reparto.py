@@ -0,0 +1,119 @@
+"""
+Reparto de las cuentas de un sitio entre workers en paralelo.
+
+Esquema común de platform_grupo1, platform_grupo2 y platform_sitios: cola de
+cuentas, N workers en threads con el contexto de ejecución propagado, un
+driver por worker (propio o prestado por el pool, creado al primer uso) y
+tiempo máximo por cuenta (esperas.presupuesto_cuenta). Cada plataforma solo
+aporta `procesar(worker, idx, cuenta)`, que devuelve True si registró balance.
+"""
+from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import contexto
+import driver_pool
+import esperas
+
+
+class Worker:
+    """Estado de un worker: su driver, que se crea recién cuando una cuenta lo pide."""
+
+    def __init__(self, cola, logger):
+        self.logger = logger
+        self.driver = None
+        self._cola = cola
+
+    def quedan_cuentas(self):
+        """Hay más cuentas en la cola (para el delay entre logins)."""
+        return not self._cola.empty()
+
+    def get_driver(self, preparar=None):
+        """Driver del worker; crea uno nuevo si no hay o si el anterior dejó de responder."""
+        if self.driver is not None and not driver_pool.driver_sano(self.driver):
+            self.cerrar_driver()
+        if self.driver is None:
+            self.driver = config.get_chrome_driver(implicit_wait=0)
+            if preparar:
+                preparar(self.driver)
+        return self.driver
+
+    def limpiar_driver(self):
+        if self.driver:
+            driver_pool.limpiar_driver(self.driver)
+
+    def cerrar_driver(self):
+        """Cierra (o devuelve al pool) el driver sin propagar errores."""
+        if self.driver:
+            try:
+                self.driver.quit()
+                if config.VERBOSE_LOGGING:
+                    self.logger.debug("[DRIVER] Driver cerrado correctamente")
+            except Exception as e:
+                self.logger.warning(f"[DRIVER] Error al cerrar driver: {e}")
+            self.driver = None
+
+
+def _worker_cuentas(website_name, cola, total, procesar, logger):
+    """Procesa cuentas de la cola hasta vaciarla. Devuelve las registradas."""
+    # ✅ Contexto de este thread (captchas/logs): los threads no heredan el del padre
+    token_contexto = contexto.establecer(website=website_name)
+    worker = Worker(cola, logger)
+    registrados = 0
+
+    try:
+        while True:
+            try:
+                idx, cuenta = cola.get_nowait()
+            except Empty:
+                break
+
+            usuario = cuenta['usuario']
+            contexto.establecer(cuenta=usuario)
+            try:
+                # ✅ Tiempo máximo por cuenta: cada espera se recorta al restante
+                with esperas.presupuesto_cuenta(log=logger):
+                    if procesar(worker, idx, cuenta):
+                        registrados += 1
+            except esperas.PresupuestoAgotado as e:
+                logger.error(f"[{idx}/{total}] ✗ {e}: {usuario}")
+                worker.limpiar_driver()
+            except Exception as e:
+                logger.error(f"[{idx}/{total}] ✗ Error procesando {usuario}: {e}")
+                if config.VERBOSE_LOGGING:
+                    config.log_exception(logger, f"Error procesando {usuario}")
+                worker.limpiar_driver()
+    finally:
+        worker.cerrar_driver()
+        contexto.restaurar(token_contexto)
+
+    return registrados
+
+
+def repartir(website_name, cuentas, procesar, logger, max_paralelo=None):
+    """
+    Procesa `cuentas` con hasta max_paralelo workers (por defecto
+    config.get_cuentas_paralelas(website_name)). Devuelve las registradas.
+    """
+    if max_paralelo is None:
+        max_paralelo = config.get_cuentas_paralelas(website_name)
+    workers = max(1, min(max_paralelo, len(cuentas)))
+    logger.info(f"[RUN] Total de cuentas: {len(cuentas)} | Workers: {workers}")
+
+    cola = Queue()
+    for idx, cuenta in enumerate(cuentas, 1):
+        cola.put((idx, cuenta))
+
+    argumentos = (website_name, cola, len(cuentas), procesar, logger)
+    if workers == 1:
+        return _worker_cuentas(*argumentos)
+
+    registrados = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=website_name.replace(" ", "_")) as executor:
+        futures = [executor.submit(contexto.propagar(_worker_cuentas), *argumentos) for _ in range(workers)]
+        for future in futures:
+            try:
+                registrados += future.result()
+            except Exception as e:
+                logger.error(f"[RUN] ✗ Error en worker: {e}")
+    return registrados
@@ -1,26 +1,13 @@
 import os
 import time
 
+from grupos_scripts import GRUPOS_SCRIPTS
+
 # Carpeta donde están los scripts
 scripts_folder = '.'
 
-# Lista de scripts del grupo 1
-scripts = [
-    'orionBalance.py', # Sí Captcha
-    'gamevaultBalance.py', # Sí Captcha
-    'pandamasterBalance.py', # Sí Captcha
-    'juwaBalance.py', # Sí Captcha
-    # 'kingofpopBalance.py', # Sí Captcha
-    'firekirinBalance.py', # Sí Captcha
-    'nobleBalance.py', # Sí Captcha
-    'winstarBalance.py', # Sí Captcha
-    'milkywayBalance.py', # Sí Captcha
-    'cashmachineBalance.py', # Sí Captcha
-    'galaxyworldBalance.py', # Sí Captcha
-    'luckystarsBalance.py', # Sí Captcha
-    'mafiaBalance.py', # Sí Captcha
-    'gameroomBalance.py', # Sí Captcha
-]
+# Lista de scripts del grupo 1 (grupos_scripts.py, compartida con run_scheduler.py)
+scripts = GRUPOS_SCRIPTS["G1"]
 
 # Archivo de log histórico de este grupo
 history_log = "runner_group1.log"
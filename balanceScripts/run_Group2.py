@@ -1,27 +1,13 @@
 import os
 import time
 
+from grupos_scripts import GRUPOS_SCRIPTS
+
 # Carpeta donde están los scripts
 scripts_folder = '.'
 
-# Lista de scripts del grupo 2
-scripts = [
-    'cashfrenzyBalance.py', # Sí Captcha
-    'winnersclubBalance.py', # Sí Captcha
-    'superdragonBalance.py', # Sí Captcha
-    'vegassweepsBalance.py', # Sí Captcha
-    'highstakesBalance.py', # Sí Captcha
-    'mrallinoneBalance.py', # Sí Captcha
-    'siriusBalance.py', # Sí Captcha
-    # 'easystreetBalance.py', # Sí Captcha
-    'vegasrollBalance.py', # Sí Captcha
-    'moolahBalance.py', # Sí Captcha
-    'lootBalance.py', # Sí Captcha
-    'luckyparadiseBalance.py', # Sí Captcha
-    'rivermonsterBalance.py', # Sí Captcha
-    'jokerBalance.py', # Sí Captcha
-    'krakenBalance.py', # Sí Captcha
-]
+# Lista de scripts del grupo 2 (grupos_scripts.py, compartida con run_scheduler.py)
+scripts = GRUPOS_SCRIPTS["G2"]
 
 # Archivo de log histórico de este grupo
 history_log = "runner_group2.log"
@@ -1,19 +1,12 @@
 import os
 import time
 
+from grupos_scripts import GRUPOS_SCRIPTS
+
 scripts_folder = '.'
 
-scripts = [
-    'acebookBalance.py', # No Captcha
-    'riversweepsBalance.py', # No Captcha
-    'bluedragonBalance.py', # No Captcha
-    'megaspinBalance.py', # No Captcha
-    'glamourspinBalance.py', # No Captcha
-    'fishgloryBalance.py', # No Captcha
-    'vegasxBalance.py', # No Captcha
-    'egameBalance.py', # No Captcha
-    'goldentreasureBalance.py', # No Captcha
-]
+# Lista de scripts del grupo 3 (grupos_scripts.py, compartida con run_scheduler.py)
+scripts = GRUPOS_SCRIPTS["G3"]
 
 history_log = "runner_group3.log"
 
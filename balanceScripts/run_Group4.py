@@ -1,19 +1,12 @@
 import os
 import time
 
+from grupos_scripts import GRUPOS_SCRIPTS
+
 scripts_folder = '.'
 
-scripts = [
-    'geminiBalance.py', # No Captcha
-    'vblinkBalance.py', # No Captcha
-    'jackpotfrenzyBalance.py', # No Captcha
-    'ultrapandaBalance.py', # No Captcha
-    'yoloBalance.py', # No Captcha
-    'highrollerBalance.py', # No Captcha
-    'legendfireBalance.py', # No Captcha
-    '100plusBalance.py', # No Captcha
-    'firephoenixBalance.py', # No Captcha
-]
+# Lista de scripts del grupo 4 (grupos_scripts.py, compartida con run_scheduler.py)
+scripts = GRUPOS_SCRIPTS["G4"]
 
 history_log = "runner_group4.log"
 
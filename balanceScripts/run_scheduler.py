@@ -0,0 +1,303 @@
+"""
+Scheduler concurrente de sitios - reemplaza los loops seriales de run_Group1..4.
+
+Cada sitio de los 4 grupos (grupos_scripts.py) es un job independiente. Se
+ejecutan hasta MAX_WORKERS sitios a la vez y, en cada ciclo, los sitios se
+ordenan por antigüedad de su último balance exitoso (el más "viejo" primero),
+de modo que un barrido completo dura aprox. lo que tarda el sitio más lento y
+no la suma de todos.
+
+- Los scripts que ya usan un motor (platform_grupo1/grupo2/sitios) corren en
+  un thread de este proceso (comparten pool de drivers, modelos y writers)
+- Los demás corren como subproceso, igual que en run_GroupN.py
+- Cada job tiene SCHEDULER_JOB_TIMEOUT segundos: el subproceso se mata; el
+  thread (no se puede matar) se abandona, el job cuenta como fallido
+  (exit 124) y el sitio no se relanza hasta que ese thread termine
+
+Uso:
+    python run_scheduler.py                 # ciclos infinitos, workers por defecto
+    python run_scheduler.py --workers 6     # cap de sitios concurrentes
+    python run_scheduler.py --once          # un solo barrido
+    python run_scheduler.py --grupos G1 G3  # solo algunos grupos
+    python run_scheduler.py --sin-pool      # un Chrome nuevo por script (comportamiento anterior)
+    python run_scheduler.py --subprocesos   # todos los scripts como subproceso (aislados)
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import config
+import contexto
+from grupos_scripts import GRUPOS_SCRIPTS
+
+# Carpeta donde están los scripts
+SCRIPTS_FOLDER = os.path.abspath(os.path.dirname(__file__))
+
+MAX_WORKERS = int(os.getenv('SCHEDULER_MAX_WORKERS', '4'))
+PAUSA_ENTRE_CICLOS = int(os.getenv('SCHEDULER_PAUSA_CICLO', '5'))
+JOB_TIMEOUT = int(os.getenv('SCHEDULER_JOB_TIMEOUT', str(30 * 60)))
+EXIT_TIMEOUT = 124  # mismo código que `timeout` de coreutils
+
+# Scripts que son un shim sobre un motor: se pueden correr en un thread
+_RE_MOTOR = re.compile(r"^\s*platform_(?:grupo1|grupo2|sitios)\.run\(", re.MULTILINE)
+
+# Archivo de log histórico del scheduler (mismo formato que runner_groupN.log)
+HISTORY_LOG = os.path.join(SCRIPTS_FOLDER, "runner_scheduler.log")
+
+logger = config.get_logger("scheduler")
+
+_log_lock = threading.Lock()
+
+# script -> thread de un job que superó JOB_TIMEOUT y sigue corriendo
+_abandonados = {}
+_abandonados_lock = threading.Lock()
+
+_FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+
+def _escribir_historial(linea):
+    with _log_lock:
+        with open(HISTORY_LOG, "a", encoding="utf-8") as f:
+            f.write(linea + "\n")
+
+
+def _leer_script(script):
+    try:
+        with open(os.path.join(SCRIPTS_FOLDER, script), encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def detectar_website(script):
+    """Lee WEBSITE_NAME del script sin importarlo."""
+    match = re.search(r'^WEBSITE_NAME\s*=\s*["\'](.+?)["\']', _leer_script(script), re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def usa_motor(script):
+    """El script solo delega en platform_grupo1/grupo2/sitios.run (apto para correr en thread)."""
+    return bool(_RE_MOTOR.search(_leer_script(script)))
+
+
+def _a_datetime(fecha):
+    """Normaliza la fecha de un balance (str 'YYYY-MM-DD HH:MM:SS' o datetime)."""
+    if isinstance(fecha, datetime):
+        return fecha
+    if isinstance(fecha, str):
+        try:
+            return datetime.strptime(fecha, _FORMATO_FECHA)
+        except ValueError:
+            return None
+    return None
+
+
+def cargar_ultimos_balances():
+    """
+    Devuelve {website_normalizado: datetime} con el último balance por website.
+    Si Mongo no está disponible devuelve {} (todos se consideran igual de viejos).
+    """
+    client = None
+    try:
+        from pymongo import MongoClient
+        client = MongoClient(config.MONGO_URI, serverSelectionTimeoutMS=5000)
+        col = client[config.MONGO_DB][config.MONGO_COLLECTION]
+        resultado = {}
+        for doc in col.aggregate([{"$group": {"_id": "$website", "ultima": {"$max": "$fecha"}}}]):
+            if doc["_id"]:
+                resultado[config.normalizar_website(doc["_id"])] = _a_datetime(doc["ultima"])
+        return resultado
+    except Exception as e:
+        logger.warning(f"[SCHEDULER] No se pudo leer últimos balances: {e}")
+        return {}
+    finally:
+        if client:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+def construir_jobs(grupos, subprocesos=False):
+    """
+    Lista de jobs (grupo, script, website, en_thread) para los grupos pedidos.
+    Se omiten los sitios con un job abandonado que sigue corriendo.
+    """
+    with _abandonados_lock:
+        for script, hilo in list(_abandonados.items()):
+            if not hilo.is_alive():
+                del _abandonados[script]
+        ocupados = set(_abandonados)
+
+    jobs = []
+    for grupo in grupos:
+        for script in GRUPOS_SCRIPTS.get(grupo, []):
+            if script in ocupados:
+                logger.warning(f"[SCHEDULER] {script}: el job abandonado sigue corriendo, se omite este ciclo")
+                continue
+            jobs.append({
+                "grupo": grupo,
+                "script": script,
+                "website": detectar_website(script),
+                "en_thread": not subprocesos and usa_motor(script),
+            })
+    return jobs
+
+
+def ordenar_por_antiguedad(jobs, ultimos_balances):
+    """
+    Ordena jobs: sin balance previo primero, luego del más viejo al más reciente.
+    Además de Mongo usa los balances escritos en este proceso (config), así la
+    prioridad sigue siendo correcta aunque Mongo no responda; el exit code no
+    cuenta (un sitio con todas las cuentas fallando termina igual con exit 0).
+    """
+    escritos = config.ultimos_balances_escritos()
+
+    def clave(job):
+        website = config.normalizar_website(job["website"] or "")
+        candidatos = [f for f in (ultimos_balances.get(website), escritos.get(website)) if f]
+        ultima = max(candidatos) if candidatos else None
+        return (ultima is not None, ultima or datetime.min)
+
+    return sorted(jobs, key=clave)
+
+
+def _ejecutar_script(script_path):
+    """
+    Ejecuta un script de balance como __main__ dentro del proceso actual.
+    No usa runpy porque este modifica sys.modules['__main__'] y sys.argv,
+    lo cual no es seguro con varios sitios corriendo en threads.
+    """
+    with open(script_path, encoding="utf-8") as f:
+        codigo = compile(f.read(), script_path, "exec")
+    globales = {
+        "__name__": "__main__",
+        "__file__": script_path,
+        "__builtins__": __builtins__,
+    }
+    exec(codigo, globales)
+
+
+def _correr_en_thread(job, script_path):
+    """Corre el script en un thread propio con JOB_TIMEOUT; devuelve el exit code."""
+    resultado = {}
+
+    def correr():
+        exit_code = 0
+        try:
+            with contexto.ejecucion(website=job["website"], grupo=job["grupo"]):
+                _ejecutar_script(script_path)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException as e:
+            exit_code = 1
+            logger.error(f"[SCHEDULER] {job['script']} terminó con error: {e}")
+            if config.VERBOSE_LOGGING:
+                config.log_exception(logger, f"Error ejecutando {job['script']}")
+        resultado["exit_code"] = exit_code
+
+    hilo = threading.Thread(target=correr, name=f"job-{job['script']}", daemon=True)
+    hilo.start()
+    hilo.join(JOB_TIMEOUT)
+    if hilo.is_alive():
+        # Un thread no se puede matar: libera el worker y bloquea el sitio hasta que termine
+        with _abandonados_lock:
+            _abandonados[job["script"]] = hilo
+        logger.error(f"[SCHEDULER] {job['script']} superó {JOB_TIMEOUT}s: se abandona (sigue en segundo plano)")
+        return EXIT_TIMEOUT
+    return resultado.get("exit_code", 1)
+
+
+def _correr_subproceso(job, script_path):
+    """Corre el script como proceso hijo (como run_GroupN.py); se mata al superar JOB_TIMEOUT."""
+    try:
+        return subprocess.run([sys.executable, script_path], cwd=SCRIPTS_FOLDER, timeout=JOB_TIMEOUT).returncode
+    except subprocess.TimeoutExpired:
+        logger.error(f"[SCHEDULER] {job['script']} superó {JOB_TIMEOUT}s: subproceso terminado")
+        return EXIT_TIMEOUT
+    except OSError as e:
+        logger.error(f"[SCHEDULER] {job['script']} no se pudo lanzar: {e}")
+        return 1
+
+
+def ejecutar_job(job):
+    """Corre un sitio y devuelve (job, exit_code, duracion)."""
+    script_path = os.path.join(SCRIPTS_FOLDER, job["script"])
+    modo = "thread" if job["en_thread"] else "subproceso"
+    print(f"\n--- Ejecutando {job['grupo']}: {job['script']} ({modo}) ---")
+    start = time.time()
+    if job["en_thread"]:
+        exit_code = _correr_en_thread(job, script_path)
+    else:
+        exit_code = _correr_subproceso(job, script_path)
+    duracion = time.time() - start
+
+    msg = f"-- Terminó: {job['script']} (exit code {exit_code}) | Tiempo: {duracion:.1f} segundos --"
+    print(msg)
+    _escribir_historial(
+        f"{time.strftime('%Y-%m-%d %H:%M:%S')} | {job['grupo']} | {job['script']} | "
+        f"{duracion:.1f} segundos | exit={exit_code}"
+    )
+    return job, exit_code, duracion
+
+
+def ejecutar_ciclo(grupos, max_workers=MAX_WORKERS, subprocesos=False):
+    """Ejecuta un barrido completo y devuelve {script: duracion}."""
+    jobs = ordenar_por_antiguedad(construir_jobs(grupos, subprocesos), cargar_ultimos_balances())
+    duraciones = {}
+    fallidos = []
+
+    ciclo_inicio = time.strftime('%Y-%m-%d %H:%M:%S')
+    print(f"\n=== Nuevo ciclo scheduler iniciado {ciclo_inicio} ({len(jobs)} sitios, {max_workers} workers) ===")
+    _escribir_historial(f"\n=== Ciclo iniciado {ciclo_inicio} ===")
+    inicio = time.time()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sitio") as executor:
+        futures = [executor.submit(ejecutar_job, job) for job in jobs]
+        for future in as_completed(futures):
+            job, exit_code, duracion = future.result()
+            duraciones[job["script"]] = duracion
+            if exit_code != 0:
+                fallidos.append(f"{job['script']} (exit {exit_code})")
+
+    total = time.time() - inicio
+    ciclo_final = time.strftime('%Y-%m-%d %H:%M:%S')
+    print("\nResumen de duración por script (scheduler):")
+    for script, duracion in sorted(duraciones.items(), key=lambda x: -x[1]):
+        print(f"- {script}: {duracion:.1f} segundos")
+    if fallidos:
+        print(f"\n✗ Fallidos ({len(fallidos)}): {', '.join(fallidos)}")
+    print(f"\nCiclo terminado a las {ciclo_final} | Total: {total:.1f} s | Suma serial: {sum(duraciones.values()):.1f} s")
+    _escribir_historial(f"=== Ciclo terminado {ciclo_final} | Total: {total:.1f} segundos ===")
+    return duraciones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduler concurrente de balances")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Sitios concurrentes")
+    parser.add_argument("--grupos", nargs="+", default=list(GRUPOS_SCRIPTS.keys()), choices=list(GRUPOS_SCRIPTS.keys()))
+    parser.add_argument("--once", action="store_true", help="Ejecuta un solo ciclo")
+    parser.add_argument("--sin-pool", action="store_true", help="No compartir drivers Chrome entre sitios")
+    parser.add_argument("--subprocesos", action="store_true", help="Todos los scripts como subproceso (aislados)")
+    args = parser.parse_args()
+
+    # ✅ Drivers calientes compartidos entre todos los sitios del barrido
+    if not args.sin_pool:
+        config.DRIVER_POOL_ENABLED = True
+
+    while True:
+        ejecutar_ciclo(args.grupos, max_workers=max(1, args.workers), subprocesos=args.subprocesos)
+        if args.once:
+            break
+        print(f"Esperando {PAUSA_ENTRE_CICLOS} segundos para reiniciar...\n")
+        time.sleep(PAUSA_ENTRE_CICLOS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Persistencia de sesiones por cuenta (website + usuario).
+
+Tras un login exitoso se guardan cookies, localStorage y sessionStorage; en el
+siguiente ciclo se restauran y, si el sitio acepta la sesión, se lee el balance
+sin captcha ni logout. Si la sesión es rechazada se borra y el flujo normal
+(login_and_check) hace el login completo.
+
+- Un archivo por cuenta en sessions/, cifrado con Fernet (paquete `cryptography`).
+  La clave sale SOLO de SESSION_STORE_KEY (nunca se guarda junto a las sesiones);
+  sin ella la persistencia queda deshabilitada.
+- Cada sesión expira a los SESSION_TTL segundos.
+- Funciona tanto con webdriver (Selenium) como con requests.Session (motor HTTP),
+  y guarda también los tokens del motor API de grupo2 (archivo aparte por cuenta).
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlsplit
+
+import config
+
+SESSION_FOLDER = os.path.join(config.BASE_FOLDER, "sessions")
+SESSION_TTL = int(os.getenv('SESSION_TTL', str(4 * 3600)))
+
+logger = config.get_logger("session_store")
+
+_fernet = None
+_fernet_lock = threading.Lock()
+_deshabilitado = False
+
+
+def _get_fernet():
+    """Cifrador Fernet (lazy). Devuelve None si `cryptography` no está instalado."""
+    global _fernet, _deshabilitado
+    with _fernet_lock:
+        if _fernet is not None or _deshabilitado:
+            return _fernet
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            logger.warning("[SESSION] Paquete 'cryptography' no instalado → sesiones deshabilitadas")
+            _deshabilitado = True
+            return None
+
+        clave = os.getenv('SESSION_STORE_KEY')
+        if not clave:
+            logger.warning(
+                "[SESSION] SESSION_STORE_KEY no definida → sesiones deshabilitadas "
+                "(generar con: python -c \"from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())\")"
+            )
+            _deshabilitado = True
+            return None
+        os.makedirs(SESSION_FOLDER, exist_ok=True)
+        try:
+            _fernet = Fernet(clave)
+        except ValueError:
+            logger.warning("[SESSION] SESSION_STORE_KEY inválida (debe ser una clave Fernet) → sesiones deshabilitadas")
+            _deshabilitado = True
+        return _fernet
+
+
+def habilitado():
+    """La persistencia está activa y tiene con qué cifrar (clave + cryptography)."""
+    return config.SESSION_STORE_ENABLED and _get_fernet() is not None
+
+
+def _ruta(website, usuario):
+    nombre = hashlib.sha256(f"{website}|{usuario}".encode("utf-8")).hexdigest()[:32]
+    return os.path.join(SESSION_FOLDER, f"{nombre}.bin")
+
+
+def _escribir(website, usuario, data):
+    fernet = _get_fernet()
+    if fernet is None:
+        return False
+    path = _ruta(website, usuario)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(fernet.encrypt(json.dumps(data).encode("utf-8")))
+    os.replace(tmp_path, path)
+    return True
+
+
+def _leer(website, usuario, ttl=SESSION_TTL):
+    """Devuelve la sesión guardada si existe y no expiró."""
+    fernet = _get_fernet()
+    path = _ruta(website, usuario)
+    if fernet is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(fernet.decrypt(f.read()).decode("utf-8"))
+    except Exception as e:
+        if config.VERBOSE_LOGGING:
+            logger.debug(f"[SESSION] Sesión ilegible ({website}/{usuario}): {e}")
+        borrar_sesion(website, usuario)
+        return None
+    if time.time() - data.get("ts", 0) > ttl:
+        borrar_sesion(website, usuario)
+        return None
+    return data
+
+
+def borrar_sesion(website, usuario):
+    try:
+        os.remove(_ruta(website, usuario))
+    except OSError:
+        pass
+
+
+# ----------------------------
+# Selenium
+# ----------------------------
+def guardar_sesion(driver, website, usuario):
+    """Guarda cookies + storage del driver tras un login exitoso."""
+    try:
+        storage = driver.execute_script(
+            "return {local: Object.assign({}, localStorage), session: Object.assign({}, sessionStorage)};"
+        ) or {}
+        data = {
+            "url": driver.current_url,
+            "cookies": driver.get_cookies(),
+            "local_storage": storage.get("local") or {},
+            "session_storage": storage.get("session") or {},
+            "ts": time.time(),
+        }
+        return _escribir(website, usuario, data)
+    except Exception as e:
+        logger.warning(f"[SESSION] No se pudo guardar sesión {website}/{usuario}: {e}")
+        return False
+
+
+def restaurar_sesion(driver, website, usuario):
+    """
+    Carga la sesión guardada en el driver y navega a la página post-login.
+    Devuelve True si había sesión para probar; la validación (¿el sitio la
+    aceptó?) la hace el flujo de cada plataforma.
+    """
+    data = _leer(website, usuario)
+    if not data:
+        return False
+    try:
+        partes = urlsplit(data["url"])
+        driver.get(f"{partes.scheme}://{partes.netloc}/")
+        driver.delete_all_cookies()
+        for cookie in data.get("cookies", []):
+            cookie = {k: v for k, v in cookie.items() if k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry")}
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"])
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                pass
+        driver.execute_script(
+            """
+            const [local, session] = arguments;
+            for (const k in local) { localStorage.setItem(k, local[k]); }
+            for (const k in session) { sessionStorage.setItem(k, session[k]); }
+            """,
+            data.get("local_storage", {}),
+            data.get("session_storage", {}),
+        )
+        driver.get(data["url"])
+        return True
+    except Exception as e:
+        logger.warning(f"[SESSION] No se pudo restaurar sesión {website}/{usuario}: {e}")
+        borrar_sesion(website, usuario)
+        return False
+
+
+# ----------------------------
+# requests.Session (motor HTTP)
+# ----------------------------
+def guardar_sesion_http(session, website, usuario, url):
+    try:
+        cookies = [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path, "secure": c.secure}
+            for c in session.cookies
+        ]
+        data = {"url": url, "cookies": cookies, "local_storage": {}, "session_storage": {}, "ts": time.time()}
+        return _escribir(website, usuario, data)
+    except Exception as e:
+        logger.warning(f"[SESSION] No se pudo guardar sesión HTTP {website}/{usuario}: {e}")
+        return False
+
+
+def restaurar_sesion_http(session, website, usuario):
+    """Carga las cookies guardadas en la session y devuelve la URL post-login (o None)."""
+    data = _leer(website, usuario)
+    if not data:
+        return None
+    for c in data.get("cookies", []):
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+    return data["url"]
+
+
+# ----------------------------
+# Tokens del motor API (platform_grupo2_api)
+# ----------------------------
+def _website_token(website):
+    return f"{website}|api"
+
+
+def guardar_token(website, usuario, headers, ts):
+    try:
+        return _escribir(_website_token(website), usuario, {"headers": headers, "ts": ts})
+    except Exception as e:
+        logger.warning(f"[SESSION] No se pudo guardar token {website}/{usuario}: {e}")
+        return False
+
+
+def leer_token(website, usuario, ttl=SESSION_TTL):
+    """Devuelve {"headers", "ts"} del token guardado, o None si no hay o expiró."""
+    return _leer(_website_token(website), usuario, ttl=ttl)
+
+
+def borrar_token(website, usuario):
+    borrar_sesion(_website_token(website), usuario)
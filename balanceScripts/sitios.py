@@ -0,0 +1,201 @@
+"""
+Specs declarativas de sitios para platform_sitios.
+
+Cada sitio es un dict con lo que cambia entre paneles; el flujo (login,
+captcha, espera de login, extracción, logout, paralelismo) lo ejecuta un solo
+motor, así las mejoras de esperas/pool/concurrencia aplican a todos.
+
+Claves:
+    login:           localizadores (By, valor) del formulario:
+                     usuario, password, captcha_img, captcha_input, boton
+                     y opcionalmente formulario (se espera visible antes de tipear)
+    captcha_prefijo: prefijo de los captchas archivados (None = sin captcha)
+    captcha_modelo:  grupo de modelo forzado, sin escalar a 2captcha
+                     (None = el de CAPTCHA_GRUPOS, con 2captcha de respaldo)
+    mensaje_error:   localizador del aviso tras un login fallido (default:
+                     toast de Element-UI); si habla del código, el captcha
+                     cuenta como rechazado
+    exito:           predicado de login OK (ver platform_sitios.EXITO)
+                     "url"     → salió de la URL de login
+                     "balance" → el balance ya es visible
+    navegar:         localizador a clickear tras el login (None = no navegar);
+                     navegar_padre=True clickea el padre (íconos dentro de botones)
+    balance:         localizadores a probar en orden hasta que uno tenga texto
+    balance_regex:   regex del número (default r"[0-9,\\.]+")
+    balance_timeout: segundos esperando el balance
+    logout:          estrategia (ver platform_sitios.LOGOUT)
+                     "boton"   → click en logout_boton
+                     "menu"    → clicks en orden sobre logout_pasos
+                                 (avatar → opción de logout → confirmación)
+                     "limpiar" → borra cookies/storage (sin logout en el panel)
+
+Para migrar un sitio: agregar su spec acá y reemplazar su script por un shim
+que llame a platform_sitios.run(WEBSITE_NAME, MAX_LOGIN_RETRIES).
+"""
+from selenium.webdriver.common.by import By
+
+
+# ----------------------------
+# Familias de paneles
+# ----------------------------
+# Panel Element-UI con Admin List (GameVault, Sirius, Vegas Sweeps, Galaxy World)
+_LOGIN_ADMIN_LIST = {
+    "usuario": (By.CSS_SELECTOR, "input[placeholder='username']"),
+    "password": (By.CSS_SELECTOR, "input[placeholder='password']"),
+    "captcha_img": (By.CSS_SELECTOR, "img.imgCode"),
+    "captcha_input": (By.XPATH, "(//input[contains(@class,'el-input__inner')])[3]"),
+    "boton": (By.CSS_SELECTOR, "div.login-btn > button.el-button--primary"),
+}
+
+_BALANCE_ADMIN_LIST = [
+    (By.XPATH, "//button[contains(@class,'el-button--default') and contains(.,'Balance:')]/span/span"),
+    (By.XPATH, "//button[contains(@class,'el-button--default') and contains(.,'Balance:')]//span[@style]"),
+]
+
+_ADMIN_LIST = {
+    "login": _LOGIN_ADMIN_LIST,
+    "exito": "url",
+    "navegar": (By.CSS_SELECTOR, "i.el-icon-user-solid"),
+    "navegar_padre": True,
+    "balance": _BALANCE_ADMIN_LIST,
+    "balance_timeout": 30,
+    "logout": "limpiar",
+}
+
+# Panel Juwa/Loot (placeholders largos, logout en el header)
+_JUWA = {
+    "login": {
+        "usuario": (By.CSS_SELECTOR, "input[placeholder='Please enter your account']"),
+        "password": (By.CSS_SELECTOR, "input[placeholder='Please enter your password']"),
+        "captcha_img": (By.CSS_SELECTOR, "img.imgCode"),
+        "captcha_input": (By.CSS_SELECTOR, "input[placeholder='Please enter the verification code']"),
+        "boton": (By.XPATH, "//button[.//span[text()='Sign in']]"),
+    },
+    "exito": "url",
+    "navegar": None,
+    "balance": [(By.CSS_SELECTOR, ".balance span")],
+    "balance_timeout": 10,
+    "logout": "boton",
+    "logout_boton": (By.XPATH, "//button[contains(text(),'log out') or contains(text(),'Log out')]"),
+}
+
+# Panel layui (Noble, Cash Machine, Game Room...): balance en #money del header
+_LAYUI = {
+    "login": {
+        "formulario": (By.CSS_SELECTOR, "form.layui-form"),
+        "usuario": (By.CSS_SELECTOR, "form.layui-form input[name='username']"),
+        "password": (By.CSS_SELECTOR, "form.layui-form input[name='password']"),
+        "captcha_img": (By.ID, "captchaImg"),
+        "captcha_input": (By.CSS_SELECTOR, "form.layui-form input[name='captcha']"),
+        "boton": (By.CSS_SELECTOR, "form.layui-form button.layui-btn"),
+    },
+    "mensaje_error": (By.CSS_SELECTOR, ".layui-layer-msg .layui-layer-content"),
+    "exito": "balance",
+    "balance": [(By.ID, "money")],
+    "balance_timeout": 10,
+    "logout": "menu",
+    "logout_pasos": [
+        (By.XPATH, "//a[img[contains(@class, 'layui-nav-img')]]"),
+        (By.ID, "logout"),
+        (By.CSS_SELECTOR, "a.layui-layer-btn0"),
+    ],
+}
+
+# Panel Element-UI vue-admin (form.login-form, menú de logout en el avatar)
+_LOGIN_VUE_ADMIN = {
+    "formulario": (By.CSS_SELECTOR, "form.login-form"),
+    "usuario": (By.CSS_SELECTOR, "form.login-form input[name='username']"),
+    "password": (By.CSS_SELECTOR, "form.login-form input[name='password']"),
+}
+
+_AVATAR_VUE_ADMIN = (By.CSS_SELECTOR, ".avatar-wrapper.el-dropdown-selfdefine")
+
+# Celda de la columna "Balance" de la primera fila (índice según el header de la tabla)
+_TH_BALANCE = "(//table[contains(@class,'el-table__header')]//th[translate(normalize-space(.),'BALNCE','balnce')='balance'])[1]"
+_BALANCE_TABLA = (
+    By.XPATH,
+    f"(//table[contains(@class,'el-table__body')]/tbody/tr/td[{_TH_BALANCE}]"
+    f"[count({_TH_BALANCE}/preceding-sibling::th) + 1]/div[@class='cell'])[1]",
+)
+
+
+# ----------------------------
+# Registro
+# ----------------------------
+SITIOS = {
+    "GAME VAULT": dict(_ADMIN_LIST, captcha_prefijo="gamevault"),
+    "SIRIUS": dict(_ADMIN_LIST, captcha_prefijo="sirius"),
+    "VEGAS SWEEPS": dict(_ADMIN_LIST, captcha_prefijo="vegassweeps"),
+    "GALAXY WORLD": dict(_ADMIN_LIST, captcha_prefijo="galaxyworld", captcha_modelo="grupo3"),
+    "JUWA": dict(_JUWA, captcha_prefijo="juwa"),
+    "LOOT": dict(_JUWA, captcha_prefijo="loot"),
+    "HIGHSTAKES": {
+        "login": {
+            "formulario": (By.CSS_SELECTOR, "form.login-container"),
+            "usuario": (By.CSS_SELECTOR, "form.login-container input.el-input__inner[placeholder*='account']"),
+            "password": (By.CSS_SELECTOR, "form.login-container input.el-input__inner[placeholder*='password']"),
+            "captcha_img": (By.CSS_SELECTOR, "form.login-container img.imgCode"),
+            "captcha_input": (By.CSS_SELECTOR, "form.login-container input.el-input__inner[placeholder*='verification code']"),
+            "boton": (By.CSS_SELECTOR, "form.login-container button.el-button--primary"),
+        },
+        "captcha_prefijo": "highstakes",
+        "exito": "balance",
+        "navegar": None,
+        "balance": [(By.XPATH, "//span[contains(@class, 'balance') and contains(.,'Balance:')]/span")],
+        "balance_timeout": 20,
+        "logout": "limpiar",
+    },
+    "SUPER DRAGON": {
+        "login": dict(
+            _LOGIN_VUE_ADMIN,
+            captcha_img=(By.CSS_SELECTOR, "form.login-form img"),
+            captcha_input=(By.XPATH, "(//input[@class='el-input__inner' and @autocomplete='off'])[last()]"),
+            boton=(By.XPATH, "//button[span[contains(.,'Log in')]]"),
+        ),
+        "captcha_prefijo": "superdragon",
+        "exito": "url",
+        "balance": [_BALANCE_TABLA],
+        "logout": "menu",
+        "logout_pasos": [
+            _AVATAR_VUE_ADMIN,
+            (By.XPATH, "//li[contains(@class,'el-dropdown-menu__item--divided')]//span[contains(translate(., 'LO', 'lo'), 'log out')]"),
+        ],
+    },
+    "JACKPOT FRENZY": {
+        "login": dict(_LOGIN_VUE_ADMIN, boton=(By.CSS_SELECTOR, "form.login-form button.el-button--primary")),
+        "exito": "balance",
+        "balance": [(By.CSS_SELECTOR, "div.fixed-header .score.item span.con")],
+        "balance_timeout": 10,
+        "logout": "menu",
+        "logout_pasos": [
+            _AVATAR_VUE_ADMIN,
+            (By.XPATH, "//li[contains(@class,'el-dropdown-menu__item') and descendant::span[contains(.,'logout')]]"),
+        ],
+    },
+    "NOBLE": dict(_LAYUI, captcha_prefijo="noble"),
+    "CASH MACHINE": dict(_LAYUI, captcha_prefijo="cashmachine"),
+    "GAME ROOM": dict(_LAYUI, captcha_prefijo="gameroom"),
+    "LUCKY STARS": dict(_LAYUI, captcha_prefijo="luckystars"),
+    "MAFIA": dict(_LAYUI, captcha_prefijo="mafia"),
+    "Win Star": dict(_LAYUI, captcha_prefijo="winstar"),
+    "Mr. All In One": dict(_LAYUI, captcha_prefijo="mrallinone"),
+    "WINNERS CLUB": dict(_LAYUI, captcha_prefijo="winnersclub"),
+    "JOKER": dict(_LAYUI, captcha_prefijo="joker"),
+}
+
+_DEFAULTS = {
+    "captcha_prefijo": None,
+    "captcha_modelo": None,
+    "mensaje_error": (By.CSS_SELECTOR, ".el-message__content, .el-message-box__message"),
+    "navegar": None,
+    "navegar_padre": False,
+    "balance_regex": r"[0-9,\.]+",
+    "balance_timeout": 20,
+    "logout": "limpiar",
+    "logout_pasos": (),
+}
+
+
+def get_spec(website_name):
+    """Spec completa (con defaults) del sitio; KeyError si no está registrado."""
+    return dict(_DEFAULTS, **SITIOS[website_name])
@@ -7,6 +7,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import WebDriverException
 from datetime import datetime
 import config
+import contexto
 
 
 WEBSITE_NAME = "VEGAS ROLL"
@@ -97,7 +98,9 @@ def main():
     try:
         driver = config.get_chrome_driver()
         for cuenta in site["accounts"]:
+            contexto.establecer(cuenta=cuenta["usuario"])
             for intento in range(MAX_LOGIN_RETRIES):
+                contexto.establecer(intento=intento + 1)
                 try:
                     if not getattr(driver, "session_id", None):
                         driver.quit()
@@ -142,4 +145,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with contexto.ejecucion(website=WEBSITE_NAME):
+        main()
@@ -6,6 +6,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
 import config
+import contexto
 
 
 WEBSITE_NAME = "YOLO"
@@ -58,6 +59,7 @@ def logout_yolo(driver):
 
 def login_and_check(driver, usuario, password):
     for intento in range(MAX_LOGIN_RETRIES):
+        contexto.establecer(intento=intento + 1)
         try:
             driver.get(config.WEBSITES[WEBSITE_NAME]["url"])
             WebDriverWait(driver, 10).until(
@@ -93,6 +95,7 @@ def main():
     driver = config.get_chrome_driver()
     try:
         for cuenta in site["accounts"]:
+            contexto.establecer(cuenta=cuenta["usuario"])
             logged = login_and_check(driver, cuenta["usuario"], cuenta["password"])
             if not logged:
                 continue
@@ -109,4 +112,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with contexto.ejecucion(website=WEBSITE_NAME):
+        main()
@@ -0,0 +1,129 @@
+"""
+Decodificador CTC en numpy (sin TensorFlow).
+
+Compartido por la inferencia (balanceScripts/config.py) y la evaluación de
+los train_grupo*.py. Reemplaza tf.keras.backend.ctc_decode: para captchas de
+4-5 dígitos decodificar en numpy toma microsegundos y no obliga a cargar TF.
+
+- La salida del modelo es un softmax (batch, timesteps, clases) cuyo blank
+  es la ÚLTIMA clase (igual que ctc_batch_cost/ctc_decode de Keras)
+- Greedy vectorizado sobre el batch completo
+- Beam search (prefix beam) opcional para beam_width > 1
+- Cada carácter devuelve su confianza (prob. máxima dentro de su tramo)
+"""
+from collections import defaultdict
+
+import numpy as np
+
+
+def decodificar_greedy(pred, max_length=None):
+    """
+    CTC greedy: argmax por timestep, colapsa repetidos y quita blanks.
+
+    Returns:
+        list[(list[int], list[float])]: (índices, confianzas) por muestra
+    """
+    pred = np.asarray(pred)
+    batch, timesteps, clases = pred.shape
+    blank = clases - 1
+
+    indices = np.argmax(pred, axis=-1)
+    probs = np.max(pred, axis=-1)
+
+    # Inicio de cada tramo (cambio de clase o inicio de muestra)
+    inicio = np.ones((batch, timesteps), dtype=bool)
+    inicio[:, 1:] = indices[:, 1:] != indices[:, :-1]
+    starts = np.flatnonzero(inicio.ravel())
+
+    tramo_idx = indices.ravel()[starts]
+    tramo_conf = np.maximum.reduceat(probs.ravel(), starts)
+    tramo_muestra = starts // timesteps
+
+    mantener = tramo_idx != blank
+    tramo_idx, tramo_conf, tramo_muestra = tramo_idx[mantener], tramo_conf[mantener], tramo_muestra[mantener]
+
+    cortes = np.searchsorted(tramo_muestra, np.arange(1, batch))
+    resultados = []
+    for idx, conf in zip(np.split(tramo_idx, cortes), np.split(tramo_conf, cortes)):
+        resultados.append((idx[:max_length].tolist(), conf[:max_length].tolist()))
+    return resultados
+
+
+def _beam_muestra(probs, beam_width):
+    """Prefix beam search para una muestra (timesteps, clases)."""
+    blank = probs.shape[1] - 1
+    # prefijo -> [p_termina_en_blank, p_termina_en_caracter]
+    beams = {(): [1.0, 0.0]}
+    confs = {(): ()}
+
+    for p in probs:
+        candidatos = [c for c in np.argsort(p)[::-1][:beam_width + 1] if c != blank]
+        nuevos = defaultdict(lambda: [0.0, 0.0])
+        nuevas_confs = {}
+
+        for prefijo, (p_b, p_nb) in beams.items():
+            total = p_b + p_nb
+            nuevos[prefijo][0] += total * p[blank]
+            nuevas_confs.setdefault(prefijo, confs[prefijo])
+
+            for c in candidatos:
+                pc = float(p[c])
+                extendido = prefijo + (int(c),)
+                if prefijo and prefijo[-1] == c:
+                    # Repetido sin blank en medio: mismo prefijo
+                    nuevos[prefijo][1] += p_nb * pc
+                    anterior = nuevas_confs[prefijo]
+                    nuevas_confs[prefijo] = anterior[:-1] + (max(anterior[-1], pc),)
+                    # Repetido tras un blank: carácter nuevo
+                    nuevos[extendido][1] += p_b * pc
+                else:
+                    nuevos[extendido][1] += total * pc
+                nuevas_confs.setdefault(extendido, confs[prefijo] + (pc,))
+
+        mejores = sorted(nuevos.items(), key=lambda x: -(x[1][0] + x[1][1]))[:beam_width]
+        # Normalizar para evitar underflow en secuencias largas
+        norma = sum(p_b + p_nb for _, (p_b, p_nb) in mejores) or 1.0
+        beams = {pref: [p_b / norma, p_nb / norma] for pref, (p_b, p_nb) in mejores}
+        confs = {pref: nuevas_confs[pref] for pref in beams}
+
+    mejor = max(beams, key=lambda pref: sum(beams[pref]))
+    return list(mejor), list(confs[mejor])
+
+
+def decodificar_beam(pred, beam_width=5, max_length=None):
+    """
+    CTC prefix beam search (útil cuando greedy duda entre dos dígitos).
+
+    Returns:
+        list[(list[int], list[float])]: (índices, confianzas) por muestra
+    """
+    resultados = []
+    for muestra in np.asarray(pred, dtype=np.float64):
+        idx, conf = _beam_muestra(muestra, beam_width)
+        resultados.append((idx[:max_length], conf[:max_length]))
+    return resultados
+
+
+def decodificar(pred, alfabeto, max_length=None, beam_width=1):
+    """
+    Decodifica un batch a texto.
+
+    Args:
+        pred: salida del modelo (batch, timesteps, clases)
+        alfabeto: str o dict {índice: carácter} (p.ej. "0123456789")
+        max_length: corta el texto a esta longitud (como el [:, :MAX_LENGTH] de Keras)
+        beam_width: 1 = greedy; >1 = beam search
+
+    Returns:
+        list[(str, list[float])]: (texto, confianza por carácter) por muestra
+    """
+    if beam_width > 1:
+        crudos = decodificar_beam(pred, beam_width, max_length)
+    else:
+        crudos = decodificar_greedy(pred, max_length)
+
+    resultados = []
+    for indices, confianzas in crudos:
+        pares = [(alfabeto[i], c) for i, c in zip(indices, confianzas) if 0 <= i < len(alfabeto)]
+        resultados.append((''.join(ch for ch, _ in pares), [c for _, c in pares]))
+    return resultados
@@ -0,0 +1,124 @@
+"""
+Exporta los modelos de predicción (*_pred.h5) a ONNX y/o TFLite.
+
+balanceScripts/config.py usa automáticamente el .onnx (onnxruntime) o el
+.tflite (tflite-runtime) si existe junto al .h5, sin importar TensorFlow.
+
+Uso:
+    python export_modelos.py                        # todos los models/*_pred.h5
+    python export_modelos.py models/captcha_grupo1_v1_pred.h5
+    python export_modelos.py --formato onnx         # solo ONNX (onnx | tflite | ambos)
+
+Requiere: tensorflow + tf2onnx (ONNX). Para verificar el export: onnxruntime.
+"""
+import os
+import site
+import argparse
+from pathlib import Path
+
+# ✅ CONFIGURACIÓN CUDA 11 OBLIGATORIA para TensorFlow 2.10
+for sp in site.getsitepackages():
+    nvidia_path = os.path.join(sp, 'nvidia')
+    if os.path.exists(nvidia_path):
+        for subdir in os.listdir(nvidia_path):
+            bin_path = os.path.join(nvidia_path, subdir, 'bin')
+            if os.path.exists(bin_path):
+                try:
+                    os.add_dll_directory(bin_path)
+                except:
+                    pass
+                os.environ['PATH'] = bin_path + os.pathsep + os.environ.get('PATH', '')
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+# ==================== CONFIG ====================
+MODEL_DIR = "models/"
+ONNX_OPSET = 13
+TOLERANCIA = 1e-3  # diferencia máxima aceptada vs Keras
+
+
+# ==================== EXPORT ====================
+def exportar_onnx(model, h5_path):
+    import tf2onnx
+
+    onnx_path = str(Path(h5_path).with_suffix(".onnx"))
+    spec = (tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name="image"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=ONNX_OPSET, output_path=onnx_path)
+    return onnx_path
+
+
+def exportar_tflite(model, h5_path):
+    tflite_path = str(Path(h5_path).with_suffix(".tflite"))
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    try:
+        tflite_model = converter.convert()
+    except Exception as e:
+        # La BiLSTM a veces necesita ops de TF (no soportadas por tflite-runtime)
+        print(f"   ⚠️ Solo builtins falló ({e}), usando SELECT_TF_OPS")
+        converter.target_spec.supported_ops = [
+            tf.lite.OpsSet.TFLITE_BUILTINS,
+            tf.lite.OpsSet.SELECT_TF_OPS,
+        ]
+        tflite_model = converter.convert()
+    with open(tflite_path, "wb") as f:
+        f.write(tflite_model)
+    return tflite_path
+
+
+# ==================== VERIFICACIÓN ====================
+def verificar_onnx(model, onnx_path, muestra):
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        print("   (onnxruntime no instalado, sin verificar)")
+        return
+    sess = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+    salida = sess.run(None, {sess.get_inputs()[0].name: muestra})[0]
+    diff = float(np.max(np.abs(salida - model.predict(muestra, verbose=0))))
+    print(f"   {'✅' if diff < TOLERANCIA else '❌'} ONNX vs Keras: diff máx {diff:.2e}")
+
+
+def verificar_tflite(model, tflite_path, muestra):
+    interpreter = tf.lite.Interpreter(model_path=tflite_path)
+    input_index = interpreter.get_input_details()[0]['index']
+    interpreter.resize_tensor_input(input_index, muestra.shape)
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(input_index, muestra)
+    interpreter.invoke()
+    salida = interpreter.get_tensor(interpreter.get_output_details()[0]['index'])
+    diff = float(np.max(np.abs(salida - model.predict(muestra, verbose=0))))
+    print(f"   {'✅' if diff < TOLERANCIA else '❌'} TFLite vs Keras: diff máx {diff:.2e}")
+
+
+def exportar(h5_path, formato):
+    print(f"\n🔄 {h5_path}")
+    model = keras.models.load_model(h5_path, compile=False)
+    muestra = np.random.rand(4, *model.input_shape[1:]).astype(np.float32)
+
+    if formato in ("onnx", "ambos"):
+        try:
+            onnx_path = exportar_onnx(model, h5_path)
+            print(f"   ✅ ONNX: {onnx_path}")
+            verificar_onnx(model, onnx_path, muestra)
+        except ImportError:
+            print("   ❌ tf2onnx no instalado (pip install tf2onnx)")
+
+    if formato in ("tflite", "ambos"):
+        tflite_path = exportar_tflite(model, h5_path)
+        print(f"   ✅ TFLite: {tflite_path}")
+        verificar_tflite(model, tflite_path, muestra)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta modelos captcha a ONNX/TFLite")
+    parser.add_argument("modelos", nargs="*", help="Rutas .h5 (default: models/*_pred.h5)")
+    parser.add_argument("--formato", choices=["onnx", "tflite", "ambos"], default="ambos")
+    args = parser.parse_args()
+
+    modelos = args.modelos or sorted(str(p) for p in Path(MODEL_DIR).glob("*_pred.h5"))
+    if not modelos:
+        print(f"⚠️ No hay modelos *_pred.h5 en {MODEL_DIR}")
+    for h5_path in modelos:
+        exportar(h5_path, args.formato)
@@ -33,6 +33,8 @@ from PIL import Image
 from sklearn.model_selection import train_test_split
 import cv2
 
+from ctc_decoder import decodificar
+
 # ==================== CONFIG ====================
 CAPTCHA_NAME = "grupo3_v2_62px"
 DATASET_PATH = "./captcha_datasets/grupo3_200x62/"
@@ -57,16 +59,12 @@ MODEL_PATH = os.path.join(MODEL_DIR, f"captcha_{CAPTCHA_NAME}.h5")
 PRED_MODEL_PATH = MODEL_PATH.replace(".h5", "_pred.h5")
 
 char_to_num_dict = {char: idx for idx, char in enumerate(CHARACTERS)}
-num_to_char_dict = {idx: char for idx, char in enumerate(CHARACTERS)}
 
 USE_HEAVY_AUG = False
 
 def encode_label(label_str):
     return [char_to_num_dict[char] for char in label_str]
 
-def decode_label(label_indices):
-    return ''.join([num_to_char_dict[idx] for idx in label_indices if 0 <= idx < len(CHARACTERS)])
-
 # ==================== AUGMENTATION ====================
 def augment_light(img):
     h, w = img.shape
@@ -207,15 +205,15 @@ class ProgressiveAugmentation(keras.callbacks.Callback):
 
 # ==================== PRED / EVAL ====================
 def decode_predictions(pred):
-    input_len = np.ones(pred.shape[0]) * pred.shape[1]
-    results = tf.keras.backend.ctc_decode(pred, input_length=input_len, greedy=True)[0][0][:, :MAX_LENGTH]
-    return [decode_label(r.numpy()) for r in results]
+    return [texto for texto, _ in decodificar(pred, CHARACTERS, MAX_LENGTH)]
 
 def evaluate_accuracy(pred_model, images, labels, n=100):  # ✅ Reducido a 100 para más velocidad
-    correct = sum(1 for img, lbl in zip(images[:n], labels[:n]) 
-                  if decode_predictions(pred_model.predict(
-                      np.expand_dims(np.transpose(np.expand_dims(preprocess_image_file(img, False), -1), (1,0,2)), 0), 
-                      verbose=0))[0] == lbl)
+    batch = np.stack([
+        np.transpose(np.expand_dims(preprocess_image_file(img, False), -1), (1,0,2))
+        for img in images[:n]
+    ])
+    preds = decode_predictions(pred_model.predict(batch, verbose=0))
+    correct = sum(1 for pred, lbl in zip(preds, labels[:n]) if pred == lbl)
     return (correct / n) * 100
 
 # ==================== TRAIN ====================